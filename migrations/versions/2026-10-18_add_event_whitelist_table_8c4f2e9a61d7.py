@@ -0,0 +1,88 @@
+"""add_event_whitelist_table
+
+Revision ID: 8c4f2e9a61d7
+Revises: 5e1b0c7d93f2
+Create Date: 2026-10-18 23:41:52.318406
+
+"""
+
+import warnings
+from typing import TYPE_CHECKING
+
+import sqlalchemy as sa
+from alembic import op
+from advanced_alchemy.types import EncryptedString, EncryptedText, GUID, ORA_JSONB, DateTimeUTC, StoredObject, PasswordHash
+from sqlalchemy import Text  # noqa: F401
+from sqlalchemy.dialects import postgresql
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+__all__ = ["downgrade", "upgrade", "schema_upgrades", "schema_downgrades", "data_upgrades", "data_downgrades"]
+
+sa.GUID = GUID
+sa.DateTimeUTC = DateTimeUTC
+sa.ORA_JSONB = ORA_JSONB
+sa.EncryptedString = EncryptedString
+sa.EncryptedText = EncryptedText
+sa.StoredObject = StoredObject
+
+# revision identifiers, used by Alembic.
+revision = '8c4f2e9a61d7'
+down_revision = '5e1b0c7d93f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        with op.get_context().autocommit_block():
+            schema_upgrades()
+            data_upgrades()
+
+def downgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        with op.get_context().autocommit_block():
+            data_downgrades()
+            schema_downgrades()
+
+def schema_upgrades() -> None:
+    """schema upgrade migrations go here."""
+    op.create_table('event_whitelist',
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('event_id', sa.BigInteger(), nullable=False),
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('created_at', sa.DateTimeUTC(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTimeUTC(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], name=op.f('fk_event_whitelist_event_id_events'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_event_whitelist')),
+    sa.UniqueConstraint('event_id', 'email', name='uq_event_whitelist_email')
+    )
+    # The entries must be copied over before the JSONB column goes away
+    op.execute(
+        "INSERT INTO event_whitelist (event_id, email, created_at, updated_at) "
+        "SELECT id, jsonb_array_elements_text(whitelist->'emails'), now(), now() FROM events "
+        "ON CONFLICT ON CONSTRAINT uq_event_whitelist_email DO NOTHING"
+    )
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.drop_column('whitelist')
+
+def schema_downgrades() -> None:
+    """schema downgrade migrations go here."""
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('whitelist', sa.JSON().with_variant(postgresql.JSONB(astext_type=sa.Text()), 'cockroachdb').with_variant(sa.ORA_JSONB(), 'oracle').with_variant(postgresql.JSONB(astext_type=sa.Text()), 'postgresql'), server_default=sa.text("'{\"emails\": []}'::jsonb"), nullable=False))
+    op.execute(
+        "UPDATE events SET whitelist = jsonb_build_object('emails', entries.emails) "
+        "FROM (SELECT event_id, jsonb_agg(email ORDER BY email) AS emails FROM event_whitelist GROUP BY event_id) AS entries "
+        "WHERE events.id = entries.event_id"
+    )
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.alter_column('whitelist', server_default=None)
+    op.drop_table('event_whitelist')
+
+def data_upgrades() -> None:
+    """Add any optional data upgrade migrations here!"""
+
+def data_downgrades() -> None:
+    """Add any optional data downgrade migrations here!"""
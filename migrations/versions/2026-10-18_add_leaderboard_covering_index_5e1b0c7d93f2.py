@@ -0,0 +1,81 @@
+"""add_leaderboard_covering_index
+
+Revision ID: 5e1b0c7d93f2
+Revises: a53820cc5766
+Create Date: 2026-10-18 23:04:17.902311
+
+"""
+
+import warnings
+from typing import TYPE_CHECKING
+
+import sqlalchemy as sa
+from alembic import op
+from advanced_alchemy.types import EncryptedString, EncryptedText, GUID, ORA_JSONB, DateTimeUTC, StoredObject, PasswordHash
+from sqlalchemy import Text  # noqa: F401
+from sqlalchemy.dialects import postgresql
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+__all__ = ["downgrade", "upgrade", "schema_upgrades", "schema_downgrades", "data_upgrades", "data_downgrades"]
+
+sa.GUID = GUID
+sa.DateTimeUTC = DateTimeUTC
+sa.ORA_JSONB = ORA_JSONB
+sa.EncryptedString = EncryptedString
+sa.EncryptedText = EncryptedText
+sa.StoredObject = StoredObject
+
+# revision identifiers, used by Alembic.
+revision = '5e1b0c7d93f2'
+down_revision = 'a53820cc5766'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        with op.get_context().autocommit_block():
+            schema_upgrades()
+            data_upgrades()
+
+def downgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        with op.get_context().autocommit_block():
+            data_downgrades()
+            schema_downgrades()
+
+def schema_upgrades() -> None:
+    """schema upgrade migrations go here."""
+    # Replaces ix_user_event_points, the leaderboard can now be read with an index-only scan in display order
+    op.create_index(
+        'ix_user_event_leaderboard',
+        'users',
+        ['event_id', sa.text('points DESC'), sa.text('connection_count DESC'), 'name', 'id'],
+        unique=False,
+        postgresql_include=['email'],
+        postgresql_where=sa.text('NOT is_admin'),
+        postgresql_concurrently=True,
+        if_not_exists=True,
+    )
+    op.drop_index('ix_user_event_points', table_name='users', postgresql_concurrently=True, if_exists=True)
+
+def schema_downgrades() -> None:
+    """schema downgrade migrations go here."""
+    op.create_index(
+        'ix_user_event_points',
+        'users',
+        ['event_id', 'points'],
+        unique=False,
+        postgresql_concurrently=True,
+        if_not_exists=True,
+    )
+    op.drop_index('ix_user_event_leaderboard', table_name='users', postgresql_concurrently=True, if_exists=True)
+
+def data_upgrades() -> None:
+    """Add any optional data upgrade migrations here!"""
+
+def data_downgrades() -> None:
+    """Add any optional data downgrade migrations here!"""
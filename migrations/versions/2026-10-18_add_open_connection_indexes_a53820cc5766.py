@@ -0,0 +1,102 @@
+"""add_open_connection_indexes
+
+Revision ID: a53820cc5766
+Revises: 072946ee5fef
+Create Date: 2026-10-18 10:12:41.518204
+
+"""
+
+import warnings
+from typing import TYPE_CHECKING
+
+import sqlalchemy as sa
+from alembic import op
+from advanced_alchemy.types import EncryptedString, EncryptedText, GUID, ORA_JSONB, DateTimeUTC, StoredObject, PasswordHash
+from sqlalchemy import Text  # noqa: F401
+from sqlalchemy.dialects import postgresql
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+__all__ = ["downgrade", "upgrade", "schema_upgrades", "schema_downgrades", "data_upgrades", "data_downgrades"]
+
+sa.GUID = GUID
+sa.DateTimeUTC = DateTimeUTC
+sa.ORA_JSONB = ORA_JSONB
+sa.EncryptedString = EncryptedString
+sa.EncryptedText = EncryptedText
+sa.StoredObject = StoredObject
+
+# revision identifiers, used by Alembic.
+revision = 'a53820cc5766'
+down_revision = '072946ee5fef'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        with op.get_context().autocommit_block():
+            schema_upgrades()
+            data_upgrades()
+
+def downgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        with op.get_context().autocommit_block():
+            data_downgrades()
+            schema_downgrades()
+
+def schema_upgrades() -> None:
+    """schema upgrade migrations go here."""
+    # Built CONCURRENTLY so a live event keeps writing to these tables while the indexes build.
+    # This relies on the autocommit block above, CREATE INDEX CONCURRENTLY can't run in a transaction.
+    op.create_index(
+        'ix_user_event_available',
+        'users',
+        ['event_id'],
+        unique=False,
+        postgresql_where=sa.text("status = 'AVAILABLE' AND NOT is_admin"),
+        postgresql_concurrently=True,
+        if_not_exists=True,
+    )
+    op.create_index(
+        'ix_connection_open_user1',
+        'connections',
+        ['user1_id', 'event_id'],
+        unique=False,
+        postgresql_where=sa.text("status IN ('PENDING', 'ACTIVE')"),
+        postgresql_concurrently=True,
+        if_not_exists=True,
+    )
+    op.create_index(
+        'ix_connection_open_user2',
+        'connections',
+        ['user2_id', 'event_id'],
+        unique=False,
+        postgresql_where=sa.text("status IN ('PENDING', 'ACTIVE')"),
+        postgresql_concurrently=True,
+        if_not_exists=True,
+    )
+    op.create_index(
+        'ix_connection_open_event_end_time',
+        'connections',
+        ['event_id', 'end_time'],
+        unique=False,
+        postgresql_where=sa.text("status IN ('PENDING', 'ACTIVE')"),
+        postgresql_concurrently=True,
+        if_not_exists=True,
+    )
+
+def schema_downgrades() -> None:
+    """schema downgrade migrations go here."""
+    op.drop_index('ix_connection_open_event_end_time', table_name='connections', postgresql_concurrently=True, if_exists=True)
+    op.drop_index('ix_connection_open_user2', table_name='connections', postgresql_concurrently=True, if_exists=True)
+    op.drop_index('ix_connection_open_user1', table_name='connections', postgresql_concurrently=True, if_exists=True)
+    op.drop_index('ix_user_event_available', table_name='users', postgresql_concurrently=True, if_exists=True)
+
+def data_upgrades() -> None:
+    """Add any optional data upgrade migrations here!"""
+
+def data_downgrades() -> None:
+    """Add any optional data downgrade migrations here!"""
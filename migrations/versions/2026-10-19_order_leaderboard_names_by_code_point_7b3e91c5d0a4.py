@@ -0,0 +1,78 @@
+"""order_leaderboard_names_by_code_point
+
+Revision ID: 7b3e91c5d0a4
+Revises: 02fd78f214cc
+Create Date: 2026-10-19 00:41:52.118406
+
+"""
+
+import warnings
+from typing import TYPE_CHECKING
+
+import sqlalchemy as sa
+from alembic import op
+from advanced_alchemy.types import EncryptedString, EncryptedText, GUID, ORA_JSONB, DateTimeUTC, StoredObject, PasswordHash
+from sqlalchemy import Text  # noqa: F401
+from sqlalchemy.dialects import postgresql
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+__all__ = ["downgrade", "upgrade", "schema_upgrades", "schema_downgrades", "data_upgrades", "data_downgrades"]
+
+sa.GUID = GUID
+sa.DateTimeUTC = DateTimeUTC
+sa.ORA_JSONB = ORA_JSONB
+sa.EncryptedString = EncryptedString
+sa.EncryptedText = EncryptedText
+sa.StoredObject = StoredObject
+
+# revision identifiers, used by Alembic.
+revision = '7b3e91c5d0a4'
+down_revision = '02fd78f214cc'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        with op.get_context().autocommit_block():
+            schema_upgrades()
+            data_upgrades()
+
+def downgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        with op.get_context().autocommit_block():
+            data_downgrades()
+            schema_downgrades()
+
+def _rebuild_leaderboard_index(name: sa.TextClause | str) -> None:
+    # Built next to the current index and swapped in, so the leaderboard is never read without one
+    op.create_index(
+        'ix_user_event_leaderboard_new',
+        'users',
+        ['event_id', sa.text('points DESC'), sa.text('connection_count DESC'), name, 'id'],
+        unique=False,
+        postgresql_include=['email'],
+        postgresql_where=sa.text('NOT is_admin'),
+        postgresql_concurrently=True,
+        if_not_exists=True,
+    )
+    op.drop_index('ix_user_event_leaderboard', table_name='users', postgresql_concurrently=True, if_exists=True)
+    op.execute('ALTER INDEX ix_user_event_leaderboard_new RENAME TO ix_user_event_leaderboard')
+
+def schema_upgrades() -> None:
+    """schema upgrade migrations go here."""
+    # Names in code point order, the order the live leaderboard sorts ties in
+    _rebuild_leaderboard_index(sa.text('name COLLATE "C"'))
+
+def schema_downgrades() -> None:
+    """schema downgrade migrations go here."""
+    _rebuild_leaderboard_index('name')
+
+def data_upgrades() -> None:
+    """Add any optional data upgrade migrations here!"""
+
+def data_downgrades() -> None:
+    """Add any optional data downgrade migrations here!"""
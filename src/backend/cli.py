@@ -1,7 +1,12 @@
+from typing import TYPE_CHECKING
+
 import click
 from click import Group
 from litestar.plugins import CLIPluginProtocol
 
+if TYPE_CHECKING:
+    from src.backend.lib.benchmarks import BenchmarkResult
+
 
 @click.group(name="users", invoke_without_command=False, help="Manage application users.")
 @click.pass_context
@@ -206,7 +211,6 @@ def create_event(
                 "name": name,
                 "code": code,
                 "is_active": is_active,
-                "whitelist": {},
             }
 
             try:
@@ -268,6 +272,475 @@ def list_events() -> None:
     anyio.run(_list_events)
 
 
+@click.group(name="events", invoke_without_command=False, help="Import and export event data.")
+@click.pass_context
+def event_management_group(_: click.Context) -> None:
+    """Import and export event data."""
+
+
+@event_management_group.command(
+    name="import-attendees",
+    help="Whitelist and sign up attendees from a CSV or NDJSON file",
+)
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--event-id",
+    help="Event ID to import the attendees into",
+    type=click.INT,
+    required=True,
+    show_default=False,
+)
+@click.option(
+    "--format",
+    "import_format",
+    help="Format of the file, guessed from its extension by default",
+    type=click.Choice(["csv", "ndjson"]),
+    required=False,
+    show_default=False,
+)
+def import_attendees(
+    path: str,
+    event_id: int,
+    import_format: str | None,
+) -> None:
+    """Whitelist and sign up attendees from a file."""
+    import time
+
+    import anyio
+    import click
+    from litestar.exceptions import ClientException
+    from rich import get_console
+    from rich.table import Table
+
+    from src.backend.config import sqlalchemy_config
+    from src.backend.lib import attendee_import
+    from src.backend.lib.dependencies import provide_event_service
+    from src.backend.schema.event import AttendeeImport, ImportFormat
+
+    console = get_console()
+
+    async def _import_attendees() -> AttendeeImport:
+        async with sqlalchemy_config.get_session() as db_session:
+            event_service = await anext(provide_event_service(db_session))
+            if not await event_service.get_one_or_none(id=event_id):
+                console.print(f"[red]Error: Event with ID {event_id} not found[/red]")
+                raise click.Abort
+
+            return await attendee_import.import_attendees(
+                db_session,
+                event_id=event_id,
+                chunks=attendee_import.read_file(path),
+                import_format=ImportFormat(import_format)
+                if import_format
+                else attendee_import.format_from_filename(path),
+            )
+
+    start = time.perf_counter()
+    try:
+        result = anyio.run(_import_attendees)
+    except ClientException as e:
+        console.print(f"[red]Error: {e.detail}[/red]")
+        raise click.Abort from e
+    elapsed = time.perf_counter() - start
+
+    console.print(
+        f"[green]Imported {result.rows - result.rejected} of {result.rows} rows in {elapsed:.1f}s[/green]: "
+        f"{result.whitelisted} new whitelist entries, {result.attendees} new attendees, {result.answers} answers",
+    )
+
+    if result.errors:
+        table = Table(title=f"Rejected Rows ({result.rejected})")
+        table.add_column("Line", style="cyan", justify="right")
+        table.add_column("Error", style="red")
+
+        for error in result.errors:
+            table.add_row(str(error.line), error.detail)
+
+        console.print(table)
+
+
+@event_management_group.command(name="export", help="Export an event's data as CSV or NDJSON")
+@click.option(
+    "--event-id",
+    help="Event ID to export the data of",
+    type=click.INT,
+    required=True,
+    show_default=False,
+)
+@click.option(
+    "--dataset",
+    help="Data to export",
+    type=click.Choice(["users", "answers", "connections", "question_outcomes", "game_log"]),
+    required=True,
+    show_default=False,
+)
+@click.option(
+    "--format",
+    "export_format",
+    help="Format of the export",
+    type=click.Choice(["csv", "ndjson"]),
+    default="csv",
+    required=False,
+    show_default=True,
+)
+@click.option(
+    "--output",
+    help="File to write the export to, standard output by default",
+    type=click.Path(dir_okay=False, writable=True, allow_dash=True),
+    default="-",
+    required=False,
+    show_default=False,
+)
+def export_event(
+    event_id: int,
+    dataset: str,
+    export_format: str,
+    output: str,
+) -> None:
+    """Export an event's data."""
+    import anyio
+    import click
+    from rich.console import Console
+
+    from src.backend.config import sqlalchemy_config
+    from src.backend.lib import event_export
+    from src.backend.lib.dependencies import provide_event_service
+    from src.backend.schema.event import ExportDataset, ImportFormat
+
+    # The export itself may go to standard output
+    console = Console(stderr=True)
+
+    async def _export_event() -> int:
+        async with sqlalchemy_config.get_session() as db_session:
+            event_service = await anext(provide_event_service(db_session))
+            if not await event_service.get_one_or_none(id=event_id):
+                console.print(f"[red]Error: Event with ID {event_id} not found[/red]")
+                raise click.Abort
+
+        written = 0
+        with click.open_file(output, "wb") as file:
+            async for chunk in event_export.export_event(
+                event_id=event_id,
+                dataset=ExportDataset(dataset),
+                export_format=ImportFormat(export_format),
+            ):
+                file.write(chunk)
+                written += len(chunk)
+
+        return written
+
+    written = anyio.run(_export_event)
+    if output != "-":
+        console.print(f"[green]Exported {dataset} of event {event_id} to {output}[/green] ({written:,} bytes)")
+
+
+@click.group(name="queries", invoke_without_command=False, help="Inspect database query performance.")
+@click.pass_context
+def query_management_group(_: click.Context) -> None:
+    """Inspect database query performance."""
+
+
+@query_management_group.command(
+    name="check-plans",
+    help="EXPLAIN the hot game queries and fail if one loses its index or exceeds its cost budget",
+)
+@click.option(
+    "--event-id",
+    help="Event ID to check the queries against",
+    type=click.INT,
+    required=False,
+    show_default=False,
+)
+@click.option(
+    "--seed-users",
+    help="Seed a synthetic event with this many users, it is rolled back after the check",
+    type=click.INT,
+    default=0,
+    required=False,
+    show_default=False,
+)
+@click.option(
+    "--seed-connections",
+    help="Number of connections to seed for the synthetic event",
+    type=click.INT,
+    default=50_000,
+    required=False,
+    show_default=True,
+)
+def check_plans(
+    event_id: int | None,
+    seed_users: int,
+    seed_connections: int,
+) -> None:
+    """EXPLAIN the hot game queries."""
+    from typing import cast
+
+    import anyio
+    import click
+    from rich import get_console
+    from rich.table import Table
+
+    from src.backend.config import sqlalchemy_config
+    from src.backend.lib.query_plans import PlanResult, check_query_plans, seed_event
+
+    console = get_console()
+
+    if not event_id and not seed_users:
+        console.print("[red]Error: Pass either --event-id or --seed-users[/red]")
+        raise click.Abort
+
+    async def _check_plans() -> list[PlanResult]:
+        async with sqlalchemy_config.get_session() as db_session:
+            try:
+                checked_event_id = event_id
+                if seed_users:
+                    console.print(f"Seeding {seed_users} users and {seed_connections} connections...")
+                    checked_event_id = await seed_event(db_session, users=seed_users, connections=seed_connections)
+
+                return await check_query_plans(db_session, event_id=cast("int", checked_event_id))
+            finally:
+                # Never keep the seeded data or the side effects of the checked queries
+                await db_session.rollback()
+
+    results = anyio.run(_check_plans)
+
+    table = Table(title="Query Plans")
+    table.add_column("Query", style="cyan")
+    table.add_column("Cost", style="yellow", justify="right")
+    table.add_column("Result")
+
+    for result in results:
+        table.add_row(
+            result.name,
+            f"{result.total_cost:.0f}",
+            "[green]✓[/green]" if result.passed else f"[red]✗ {'; '.join(result.errors)}[/red]",
+        )
+
+    console.print(table)
+
+    if not all(result.passed for result in results):
+        raise SystemExit(1)
+
+
+@click.group(
+    name="benchmarks",
+    invoke_without_command=False,
+    help="Benchmark the request middleware, response compression and the hot database paths.",
+)
+@click.pass_context
+def benchmark_group(_: click.Context) -> None:
+    """Benchmark the request middleware, response compression and the hot database paths."""
+
+
+def _print_benchmark_results(title: str, results: "list[BenchmarkResult]") -> None:
+    from rich import get_console
+    from rich.table import Table
+
+    table = Table(title=title)
+    table.add_column("Variant", style="cyan")
+    table.add_column("Requests", justify="right")
+    table.add_column("Mean (ms)", style="yellow", justify="right")
+    table.add_column("p50 (ms)", justify="right")
+    table.add_column("p95 (ms)", justify="right")
+    table.add_column("p99 (ms)", justify="right")
+    table.add_column("Requests/s", style="green", justify="right")
+
+    for result in results:
+        table.add_row(
+            result.name,
+            str(result.requests),
+            f"{result.mean_ms:.3f}",
+            f"{result.p50_ms:.3f}",
+            f"{result.p95_ms:.3f}",
+            f"{result.p99_ms:.3f}",
+            f"{result.requests_per_second:.0f}",
+        )
+
+    get_console().print(table)
+
+
+@benchmark_group.command(name="sessions", help="Compare the request latency of the server side and cookie sessions")
+@click.option(
+    "--requests",
+    help="Number of authenticated requests to time per session backend",
+    type=click.INT,
+    default=2_000,
+    required=False,
+    show_default=True,
+)
+def benchmark_sessions(requests: int) -> None:
+    """Compare the request latency of the session backends."""
+    import anyio
+
+    from src.backend.lib.benchmarks import benchmark_session_backends
+
+    results = anyio.run(lambda: benchmark_session_backends(requests=requests))
+    _print_benchmark_results("Session Backends", results)
+
+
+@benchmark_group.command(name="rate-limit", help="Compare the overhead of the rate limiters at high request rates")
+@click.option(
+    "--requests",
+    help="Number of requests to time per rate limiter",
+    type=click.INT,
+    default=20_000,
+    required=False,
+    show_default=True,
+)
+@click.option(
+    "--concurrency",
+    help="Number of requests in flight at once",
+    type=click.INT,
+    default=50,
+    required=False,
+    show_default=True,
+)
+@click.option(
+    "--clients",
+    help="Number of distinct client addresses sending the requests",
+    type=click.INT,
+    default=1_000,
+    required=False,
+    show_default=True,
+)
+def benchmark_rate_limit(requests: int, concurrency: int, clients: int) -> None:
+    """Compare the overhead of the rate limiters."""
+    import anyio
+
+    from src.backend.config import global_rate_limit_config
+    from src.backend.lib.benchmarks import benchmark_rate_limiters
+
+    results = anyio.run(
+        lambda: benchmark_rate_limiters(
+            requests=requests,
+            concurrency=concurrency,
+            clients=clients,
+            policy=global_rate_limit_config.rate_limit,
+        ),
+    )
+    _print_benchmark_results("Rate Limiters", results)
+
+
+@benchmark_group.command(name="fingerprints", help="Compare the cost and collisions of the browser fingerprints")
+@click.option(
+    "--calls",
+    help="Number of fingerprints to time per variant",
+    type=click.INT,
+    default=200_000,
+    required=False,
+    show_default=True,
+)
+@click.option(
+    "--clients",
+    help="Number of distinct clients to fingerprint and check for collisions",
+    type=click.INT,
+    default=100_000,
+    required=False,
+    show_default=True,
+)
+def benchmark_fingerprints(calls: int, clients: int) -> None:
+    """Compare the cost and collisions of the browser fingerprints."""
+    from rich import get_console
+    from rich.table import Table
+
+    from src.backend.lib import benchmarks
+
+    table = Table(title="Browser Fingerprints")
+    table.add_column("Variant", style="cyan")
+    table.add_column("Calls", justify="right")
+    table.add_column("Mean (µs)", style="yellow", justify="right")
+    table.add_column("Calls/s", style="green", justify="right")
+    table.add_column("Collisions", justify="right")
+
+    for result in benchmarks.benchmark_fingerprints(calls=calls, clients=clients):
+        table.add_row(
+            result.name,
+            str(result.calls),
+            f"{result.mean_us:.2f}",
+            f"{result.calls_per_second:.0f}",
+            str(result.collisions),
+        )
+
+    get_console().print(table)
+
+
+@benchmark_group.command(
+    name="signup", help="Compare the signup throughput of the four call and single statement paths"
+)
+@click.option(
+    "--requests",
+    help="Number of signups to time per path",
+    type=click.INT,
+    default=2_000,
+    required=False,
+    show_default=True,
+)
+@click.option(
+    "--concurrency",
+    help="Number of signups in flight at once",
+    type=click.INT,
+    default=50,
+    required=False,
+    show_default=True,
+)
+def benchmark_signup(requests: int, concurrency: int) -> None:
+    """Compare the signup throughput of the signup paths."""
+    import anyio
+
+    from src.backend.lib.benchmarks import benchmark_signups
+
+    results = anyio.run(lambda: benchmark_signups(requests=requests, concurrency=concurrency))
+    _print_benchmark_results("Signups", results)
+
+
+@benchmark_group.command(
+    name="compression", help="Compare the CPU cost and bytes saved of brotli and gzip on typical responses"
+)
+@click.option(
+    "--repeats",
+    help="Number of times each payload is compressed per encoding",
+    type=click.INT,
+    default=20,
+    required=False,
+    show_default=True,
+)
+def benchmark_compression(repeats: int) -> None:
+    """Compare the CPU cost and bytes saved of the response compression."""
+    from rich import get_console
+    from rich.table import Table
+
+    from src.backend.config import build_compression_config
+    from src.backend.lib import benchmarks
+
+    # Benchmark what enabling the compression configures, whether or not it is enabled
+    config = build_compression_config()
+
+    table = Table(title=f"Response Compression (compressed from {config.minimum_size:,} bytes)")
+    table.add_column("Payload", style="cyan")
+    table.add_column("Encoding")
+    table.add_column("Size", justify="right")
+    table.add_column("Compressed", justify="right")
+    table.add_column("Saved", style="green", justify="right")
+    table.add_column("Mean (ms)", style="yellow", justify="right")
+    table.add_column("MB/s", justify="right")
+
+    for result in benchmarks.benchmark_compression(config=config, repeats=repeats):
+        table.add_row(
+            result.name,
+            result.encoding,
+            f"{result.size:,}",
+            f"{result.compressed_size:,}" if result.size >= config.minimum_size else "skipped",
+            f"{result.saved:.0%}",
+            f"{result.mean_ms:.3f}",
+            f"{result.megabytes_per_second:.0f}",
+        )
+
+    get_console().print(table)
+
+
 class CLIPlugin(CLIPluginProtocol):
     def on_cli_init(self, cli: Group) -> None:
         cli.add_command(user_management_group)
+        cli.add_command(event_management_group)
+        cli.add_command(query_management_group)
+        cli.add_command(benchmark_group)
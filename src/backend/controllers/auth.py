@@ -4,10 +4,10 @@ from litestar import Request, Response, get, post
 from litestar.controller import Controller
 from litestar.di import Provide
 
-from src.backend.config import five_rpm_rate_limit_config
+from src.backend.config import session_revocations
 from src.backend.lib.dependencies import provide_event_service, provide_user_service
+from src.backend.lib.principal import Principal
 from src.backend.lib.services import EventService, UserService
-from src.backend.models import User
 from src.backend.schema.auth import PostLogin
 from src.backend.schema.user import GetUser
 
@@ -20,13 +20,13 @@ class AuthController(Controller):
         "event_service": Provide(provide_event_service),
     }
 
-    @post("/login", exclude_from_auth=True, middleware=[five_rpm_rate_limit_config.middleware])
+    @post("/login", exclude_from_auth=True, rate_limit=("minute", 5))
     async def login(
         self,
         data: PostLogin,
         users_service: UserService,
         event_service: EventService,
-        request: Request[User, Any, Any],
+        request: Request[Principal, Any, Any],
     ) -> GetUser:
         event = await event_service.get_one_or_none(code=data.event_code)
 
@@ -39,14 +39,17 @@ class AuthController(Controller):
         return users_service.to_schema(user, schema_type=GetUser)
 
     @get("/logout", exclude_from_auth=True, exclude_from_global_rate_limit=True)
-    async def logout(self, request: Request[User, Any, Any]) -> Response:
+    async def logout(self, request: Request[Principal, Any, Any]) -> Response:
+        # Stateless sessions stay valid until they expire, unless their ID is revoked
+        await session_revocations.revoke(request.session)
         request.set_session({"user_id": None})
         return Response(content=None)
 
     @get("/me")
     async def get_user(
         self,
-        request: Request[User, Any, Any],
+        request: Request[Principal, Any, Any],
         users_service: UserService,
     ) -> GetUser:
-        return users_service.to_schema(request.user, schema_type=GetUser)
+        user = await users_service.get_one(id=request.user.id)
+        return users_service.to_schema(user, schema_type=GetUser)
@@ -1,14 +1,35 @@
-from advanced_alchemy.service.pagination import OffsetPagination
-from litestar import delete, get, patch, post
+from typing import Annotated, Any
+
+from litestar import Request, delete, get, patch, post
 from litestar.controller import Controller
 from litestar.di import Provide
 from litestar.exceptions import PermissionDeniedException
+from litestar.params import Parameter
+from litestar.response import Stream
+from msgspec import UNSET, structs
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.backend.lib.dependencies import provide_event_service, provide_question_service
-from src.backend.lib.services import EventService, QuestionService
+from src.backend.lib.attendee_import import MAX_UPLOAD_SIZE, import_attendees
+from src.backend.lib.cache import question_catalog
+from src.backend.lib.dependencies import (
+    provide_event_service,
+    provide_event_whitelist_service,
+    provide_question_service,
+)
+from src.backend.lib.event_export import MEDIA_TYPES, export_event, export_filename
+from src.backend.lib.pagination import DEFAULT_PAGE_SIZE, PageSize, get_page
+from src.backend.lib.services import EventService, EventWhitelistService, QuestionService
 from src.backend.lib.utils import admin_user_guard
-from src.backend.models import Question
-from src.backend.schema.event import GetEvent, PatchEvent, PostEvent
+from src.backend.schema.event import (
+    AttendeeImport,
+    EventPage,
+    EventWhitelist,
+    ExportDataset,
+    GetEvent,
+    ImportFormat,
+    PatchEvent,
+    PostEvent,
+)
 
 MINIMUM_QUESTIONS_REQUIRED = 6
 
@@ -19,6 +40,7 @@ class EventController(Controller):
     tags = ["Events"]
     dependencies = {
         "event_service": Provide(provide_event_service),
+        "event_whitelist_service": Provide(provide_event_whitelist_service),
         "question_service": Provide(provide_question_service),
     }
 
@@ -29,9 +51,9 @@ class EventController(Controller):
         event_service: EventService,
         question_service: QuestionService,
     ) -> GetEvent:
-        questions = await question_service.list(Question.is_game_question.is_(True))
+        catalog = await question_catalog.get(question_service.list)
 
-        if len(questions) < MINIMUM_QUESTIONS_REQUIRED:
+        if len(catalog.game_question_ids) < MINIMUM_QUESTIONS_REQUIRED:
             msg = f"At least {MINIMUM_QUESTIONS_REQUIRED} questions are required to create an event."
             raise PermissionDeniedException(detail=msg)
 
@@ -42,9 +64,14 @@ class EventController(Controller):
     async def get_events(
         self,
         event_service: EventService,
-    ) -> OffsetPagination[GetEvent]:
-        events = await event_service.list()
-        return event_service.to_schema(events, schema_type=GetEvent)
+        limit: PageSize = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+    ) -> EventPage:
+        events, next_cursor = await get_page(event_service, limit=limit, cursor=cursor)
+        return EventPage(
+            items=event_service.to_schema(events, schema_type=GetEvent).items,
+            next_cursor=next_cursor,
+        )
 
     @get("/{event_id:int}")
     async def get_event(
@@ -61,13 +88,63 @@ class EventController(Controller):
         event_id: int,
         data: PatchEvent,
         event_service: EventService,
+        event_whitelist_service: EventWhitelistService,
     ) -> GetEvent:
         event = await event_service.update(
             item_id=event_id,
-            data=data,
+            data=structs.replace(data, whitelist=UNSET),
         )
+
+        if data.whitelist is not UNSET:
+            await event_whitelist_service.replace_emails(event_id, data.whitelist.emails)
+
         return event_service.to_schema(event, schema_type=GetEvent)
 
+    @get("/{event_id:int}/whitelist")
+    async def get_event_whitelist(
+        self,
+        event_id: int,
+        event_service: EventService,
+        event_whitelist_service: EventWhitelistService,
+    ) -> EventWhitelist:
+        await event_service.get_one(id=event_id)
+        return EventWhitelist(emails=await event_whitelist_service.list_emails(event_id))
+
+    # The CSV or NDJSON body is validated and copied into the database as it is uploaded
+    @post("/{event_id:int}/import", status_code=200, request_max_body_size=MAX_UPLOAD_SIZE)
+    async def import_event_attendees(
+        self,
+        event_id: int,
+        request: Request[Any, Any, Any],
+        db_session: AsyncSession,
+        event_service: EventService,
+        import_format: Annotated[ImportFormat, Parameter(query="format")] = ImportFormat.CSV,
+    ) -> AttendeeImport:
+        await event_service.get_one(id=event_id)
+        return await import_attendees(
+            db_session,
+            event_id=event_id,
+            chunks=request.stream(),
+            import_format=import_format,
+        )
+
+    # Rows are read through a server-side cursor and sent as they are encoded, the export starts straight away
+    @get("/{event_id:int}/export/{dataset:str}")
+    async def export_event_data(
+        self,
+        event_id: int,
+        dataset: ExportDataset,
+        event_service: EventService,
+        export_format: Annotated[ImportFormat, Parameter(query="format")] = ImportFormat.CSV,
+    ) -> Stream:
+        await event_service.get_one(id=event_id)
+        filename = export_filename(event_id, dataset, export_format)
+        return Stream(
+            export_event(event_id=event_id, dataset=dataset, export_format=export_format),
+            media_type=MEDIA_TYPES[export_format],
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
     @delete("/{event_id:int}", status_code=200)
     async def delete_event(
         self,
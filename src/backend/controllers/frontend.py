@@ -1,21 +1,34 @@
-import anyio
-from litestar import Controller, MediaType, Response, get
+from litestar import Controller, Request, Response, get
 from litestar.status_codes import HTTP_200_OK
 
+from src.backend.lib.static import SpaShell, StaticAssets
 from src.backend.settings import get_settings
 
+settings = get_settings()
+
+spa_shell = SpaShell(
+    settings.vite.root_dir / "index.html" if settings.debug else settings.vite.bundle_dir / "index.html",
+    reload=settings.debug,
+)
+
+static_assets = StaticAssets(settings.vite.bundle_dir)
+
 
 class WebController(Controller):
-    opt = {"exclude_from_auth": True}
+    opt = {"exclude_from_auth": True, "skip_compression": True}
     include_in_schema = False
 
     @get(["/", "/{path:path}"], operation_id="WebIndex", status_code=HTTP_200_OK)
-    async def index(self) -> Response[str]:
-        settings = get_settings()
+    async def index(self, request: Request) -> Response[bytes]:
+        return spa_shell.respond(request)
 
-        file_path = (
-            anyio.Path("src/frontend/index.html") if settings.debug else anyio.Path("src/backend/web/static/index.html")
-        )
 
-        async with await anyio.open_file(file_path) as file:
-            return Response(content=await file.read(), status_code=HTTP_200_OK, media_type=MediaType.HTML)
+# Only registered outside of debug mode, where the Vite plugin serves the source tree instead
+class StaticController(Controller):
+    path = settings.vite.asset_url
+    opt = {"exclude_from_auth": True, "skip_compression": True}
+    include_in_schema = False
+
+    @get("/{file_path:path}", operation_id="WebStatic")
+    async def asset(self, request: Request, file_path: str) -> Response:
+        return static_assets.respond(request, file_path)
@@ -1,13 +1,28 @@
 import random
-from typing import Any
+from typing import Annotated, Any
 
-from advanced_alchemy.filters import LimitOffset
 from litestar import Request, get, post
 from litestar.controller import Controller
 from litestar.di import Provide
 from litestar.exceptions import ClientException, NotAuthorizedException, NotFoundException, PermissionDeniedException
-
-from src.backend.config import one_rpm_rate_limit_config
+from litestar.params import Parameter
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.backend.lib.analytics import (
+    get_event_analytics,
+    record_answer,
+    record_cancellations,
+    record_completion,
+    record_scan,
+)
+from src.backend.lib.cache import (
+    ActiveConnection,
+    cache_active_connection,
+    clear_active_connection,
+    get_active_connection,
+    question_catalog,
+)
 from src.backend.lib.dependencies import (
     provide_connection_question_service,
     provide_connection_service,
@@ -16,6 +31,16 @@ from src.backend.lib.dependencies import (
     provide_user_answer_service,
     provide_user_service,
 )
+from src.backend.lib.game_log import game_log
+from src.backend.lib.leaderboard import (
+    count_players,
+    get_leaderboard_around,
+    get_leaderboard_page,
+    rebuild_leaderboard,
+    record_connection,
+    record_points,
+)
+from src.backend.lib.principal import Principal
 from src.backend.lib.services import (
     ConnectionQuestionService,
     ConnectionService,
@@ -29,7 +54,7 @@ from src.backend.models import (
     Connection,
     ConnectionQuestion,
     ConnectionStatus,
-    Question,
+    GameLogKind,
     QuestionType,
     User,
     UserStatus,
@@ -37,13 +62,13 @@ from src.backend.models import (
 from src.backend.schema.event import GetEvent
 from src.backend.schema.game import (
     ConnectionQuestionData,
+    EventAnalytics,
     GameChatRequest,
     GameQuestionResponse,
     GameStartRequest,
     GameStatus,
     GameStopRequest,
     Leaderboard,
-    LeaderboardEntry,
     QRScanRequest,
     QuestionResult,
 )
@@ -69,14 +94,17 @@ class GameController(Controller):
         self,
         data: GameStartRequest,
         event_service: EventService,
+        user_service: UserService,
     ) -> GetEvent:
         event = await event_service.update(item_id=data.event_id, data={"is_active": True})
+        await rebuild_leaderboard(event.id, await user_service.list(event_id=event.id, is_admin=False))
         return event_service.to_schema(event, schema_type=GetEvent)
 
     @post("/stop", guards=[admin_user_guard])
     async def stop_game(
         self,
         data: GameStopRequest,
+        db_session: AsyncSession,
         event_service: EventService,
         connection_service: ConnectionService,
         user_service: UserService,
@@ -104,6 +132,14 @@ class GameController(Controller):
         await connection_service.update_many(connection_data)
         await user_service.update_many(user_data)
 
+        # The active connection cache is only cleared once the cancellations are committed
+        await db_session.commit()
+        await clear_active_connection(*(item["id"] for item in user_data))
+        if connection_data:
+            await record_cancellations(data.event_id, len(connection_data))
+        for conn in pending_connections:
+            await game_log.record(GameLogKind.CANCELLED, event_id=data.event_id, connection_id=conn.id)
+
         return event_service.to_schema(event, schema_type=GetEvent)
 
     @get("/leaderboard/{event_id:int}", guards=[admin_user_guard])
@@ -111,60 +147,67 @@ class GameController(Controller):
         self,
         event_id: int,
         event_service: EventService,
-        user_service: UserService,
+        db_session: AsyncSession,
+        limit: Annotated[int, Parameter(ge=1, le=100)] = 10,
+        cursor: str | None = None,
     ) -> Leaderboard:
         event = await event_service.get_one(id=event_id)
 
-        users = await user_service.list(
-            LimitOffset(limit=10, offset=0),
-            order_by=[
-                User.points.desc(),
-                User.connection_count.desc(),
-                User.name.asc(),
-            ],
-            event_id=event_id,
-            is_admin=False,
-        )
-
-        # Create leaderboard entries with rank
-        entries = []
-        current_rank = 1
-        for i, user in enumerate(users):
-            # Handle ties - users with same points and connections get same rank
-            if i > 0:
-                prev_user = users[i - 1]
-                if user.points != prev_user.points or user.connection_count != prev_user.connection_count:
-                    current_rank = i + 1
-
-            entries.append(
-                LeaderboardEntry(
-                    id=user.id,
-                    name=user.name,
-                    email=user.email,
-                    points=user.points,
-                    connection_count=user.connection_count,
-                    rank=current_rank,
-                ),
-            )
+        entries, next_cursor = await get_leaderboard_page(db_session, event_id, limit=limit, cursor=cursor)
 
         return Leaderboard(
             event_id=event.id,
             event_name=event.name,
             entries=entries,
-            total_users=len(entries),
+            total_users=await count_players(db_session, event_id),
+            next_cursor=next_cursor,
         )
 
+    @get("/leaderboard/{event_id:int}/around/{user_id:int}", guards=[admin_user_guard])
+    async def get_leaderboard_around_user(
+        self,
+        event_id: int,
+        user_id: int,
+        event_service: EventService,
+        db_session: AsyncSession,
+        size: Annotated[int, Parameter(ge=1, le=50)] = 5,
+    ) -> Leaderboard:
+        event = await event_service.get_one(id=event_id)
+
+        entries, next_cursor = await get_leaderboard_around(db_session, event_id, user_id, size=size)
+        if not entries:
+            raise NotFoundException(detail="User is not on this leaderboard")
+
+        return Leaderboard(
+            event_id=event.id,
+            event_name=event.name,
+            entries=entries,
+            total_users=await count_players(db_session, event_id),
+            next_cursor=next_cursor,
+        )
+
+    # Aggregated as the game goes, reading them doesn't scan the connections
+    @get("/analytics/{event_id:int}", guards=[admin_user_guard])
+    async def get_analytics(
+        self,
+        event_id: int,
+        event_service: EventService,
+        question_service: QuestionService,
+    ) -> EventAnalytics:
+        await event_service.get_one(id=event_id)
+        return await get_event_analytics(event_id, await question_catalog.get(question_service.list))
+
     # User
-    @get("/status")
+    @get("/status", query_budget=3)
     async def get_game_status(
         self,
-        request: Request[User, Any, Any],
+        request: Request[Principal, Any, Any],
         user_service: UserService,
         question_service: QuestionService,
         connection_service: ConnectionService,
         connection_question_service: ConnectionQuestionService,
     ) -> GameStatus:
-        user: User = request.user
+        user: Principal = request.user
 
         # Get user's current active connection
         current_connection = await self._get_user_active_connection(
@@ -178,14 +221,11 @@ class GameController(Controller):
 
         if current_connection:
             # Determine if user should show QR code (user1) or scan (user2)
-            if current_connection.user1_id == user.id:
+            if current_connection.is_presenter:
                 qr_code = user.qr_code
 
             # Get partner's name
-            partner_id = (
-                current_connection.user2_id if current_connection.user1_id == user.id else current_connection.user1_id
-            )
-            partner = await user_service.get_one(id=partner_id)
+            partner = await user_service.get_one(id=current_connection.partner_id)
 
             partner_name = partner.name
 
@@ -204,17 +244,18 @@ class GameController(Controller):
             connection_questions=connection_questions,
         )
 
-    @post("/scan-qr")
+    @post("/scan-qr", query_budget=10)
     async def scan_qr_code(
         self,
         data: QRScanRequest,
-        request: Request[User, Any, Any],
+        request: Request[Principal, Any, Any],
+        db_session: AsyncSession,
         user_service: UserService,
         connection_service: ConnectionService,
         connection_question_service: ConnectionQuestionService,
         user_answer_service: UserAnswerService,
     ) -> None:
-        user: User = request.user
+        user: Principal = request.user
 
         # Get user's current active connection
         current_connection = await self._get_user_active_connection(
@@ -224,16 +265,16 @@ class GameController(Controller):
         )
 
         # Check if logged in user is user1 (QR giver)
-        if not current_connection or current_connection.user1_id == user.id:
+        if not current_connection or current_connection.is_presenter:
             raise NotAuthorizedException
 
         # Verify the QR code matches user1's QR code
-        user1 = await user_service.get_one(id=current_connection.user1_id)
+        user1 = await user_service.get_one(id=current_connection.partner_id)
         if user1.qr_code != data.qr_code:
             raise NotAuthorizedException(detail="Invalid QR code scanned")
 
         # Activate the connection
-        await connection_service.update(
+        connection = await connection_service.update(
             item_id=current_connection.id,
             data={"status": ConnectionStatus.ACTIVE},
         )
@@ -241,42 +282,53 @@ class GameController(Controller):
         # Set both users to busy status
         await user_service.update_many(
             [
-                {"id": current_connection.user1_id, "status": UserStatus.BUSY},
-                {"id": current_connection.user2_id, "status": UserStatus.BUSY},
+                {"id": connection.user1_id, "status": UserStatus.BUSY},
+                {"id": connection.user2_id, "status": UserStatus.BUSY},
             ],
         )
 
         # Create connection question records for both users
         await self._create_connection_questions(
-            user1_id=current_connection.user1_id,
-            user2_id=current_connection.user2_id,
-            connection_id=current_connection.id,
+            user1_id=connection.user1_id,
+            user2_id=connection.user2_id,
+            connection_id=connection.id,
             connection_question_service=connection_question_service,
             user_answer_service=user_answer_service,
         )
 
+        await db_session.commit()
+        await cache_active_connection(connection)
+        await record_scan(connection.event_id, connection.start_time)
+        await game_log.record(
+            GameLogKind.SCANNED,
+            event_id=connection.event_id,
+            connection_id=connection.id,
+            user_id=user.id,
+        )
+
         publish_to_channel(
             request=request,
-            data={"message": f"refresh-{current_connection.user1_id}"},
+            data={"message": f"refresh-{connection.user1_id}"},
             channel="game-status",
         )
         publish_to_channel(
             request=request,
-            data={"message": f"refresh-{current_connection.user2_id}"},
+            data={"message": f"refresh-{connection.user2_id}"},
             channel="game-status",
         )
 
     # Rate limit: 1 request per minute per user
-    @post("/answer-question", middleware=[one_rpm_rate_limit_config.middleware])
+    @post("/answer-question", rate_limit=("minute", 1), query_budget=8)
     async def answer_question(
         self,
         data: GameQuestionResponse,
-        request: Request[User, Any, Any],
+        request: Request[Principal, Any, Any],
+        db_session: AsyncSession,
         connection_service: ConnectionService,
         connection_question_service: ConnectionQuestionService,
         user_service: UserService,
     ) -> QuestionResult:
-        user: User = request.user
+        user: Principal = request.user
 
         # Get user's current active connection
         current_connection = await self._get_user_active_connection(
@@ -308,10 +360,7 @@ class GameController(Controller):
             )
 
         # Get the other user's answer to this question
-        other_user_id = (
-            current_connection.user2_id if current_connection.user1_id == user.id else current_connection.user1_id
-        )
-        other_user = await user_service.get_one(id=other_user_id, load=[User.answers])
+        other_user = await user_service.get_one(id=current_connection.partner_id, load=[User.answers])
 
         other_user_answer = None
         for answer in other_user.answers:
@@ -336,30 +385,42 @@ class GameController(Controller):
             },
         )
 
-        # Award points to both users if correct
+        # Award points to both users if correct, incremented in SQL since the principal doesn't carry points
         if is_correct:
-            await user_service.update_many(
-                data=[
-                    {"id": user.id, "points": user.points + 1},
-                    {"id": other_user.id, "points": other_user.points + 1},
-                ],
+            await user_service.repository.session.execute(
+                update(User).where(User.id.in_([user.id, other_user.id])).values(points=User.points + 1),
             )
 
+        # Only scored, counted and logged once the answer is committed
+        await db_session.commit()
+        if is_correct:
+            await record_points(other_user.event_id, user.id, other_user.id)
+        await record_answer(other_user.event_id, data.question_id, correct=is_correct)
+        await game_log.record(
+            GameLogKind.ANSWERED,
+            event_id=other_user.event_id,
+            connection_id=current_connection.id,
+            user_id=user.id,
+            question_id=data.question_id,
+            answered_correctly=is_correct,
+        )
+
         return QuestionResult(
             correct=is_correct,
             expected_answer=other_user_answer.replace(" ::: ", ", "),
             your_answer=data.answer.replace(" ::: ", ", "),
         )
 
-    @post("/complete-connection")
+    @post("/complete-connection", query_budget=8)
     async def complete_connection(
         self,
-        request: Request[User, Any, Any],
+        request: Request[Principal, Any, Any],
+        db_session: AsyncSession,
         connection_service: ConnectionService,
         connection_question_service: ConnectionQuestionService,
         user_service: UserService,
     ) -> None:
-        user: User = request.user
+        user: Principal = request.user
 
         # Get user's current active connection
         current_connection = await self._get_user_active_connection(
@@ -392,43 +453,54 @@ class GameController(Controller):
         )
 
         # Update connection counts and set users back to available
-        user1 = await user_service.get_one(id=current_connection.user1_id)
-        user2 = await user_service.get_one(id=current_connection.user2_id)
+        current_user = await user_service.get_one(id=user.id)
+        partner = await user_service.get_one(id=current_connection.partner_id)
 
         await user_service.update_many(
             data=[
                 {
-                    "id": current_connection.user1_id,
+                    "id": current_user.id,
                     "status": UserStatus.AVAILABLE,
-                    "connection_count": user1.connection_count + 1,
+                    "connection_count": current_user.connection_count + 1,
                 },
                 {
-                    "id": current_connection.user2_id,
+                    "id": partner.id,
                     "status": UserStatus.AVAILABLE,
-                    "connection_count": user2.connection_count + 1,
+                    "connection_count": partner.connection_count + 1,
                 },
             ],
         )
+        await db_session.commit()
+        await clear_active_connection(current_user.id, partner.id)
+        await record_connection(current_user.event_id, current_user.id, partner.id)
+        await record_completion(current_user.event_id)
+        await game_log.record(
+            GameLogKind.COMPLETED,
+            event_id=current_user.event_id,
+            connection_id=current_connection.id,
+            user_id=user.id,
+        )
 
         publish_to_channel(
             request=request,
-            data={"message": f"refresh-{current_connection.user1_id}"},
+            data={"message": f"refresh-{current_user.id}"},
             channel="game-status",
         )
         publish_to_channel(
             request=request,
-            data={"message": f"refresh-{current_connection.user2_id}"},
+            data={"message": f"refresh-{partner.id}"},
             channel="game-status",
         )
 
-    @post("/cancel-connection")
+    @post("/cancel-connection", query_budget=4)
     async def cancel_connection(
         self,
-        request: Request[User, Any, Any],
+        request: Request[Principal, Any, Any],
+        db_session: AsyncSession,
         connection_service: ConnectionService,
         user_service: UserService,
     ) -> None:
-        user: User = request.user
+        user: Principal = request.user
 
         # Get user's current active connection
         current_connection = await self._get_user_active_connection(
@@ -458,46 +530,52 @@ class GameController(Controller):
         await user_service.update_many(
             data=[
                 {
-                    "id": current_connection.user1_id,
+                    "id": user.id,
                     "status": UserStatus.AVAILABLE,
                 },
                 {
-                    "id": current_connection.user2_id,
+                    "id": current_connection.partner_id,
                     "status": UserStatus.AVAILABLE,
                 },
             ],
         )
+        await db_session.commit()
+        await clear_active_connection(user.id, current_connection.partner_id)
+        await record_cancellations(user.event_id)
+        await game_log.record(
+            GameLogKind.CANCELLED,
+            event_id=user.event_id,
+            connection_id=current_connection.id,
+            user_id=user.id,
+        )
 
         # Send notification popup to other user
-        other_user_id = (
-            current_connection.user2_id if current_connection.user1_id == user.id else current_connection.user1_id
-        )
         publish_to_channel(
             request=request,
-            data={"message": f"cancelled-{other_user_id}"},
+            data={"message": f"cancelled-{current_connection.partner_id}"},
             channel="game-status",
         )
 
         # Refresh game status for both users
         publish_to_channel(
             request=request,
-            data={"message": f"refresh-{current_connection.user1_id}"},
+            data={"message": f"refresh-{user.id}"},
             channel="game-status",
         )
         publish_to_channel(
             request=request,
-            data={"message": f"refresh-{current_connection.user2_id}"},
+            data={"message": f"refresh-{current_connection.partner_id}"},
             channel="game-status",
         )
 
-    @post("/chat")
+    @post("/chat", query_budget=2)
     async def chat(
         self,
         data: GameChatRequest,
-        request: Request[User, Any, Any],
+        request: Request[Principal, Any, Any],
         connection_service: ConnectionService,
     ) -> None:
-        user: User = request.user
+        user: Principal = request.user
 
         # Get user's current connection
         current_connection = await self._get_user_active_connection(
@@ -511,14 +589,10 @@ class GameController(Controller):
                 detail="No connection found",
             )
 
-        other_user_id = (
-            current_connection.user2_id if current_connection.user1_id == user.id else current_connection.user1_id
-        )
-
         publish_to_channel(
             request=request,
             data={"message": data.message},
-            channel=str(other_user_id),
+            channel=str(current_connection.partner_id),
         )
 
     async def _get_user_connection_questions(
@@ -538,12 +612,8 @@ class GameController(Controller):
         if not user_connection_questions:
             return []
 
-        # Get question details for each connection question
-        question_ids = [cq.question_id for cq in user_connection_questions]
-        questions = await question_service.list(Question.id.in_(question_ids))
-
-        # Create a mapping of question_id to question details
-        question_map = {q.id: q for q in questions}
+        # Question details come from the catalog, keyed by question ID
+        question_map = (await question_catalog.get(question_service.list)).questions
 
         return [
             ConnectionQuestionData(
@@ -559,7 +629,11 @@ class GameController(Controller):
                     if cq.question_id in question_map
                     else QuestionType.DEFAULT
                 ),
-                options=(question_map[cq.question_id].options if cq.question_id in question_map else None),
+                options=(
+                    list(options)
+                    if cq.question_id in question_map and (options := question_map[cq.question_id].options) is not None
+                    else None
+                ),
                 question_answered=cq.question_answered,
                 answered_correctly=cq.answered_correctly,
             )
@@ -650,19 +724,22 @@ class GameController(Controller):
         user_id: int,
         event_id: int | None,
         connection_service: ConnectionService,
-    ) -> Connection | None:
-        # Check as user1
-        connection = await connection_service.get_one_or_none(
-            Connection.status.in_([ConnectionStatus.PENDING, ConnectionStatus.ACTIVE]),
-            user1_id=user_id,
-            event_id=event_id,
-        )
-        if connection:
-            return connection
+    ) -> ActiveConnection | None:
+        async def _load_connection() -> Connection | None:
+            # Check as user1
+            connection = await connection_service.get_one_or_none(
+                Connection.status.in_([ConnectionStatus.PENDING, ConnectionStatus.ACTIVE]),
+                user1_id=user_id,
+                event_id=event_id,
+            )
+            if connection:
+                return connection
+
+            # Check as user2
+            return await connection_service.get_one_or_none(
+                Connection.status.in_([ConnectionStatus.PENDING, ConnectionStatus.ACTIVE]),
+                user2_id=user_id,
+                event_id=event_id,
+            )
 
-        # Check as user2
-        return await connection_service.get_one_or_none(
-            Connection.status.in_([ConnectionStatus.PENDING, ConnectionStatus.ACTIVE]),
-            user2_id=user_id,
-            event_id=event_id,
-        )
+        return await get_active_connection(user_id, _load_connection)
@@ -1,11 +1,13 @@
-from advanced_alchemy.filters import LimitOffset, OrderBy
+from typing import Any
+
+import msgspec
 from advanced_alchemy.service.pagination import OffsetPagination
-from litestar import delete, get, patch, post
+from litestar import Request, Response, delete, get, patch, post
 from litestar.controller import Controller
 from litestar.di import Provide
-from sqlalchemy import func
+from litestar.status_codes import HTTP_304_NOT_MODIFIED
 
-from src.backend.config import five_rpm_rate_limit_config
+from src.backend.lib.cache import question_catalog
 from src.backend.lib.dependencies import provide_question_service
 from src.backend.lib.services import QuestionService
 from src.backend.lib.utils import admin_user_guard
@@ -28,28 +30,34 @@ class QuestionController(Controller):
         question = await question_service.create(data)
         return question_service.to_schema(question, schema_type=GetQuestion)
 
-    @get(exclude_from_auth=True, middleware=[five_rpm_rate_limit_config.middleware])
+    # Served from the question catalog. Samples are never cached, the full listing is revalidated with its ETag.
+    @get(exclude_from_auth=True, rate_limit=("minute", 5))
     async def get_questions(
         self,
+        request: Request[Any, Any, Any],
         question_service: QuestionService,
         limit: int = 10,
         onboarding: bool = False,
-    ) -> OffsetPagination[GetQuestion]:
+    ) -> Response[OffsetPagination[GetQuestion]]:
+        catalog = await question_catalog.get(question_service.list)
+
         if limit < 0:  # If limit is negative, return all questions
-            questions = await question_service.list()
-        elif onboarding:  # If onboarding is true, keep the signup questions first
-            questions = await question_service.list(
-                OrderBy("is_signup_question", "desc"),
-                OrderBy("is_game_question", "asc"),
-                OrderBy(func.random()),  # pyright: ignore[reportArgumentType]
-                LimitOffset(limit=limit, offset=0),
-            )
-        else:
-            questions = await question_service.list(
-                OrderBy(func.random()),  # pyright: ignore[reportArgumentType]
-                LimitOffset(limit=limit, offset=0),
-            )
-        return question_service.to_schema(questions, schema_type=GetQuestion)
+            etag = f'"{catalog.etag}"'
+            headers = {"Cache-Control": "no-cache", "ETag": etag}
+            if request.headers.get("If-None-Match") == etag:
+                return Response(content=None, status_code=HTTP_304_NOT_MODIFIED, headers=headers)  # type: ignore[return-value]
+
+            questions = catalog.listing
+            limit = len(questions)
+        else:  # If onboarding is true, keep the signup questions first
+            headers = {"Cache-Control": "no-store"}
+            questions = catalog.sample(limit, onboarding=onboarding)
+
+        items = msgspec.convert(questions, list[GetQuestion], from_attributes=True)
+        return Response(
+            content=OffsetPagination(items=items, limit=limit, offset=0, total=len(items)),
+            headers=headers,
+        )
 
     @get("/{question_id:int}", guards=[admin_user_guard])
     async def get_question(
@@ -1,22 +1,28 @@
 from typing import Any
 
-from advanced_alchemy.service.pagination import OffsetPagination
 from litestar import Request, delete, get, patch, post
 from litestar.controller import Controller
 from litestar.di import Provide
-from litestar.exceptions import NotAuthorizedException, PermissionDeniedException
+from litestar.exceptions import ClientException, NotAuthorizedException, NotFoundException, PermissionDeniedException
+from litestar.status_codes import HTTP_409_CONFLICT
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.backend.config import five_rpm_rate_limit_config
+from src.backend.lib.cache import question_catalog
 from src.backend.lib.dependencies import (
-    provide_event_service,
+    provide_event_whitelist_service,
     provide_question_service,
-    provide_user_answer_service,
     provide_user_service,
 )
-from src.backend.lib.services import EventService, QuestionService, UserAnswerService, UserService
+from src.backend.lib.leaderboard import remove_player, store_player
+from src.backend.lib.pagination import DEFAULT_PAGE_SIZE, PageSize, get_page
+from src.backend.lib.principal import Principal
+from src.backend.lib.services import (
+    EventWhitelistService,
+    QuestionService,
+    UserService,
+)
 from src.backend.lib.utils import admin_user_guard
-from src.backend.models import Question, User
-from src.backend.schema.user import GetUser, PatchUser, PostUser
+from src.backend.schema.user import GetUser, PatchUser, PostUser, UserPage
 
 
 class UserController(Controller):
@@ -24,24 +30,26 @@ class UserController(Controller):
     tags = ["Users"]
     dependencies = {
         "user_service": Provide(provide_user_service),
-        "event_service": Provide(provide_event_service),
+        "event_whitelist_service": Provide(provide_event_whitelist_service),
         "question_service": Provide(provide_question_service),
-        "user_answer_service": Provide(provide_user_answer_service),
     }
 
-    @post(exclude_from_auth=True, middleware=[five_rpm_rate_limit_config.middleware])
+    # Two round trips, the event with the whitelist check and the user with their answers
+    @post(exclude_from_auth=True, rate_limit=("minute", 5))
     async def post_user(
         self,
         data: PostUser,
+        db_session: AsyncSession,
         user_service: UserService,
-        event_service: EventService,
+        event_whitelist_service: EventWhitelistService,
         question_service: QuestionService,
-        user_answer_service: UserAnswerService,
     ) -> GetUser:
-        event = await event_service.get_one(code=data.event_code)
-        whitelist = event.whitelist.get("emails", [])
+        signup_event = await event_whitelist_service.get_signup_event(data.event_code, data.email)
+        if not signup_event:
+            raise NotFoundException("No event found with the given code.")
 
-        if data.email not in whitelist:
+        event_id, is_whitelisted = signup_event
+        if not is_whitelisted:
             raise PermissionDeniedException("Your email is not whitelisted for this event.")
 
         user_answers_questions_ids = [answer.question_id for answer in data.user_answer]
@@ -51,34 +59,24 @@ class UserController(Controller):
         if len(user_answers_questions_ids_set) != len(user_answers_questions_ids):
             raise PermissionDeniedException("You cannot answer the same question twice.")
 
-        signup_questions = await question_service.list(
-            Question.id.in_(user_answers_questions_ids_set),
-            Question.is_signup_question.is_(True),
-        )
-        signup_questions_ids = {question.id for question in signup_questions}
+        catalog = await question_catalog.get(question_service.list)
 
         # Validate that all answered questions exist in the database
-        if not user_answers_questions_ids_set.issubset(signup_questions_ids):
+        if not user_answers_questions_ids_set.issubset(catalog.signup_question_ids):
             raise PermissionDeniedException("Some of the answered questions do not exist.")
 
-        user = await user_service.create(
-            data={
-                "name": data.name,
-                "email": data.email,
-                "event_id": event.id,
-            },
+        user = await user_service.sign_up(
+            event_id=event_id,
+            name=data.name,
+            email=data.email,
+            answers=[(answer.question_id, answer.answer) for answer in data.user_answer],
         )
+        if not user:
+            raise ClientException("You have already signed up for this event.", status_code=HTTP_409_CONFLICT)
 
-        await user_answer_service.create_many(
-            [
-                {
-                    "answer": answer.answer,
-                    "user_id": user.id,
-                    "question_id": answer.question_id,
-                }
-                for answer in data.user_answer
-            ],
-        )
+        # The leaderboard only sees committed players
+        await db_session.commit()
+        await store_player(user)
 
         return user_service.to_schema(user, schema_type=GetUser)
 
@@ -86,9 +84,14 @@ class UserController(Controller):
     async def get_users(
         self,
         user_service: UserService,
-    ) -> OffsetPagination[GetUser]:
-        users = await user_service.list()
-        return user_service.to_schema(users, schema_type=GetUser)
+        limit: PageSize = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+    ) -> UserPage:
+        users, next_cursor = await get_page(user_service, limit=limit, cursor=cursor)
+        return UserPage(
+            items=user_service.to_schema(users, schema_type=GetUser).items,
+            next_cursor=next_cursor,
+        )
 
     @get("/{user_id:int}", guards=[admin_user_guard])
     async def get_user(
@@ -104,8 +107,9 @@ class UserController(Controller):
         self,
         user_id: int,
         data: PatchUser,
+        db_session: AsyncSession,
         user_service: UserService,
-        request: Request[User, Any, Any],
+        request: Request[Principal, Any, Any],
     ) -> GetUser:
         if request.user.id != user_id and not request.user.is_admin:
             raise NotAuthorizedException
@@ -114,13 +118,21 @@ class UserController(Controller):
             item_id=user_id,
             data=data,
         )
+        await db_session.commit()
+        await store_player(user)
+
         return user_service.to_schema(user, schema_type=GetUser)
 
     @delete("/{user_id:int}", guards=[admin_user_guard], status_code=200)
     async def delete_user(
         self,
         user_id: int,
+        db_session: AsyncSession,
         user_service: UserService,
     ) -> GetUser:
         user = await user_service.delete(user_id)
+        await db_session.commit()
+        if user.event_id:
+            await remove_player(user.event_id, user.id)
+
         return user_service.to_schema(user, schema_type=GetUser)
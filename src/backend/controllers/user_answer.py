@@ -1,16 +1,16 @@
 from typing import Any
 
-from advanced_alchemy.service.pagination import OffsetPagination
 from litestar import Request, delete, get, patch, post
 from litestar.controller import Controller
 from litestar.di import Provide
 from litestar.exceptions import NotAuthorizedException
 
 from src.backend.lib.dependencies import provide_user_answer_service
+from src.backend.lib.pagination import DEFAULT_PAGE_SIZE, PageSize, get_page
+from src.backend.lib.principal import Principal
 from src.backend.lib.services import UserAnswerService
 from src.backend.lib.utils import admin_user_guard
-from src.backend.models import User
-from src.backend.schema.user_answer import GetUserAnswer, PatchUserAnswer, PostUserAnswer
+from src.backend.schema.user_answer import GetUserAnswer, PatchUserAnswer, PostUserAnswer, UserAnswerPage
 
 
 class UserAnswerController(Controller):
@@ -25,7 +25,7 @@ class UserAnswerController(Controller):
         self,
         data: PostUserAnswer,
         user_answer_service: UserAnswerService,
-        request: Request[User, Any, Any],
+        request: Request[Principal, Any, Any],
     ) -> GetUserAnswer:
         user_answer = await user_answer_service.create(
             data={
@@ -40,26 +40,41 @@ class UserAnswerController(Controller):
     async def get_user_answers(
         self,
         user_answer_service: UserAnswerService,
-        request: Request[User, Any, Any],
-    ) -> OffsetPagination[GetUserAnswer]:
+        request: Request[Principal, Any, Any],
+        limit: PageSize = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+    ) -> UserAnswerPage:
         # User can only see their own answers
-        user_answers = await user_answer_service.list(user_id=request.user.id)
-        return user_answer_service.to_schema(user_answers, schema_type=GetUserAnswer)
+        user_answers, next_cursor = await get_page(
+            user_answer_service,
+            limit=limit,
+            cursor=cursor,
+            user_id=request.user.id,
+        )
+        return UserAnswerPage(
+            items=user_answer_service.to_schema(user_answers, schema_type=GetUserAnswer).items,
+            next_cursor=next_cursor,
+        )
 
     @get("/all", guards=[admin_user_guard])
     async def get_all_user_answers(
         self,
         user_answer_service: UserAnswerService,
-    ) -> OffsetPagination[GetUserAnswer]:
-        user_answers = await user_answer_service.list()
-        return user_answer_service.to_schema(user_answers, schema_type=GetUserAnswer)
+        limit: PageSize = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+    ) -> UserAnswerPage:
+        user_answers, next_cursor = await get_page(user_answer_service, limit=limit, cursor=cursor)
+        return UserAnswerPage(
+            items=user_answer_service.to_schema(user_answers, schema_type=GetUserAnswer).items,
+            next_cursor=next_cursor,
+        )
 
     @get("/{user_answer_id:int}")
     async def get_user_answer(
         self,
         user_answer_id: int,
         user_answer_service: UserAnswerService,
-        request: Request[User, Any, Any],
+        request: Request[Principal, Any, Any],
     ) -> GetUserAnswer:
         user_answer = await user_answer_service.get_one(id=user_answer_id)
         # User can only access their own answers
@@ -73,7 +88,7 @@ class UserAnswerController(Controller):
         user_answer_id: int,
         data: PatchUserAnswer,
         user_answer_service: UserAnswerService,
-        request: Request[User, Any, Any],
+        request: Request[Principal, Any, Any],
     ) -> GetUserAnswer:
         # User can only update their own answers
         existing_answer = await user_answer_service.get_one(id=user_answer_id)
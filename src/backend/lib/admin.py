@@ -1,14 +1,35 @@
 from sqladmin import ModelView
 
-from src.backend.models import Connection, ConnectionQuestion, Event, Question, User, UserAnswer
+from src.backend.models import (
+    Connection,
+    ConnectionQuestion,
+    Event,
+    EventWhitelistEntry,
+    GameLogEntry,
+    Question,
+    User,
+    UserAnswer,
+)
 
 
 class EventAdminView(ModelView, model=Event):
     column_list = [Event.id, Event.name, Event.code, Event.is_active]
-    form_excluded_columns = [Event.users, Event.connections, Event.created_at, Event.updated_at]
+    form_excluded_columns = [
+        Event.users,
+        Event.connections,
+        Event.whitelist_entries,
+        Event.created_at,
+        Event.updated_at,
+    ]
     column_searchable_list = [Event.name, Event.code]
 
 
+class EventWhitelistEntryAdminView(ModelView, model=EventWhitelistEntry):
+    column_list = [EventWhitelistEntry.id, EventWhitelistEntry.email, EventWhitelistEntry.event_id]
+    form_excluded_columns = [EventWhitelistEntry.event, EventWhitelistEntry.created_at, EventWhitelistEntry.updated_at]
+    column_searchable_list = [EventWhitelistEntry.email]
+
+
 class UserAdminView(ModelView, model=User):
     column_list = [
         User.id,
@@ -100,3 +121,21 @@ class ConnectionQuestionAdminView(ModelView, model=ConnectionQuestion):
         ConnectionQuestion.updated_at,
     ]
     column_searchable_list = [ConnectionQuestion.question_answered]
+
+
+class GameLogEntryAdminView(ModelView, model=GameLogEntry):
+    # The log is append-only
+    can_create = False
+    can_edit = False
+    can_delete = False
+    column_list = [
+        GameLogEntry.id,
+        GameLogEntry.occurred_at,
+        GameLogEntry.kind,
+        GameLogEntry.event_id,
+        GameLogEntry.connection_id,
+        GameLogEntry.user_id,
+        GameLogEntry.question_id,
+        GameLogEntry.answered_correctly,
+    ]
+    column_default_sort = [(GameLogEntry.id, True)]
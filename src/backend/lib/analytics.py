@@ -0,0 +1,137 @@
+"""Per-event game analytics, aggregated in Valkey as the game goes.
+
+Every connection transition bumps counters in a hash, and pairings and completions are also counted in per-minute
+buckets. Reading the analytics is one round trip that touches a fixed number of fields, the ``connections`` and
+``connection_questions`` tables are never scanned for them.
+
+The counters start with the first transition after they were deployed and expire ``ANALYTICS_TTL`` after the last
+one.
+"""
+
+from collections.abc import Mapping
+from datetime import UTC, datetime, timedelta
+
+from src.backend.config import valkey
+from src.backend.lib.cache import QuestionCatalog
+from src.backend.schema.game import ConnectionRate, EventAnalytics, QuestionCorrectness
+
+ANALYTICS_TTL = 30 * 24 * 60 * 60
+
+# Minutes of connection rates returned
+ANALYTICS_WINDOW = 60
+
+_PAIRED = "paired"
+_SCANNED = "scanned"
+_SCAN_MS = "scan_ms"  # Sum of the milliseconds from pairing to scan
+_COMPLETED = "completed"
+_CANCELLED = "cancelled"
+_EXPIRED = "expired"
+
+
+def _keys(event_id: int) -> tuple[str, str, str, str]:
+    prefix = f"analytics:{event_id}"
+    return f"{prefix}:totals", f"{prefix}:minutes", f"{prefix}:answered", f"{prefix}:correct"
+
+
+def _minute(moment: datetime) -> int:
+    return int(moment.timestamp()) // 60
+
+
+async def _record(event_id: int, counts: Mapping[str, int], *, minute_field: str | None = None) -> None:
+    totals_key, minutes_key, *_ = _keys(event_id)
+
+    async with valkey.pipeline(transaction=False) as pipe:
+        for field, count in counts.items():
+            pipe.hincrby(totals_key, field, count)
+        pipe.expire(totals_key, ANALYTICS_TTL)
+        if minute_field:
+            pipe.hincrby(minutes_key, f"{_minute(datetime.now(UTC))}:{minute_field}", counts[minute_field])
+            pipe.expire(minutes_key, ANALYTICS_TTL)
+        await pipe.execute()
+
+
+async def record_pairings(event_id: int, count: int) -> None:
+    await _record(event_id, {_PAIRED: count}, minute_field=_PAIRED)
+
+
+async def record_scan(event_id: int, paired_at: datetime) -> None:
+    scan_ms = max(int((datetime.now(UTC) - paired_at).total_seconds() * 1000), 0)
+    await _record(event_id, {_SCANNED: 1, _SCAN_MS: scan_ms})
+
+
+async def record_completion(event_id: int) -> None:
+    await _record(event_id, {_COMPLETED: 1}, minute_field=_COMPLETED)
+
+
+async def record_cancellations(event_id: int, count: int = 1, *, expired: bool = False) -> None:
+    await _record(event_id, {_EXPIRED if expired else _CANCELLED: count})
+
+
+async def record_answer(event_id: int, question_id: int, *, correct: bool) -> None:
+    *_, answered_key, correct_key = _keys(event_id)
+
+    async with valkey.pipeline(transaction=False) as pipe:
+        pipe.hincrby(answered_key, str(question_id), 1)
+        pipe.expire(answered_key, ANALYTICS_TTL)
+        if correct:
+            pipe.hincrby(correct_key, str(question_id), 1)
+            pipe.expire(correct_key, ANALYTICS_TTL)
+        await pipe.execute()
+
+
+def _rate(count: int, total: int) -> float | None:
+    return count / total if total else None
+
+
+async def get_event_analytics(event_id: int, catalog: QuestionCatalog) -> EventAnalytics:
+    """Read the event's analytics, with question texts from ``catalog``."""
+    totals_key, minutes_key, answered_key, correct_key = _keys(event_id)
+    current = _minute(datetime.now(UTC))
+    minutes = range(current - ANALYTICS_WINDOW + 1, current + 1)
+
+    async with valkey.pipeline(transaction=False) as pipe:
+        pipe.hgetall(totals_key)
+        pipe.hmget(minutes_key, [f"{minute}:{field}" for minute in minutes for field in (_PAIRED, _COMPLETED)])
+        pipe.hgetall(answered_key)
+        pipe.hgetall(correct_key)
+        raw_totals, raw_minutes, raw_answered, raw_correct = await pipe.execute()
+
+    totals = {field.decode(): int(value) for field, value in raw_totals.items()}
+    answered = {int(question_id): int(count) for question_id, count in raw_answered.items()}
+    correct = {int(question_id): int(count) for question_id, count in raw_correct.items()}
+
+    completed, cancelled, expired = totals.get(_COMPLETED, 0), totals.get(_CANCELLED, 0), totals.get(_EXPIRED, 0)
+    finished = completed + cancelled + expired
+    scanned = totals.get(_SCANNED, 0)
+
+    counts = iter(int(count or 0) for count in raw_minutes)
+    return EventAnalytics(
+        event_id=event_id,
+        paired=totals.get(_PAIRED, 0),
+        scanned=scanned,
+        completed=completed,
+        cancelled=cancelled,
+        expired=expired,
+        completion_rate=_rate(completed, finished),
+        cancellation_rate=_rate(cancelled, finished),
+        expiry_rate=_rate(expired, finished),
+        average_seconds_to_scan=totals.get(_SCAN_MS, 0) / 1000 / scanned if scanned else None,
+        connections_per_minute=[
+            ConnectionRate(
+                minute=datetime.fromtimestamp(0, UTC) + timedelta(minutes=minute),
+                paired=next(counts),
+                completed=next(counts),
+            )
+            for minute in minutes
+        ],
+        questions=[
+            QuestionCorrectness(
+                question_id=question_id,
+                question=question.question if (question := catalog.questions.get(question_id)) else "Unknown question",
+                answered=count,
+                correct=correct.get(question_id, 0),
+                correct_rate=correct.get(question_id, 0) / count,
+            )
+            for question_id, count in sorted(answered.items())
+        ],
+    )
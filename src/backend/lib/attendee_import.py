@@ -0,0 +1,294 @@
+"""Bulk import of whitelisted emails and pre-registered attendees.
+
+Rows are parsed and validated as the CSV or NDJSON upload streams in, and valid rows are written straight into a
+temporary table with ``COPY``. Only a fixed number of rows is ever held in memory. Two set-based statements then
+move the staged rows into the real tables, so an import costs a few statements however many rows it has.
+
+Every row whitelists its email for the event. A row that also has a name and a full set of signup answers signs
+the attendee up as well, as if they had gone through the signup form. A row that repeats an email only counts once,
+the first occurrence wins.
+
+CSV files have an ``email`` column, an optional ``name`` column and one column per signup question, named by the
+question ID and holding the answer. NDJSON lines are ``AttendeeImportRow`` objects.
+"""
+
+import codecs
+import csv
+from collections.abc import AsyncIterable, AsyncIterator
+
+import anyio
+import msgspec
+from litestar.exceptions import ClientException
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.backend.lib.leaderboard import invalidate_leaderboard
+from src.backend.models import Question
+from src.backend.schema.event import AttendeeImport, AttendeeImportError, AttendeeImportRow, ImportFormat
+from src.backend.schema.user import SIGNUP_ANSWER_COUNT
+
+# Uploads are read in chunks of this size by the CLI
+CHUNK_SIZE = 64 * 1024
+
+# Largest upload accepted by the admin endpoint, well above 50k attendees with all their answers
+MAX_UPLOAD_SIZE = 256 * 1024 * 1024
+
+# Only the first rejected rows are reported back, the rest are counted
+MAX_REPORTED_ERRORS = 100
+
+_EMAIL_COLUMN = "email"
+_NAME_COLUMN = "name"
+
+_decoder = msgspec.json.Decoder(AttendeeImportRow)
+_encoder = msgspec.json.Encoder()
+
+type _ParsedRow = tuple[int, AttendeeImportRow | str]
+
+_STAGING_TABLE = "attendee_import"
+
+_WHITELIST_SQL = text(
+    "INSERT INTO event_whitelist (event_id, email, created_at, updated_at) "
+    "SELECT DISTINCT :event_id, email, now(), now() FROM attendee_import "
+    "ON CONFLICT ON CONSTRAINT uq_event_whitelist_email DO NOTHING",
+)
+
+# Users that already signed up keep their answers, only the newly created users get the staged ones
+_ATTENDEES_SQL = text(
+    "WITH attendees AS ("
+    "  SELECT DISTINCT ON (email) email, name, answers FROM attendee_import "
+    "  WHERE answers IS NOT NULL ORDER BY email, line"
+    "), created AS ("
+    "  INSERT INTO users "
+    "  (name, email, points, qr_code, connection_count, status, is_admin, event_id, created_at, updated_at) "
+    "  SELECT name, email, 0, replace(gen_random_uuid()::text, '-', ''), 0, 'AVAILABLE', false, :event_id, "
+    "  now(), now() FROM attendees "
+    "  ON CONFLICT ON CONSTRAINT uq_user_email_event DO NOTHING "
+    "  RETURNING id, email"
+    "), answers AS ("
+    "  INSERT INTO user_answers (answer, user_id, question_id, created_at, updated_at) "
+    "  SELECT answer.value, created.id, answer.key::bigint, now(), now() "
+    "  FROM created JOIN attendees USING (email), jsonb_each_text(attendees.answers) AS answer "
+    "  RETURNING 1"
+    ") "
+    "SELECT (SELECT count(*) FROM created), (SELECT count(*) FROM answers)",
+)
+
+
+# ---------
+# Parsing
+# ---------
+
+
+async def _lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[tuple[int, str]]:
+    """Split the upload into numbered lines, without their line endings."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    line_number = 0
+
+    async for chunk in chunks:
+        try:
+            buffer += decoder.decode(chunk)
+        except UnicodeDecodeError as e:
+            msg = f"The file is not valid UTF-8 after line {line_number}"
+            raise ClientException(detail=msg) from e
+
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            line_number += 1
+            yield line_number, line.removesuffix("\r")
+
+    if buffer := buffer + decoder.decode(b"", final=True):
+        yield line_number + 1, buffer.removesuffix("\r")
+
+
+def _csv_header(header: list[str]) -> list[int | str]:
+    columns: list[int | str] = []
+    for column in (column.strip().lower() for column in header):
+        if column in {_EMAIL_COLUMN, _NAME_COLUMN}:
+            columns.append(column)
+        elif column.isdigit():
+            columns.append(int(column))
+        else:
+            msg = f"Unknown CSV column '{column}', expected email, name or a question ID"
+            raise ClientException(detail=msg)
+
+    if _EMAIL_COLUMN not in columns:
+        raise ClientException(detail="The CSV header has no email column")
+    if len(set(columns)) != len(columns):
+        raise ClientException(detail="The CSV header repeats a column")
+
+    return columns
+
+
+def _csv_row(columns: list[int | str], record: list[str]) -> AttendeeImportRow | str:
+    if len(record) != len(columns):
+        return f"Expected {len(columns)} columns, got {len(record)}"
+
+    values = dict(zip(columns, (value.strip() for value in record), strict=True))
+    return AttendeeImportRow(
+        email=str(values.pop(_EMAIL_COLUMN)),
+        name=str(values.pop(_NAME_COLUMN, "")) or None,
+        answers={question_id: answer for question_id, answer in values.items() if answer},  # type: ignore[misc]
+    )
+
+
+async def _parse_csv(chunks: AsyncIterable[bytes]) -> AsyncIterator[_ParsedRow]:
+    columns: list[int | str] | None = None
+    record_lines: list[str] = []
+    first_line = quotes = 0
+
+    async for line_number, line in _lines(chunks):
+        if not record_lines:
+            if not line.strip():
+                continue
+            first_line = line_number
+
+        # A quoted field continues on the next line while the record has an odd number of quotes
+        record_lines.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+
+        source = "\n".join(record_lines)
+        record_lines, quotes = [], 0
+        try:
+            record = next(csv.reader([source]))
+        except csv.Error as e:
+            if columns is None:
+                msg = f"Malformed CSV header, {e}"
+                raise ClientException(detail=msg) from e
+            yield first_line, f"Malformed CSV, {e}"
+            continue
+
+        if columns is None:
+            columns = _csv_header(record)
+            continue
+
+        yield first_line, _csv_row(columns, record)
+
+    if record_lines:
+        yield first_line, "Unterminated quoted field"
+    if columns is None:
+        raise ClientException(detail="The CSV file is empty")
+
+
+async def _parse_ndjson(chunks: AsyncIterable[bytes]) -> AsyncIterator[_ParsedRow]:
+    async for line_number, line in _lines(chunks):
+        if not line.strip():
+            continue
+
+        try:
+            row = _decoder.decode(line)
+        except msgspec.DecodeError as e:
+            yield line_number, str(e)
+            continue
+
+        yield line_number, row
+
+
+def _validate(row: AttendeeImportRow, signup_question_ids: frozenset[int]) -> str | None:
+    if not row.email.strip():
+        return "Missing email"
+    if not row.answers:
+        return None
+
+    if not row.name or not row.name.strip():
+        return "Signup answers need a name"
+    if len(row.answers) != SIGNUP_ANSWER_COUNT:
+        return f"Expected {SIGNUP_ANSWER_COUNT} signup answers, got {len(row.answers)}"
+    if unknown := sorted(row.answers.keys() - signup_question_ids):
+        return f"Not signup questions: {', '.join(map(str, unknown))}"
+    if any(not answer.strip() for answer in row.answers.values()):
+        return "Signup answers can't be empty"
+
+    return None
+
+
+# ---------
+# Import
+# ---------
+
+
+async def _signup_question_ids(db_session: AsyncSession) -> frozenset[int]:
+    result = await db_session.scalars(select(Question.id).where(Question.is_signup_question.is_(True)))
+    return frozenset(result)
+
+
+async def import_attendees(
+    db_session: AsyncSession,
+    *,
+    event_id: int,
+    chunks: AsyncIterable[bytes],
+    import_format: ImportFormat,
+) -> AttendeeImport:
+    """Stream an upload of attendees into the event's whitelist and users.
+
+    Rejected rows are skipped and reported, the valid rows are imported in one transaction that is committed
+    before the event's leaderboard is rebuilt.
+
+    Returns:
+        The import counts and the first rejected rows.
+
+    """
+    signup_question_ids = await _signup_question_ids(db_session)
+    rows = _parse_csv(chunks) if import_format is ImportFormat.CSV else _parse_ndjson(chunks)
+
+    await db_session.execute(
+        text(
+            f"CREATE TEMPORARY TABLE {_STAGING_TABLE} (line integer, email text, name text, answers jsonb) "
+            "ON COMMIT DROP",
+        ),
+    )
+
+    total = rejected = 0
+    errors: list[AttendeeImportError] = []
+
+    connection = await (await db_session.connection()).get_raw_connection()
+    async with (
+        connection.driver_connection.cursor() as cursor,
+        cursor.copy(f"COPY {_STAGING_TABLE} (line, email, name, answers) FROM STDIN") as copy,
+    ):
+        async for line, row in rows:
+            total += 1
+            if isinstance(row, AttendeeImportRow) and (error := _validate(row, signup_question_ids)) is None:
+                # Rows without answers only whitelist their email
+                await copy.write_row(
+                    (
+                        line,
+                        row.email.strip(),
+                        row.name.strip() if row.answers and row.name else None,
+                        _encoder.encode(row.answers).decode() if row.answers else None,
+                    ),
+                )
+                continue
+
+            rejected += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append(AttendeeImportError(line=line, detail=row if isinstance(row, str) else error))
+
+    whitelisted = await db_session.execute(_WHITELIST_SQL, {"event_id": event_id})
+    attendees, answers = (await db_session.execute(_ATTENDEES_SQL, {"event_id": event_id})).one()
+
+    await db_session.commit()
+    if attendees:
+        await invalidate_leaderboard(event_id)
+
+    return AttendeeImport(
+        rows=total,
+        rejected=rejected,
+        whitelisted=whitelisted.rowcount,  # type: ignore[attr-defined]
+        attendees=attendees,
+        answers=answers,
+        errors=errors,
+    )
+
+
+async def read_file(path: str, *, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Read a file in chunks without blocking the event loop."""
+    async with await anyio.open_file(path, "rb") as file:
+        while chunk := await file.read(chunk_size):
+            yield chunk
+
+
+def format_from_filename(filename: str) -> ImportFormat:
+    return ImportFormat.NDJSON if filename.lower().endswith((".ndjson", ".jsonl")) else ImportFormat.CSV
@@ -0,0 +1,604 @@
+"""Latency benchmarks for the request middleware and the hot database paths.
+
+Every middleware benchmark serves a minimal app in-process, so the numbers are the cost of the middleware under test
+plus a fixed routing overhead, and a difference between two variants is the cost of what sets them apart. Database
+benchmarks call the services directly and commit every operation, as the handlers do. The compression benchmark
+runs the compression middleware's own codecs over payloads shaped like the API's responses.
+"""
+
+import asyncio
+import hashlib
+import itertools
+import logging
+import os
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from io import BytesIO
+from typing import Any
+
+import msgspec
+from litestar import Litestar, Request, get, post
+from litestar.config.compression import CompressionConfig
+from litestar.connection import ASGIConnection
+from litestar.enums import CompressionEncoding
+from litestar.middleware.compression.gzip_facade import GzipCompression
+from litestar.middleware.rate_limit import RateLimitConfig, RateLimitMiddleware
+from litestar.middleware.session.base import BaseBackendConfig
+from litestar.middleware.session.server_side import ServerSideSessionConfig
+from litestar.security.session_auth import SessionAuth
+from litestar.stores.valkey import ValkeyStore
+from litestar.testing import AsyncTestClient
+from litestar.types import Message, Scope
+from valkey.asyncio import Valkey
+
+from src.backend.config import session_revocations, settings, sqlalchemy_config, valkey, valkey_config
+from src.backend.lib.cache import question_catalog
+from src.backend.lib.dependencies import (
+    provide_event_service,
+    provide_event_whitelist_service,
+    provide_question_service,
+    provide_user_answer_service,
+    provide_user_service,
+)
+from src.backend.lib.leaderboard import _encode_cursor as _encode_leaderboard_cursor
+from src.backend.lib.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, _encode_cursor
+from src.backend.lib.principal import Principal
+from src.backend.lib.rate_limit import (
+    BrowserFingerprint,
+    CustomRateLimitMiddleware,
+    RateLimitPolicy,
+    TokenBucketLimiter,
+    ValkeyRateLimitConfig,
+    _hash_fingerprint,
+)
+from src.backend.lib.session import RotatingCookieBackendConfig
+from src.backend.models import Question, QuestionType, UserStatus
+from src.backend.schema.game import ConnectionQuestionData, GameStatus, Leaderboard, LeaderboardEntry
+from src.backend.schema.user import SIGNUP_ANSWER_COUNT, GetUser, UserPage
+from src.backend.schema.user_answer import GetUserAnswer, UserAnswerPage
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    requests: int
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    requests_per_second: float
+
+
+async def _measure(
+    name: str,
+    requests: int,
+    send: Callable[[], Awaitable[Any]],
+    *,
+    concurrency: int = 1,
+) -> BenchmarkResult:
+    # Warm up connections and caches before measuring
+    for _ in range(min(requests, 100)):
+        await send()
+
+    timings: list[float] = []
+
+    async def _worker(worker_requests: int) -> None:
+        for _ in range(worker_requests):
+            start = time.perf_counter()
+            await send()
+            timings.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_worker(requests // concurrency) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    percentiles = statistics.quantiles(timings, n=100)
+    return BenchmarkResult(
+        name=name,
+        requests=len(timings),
+        mean_ms=statistics.fmean(timings),
+        p50_ms=percentiles[49],
+        p95_ms=percentiles[94],
+        p99_ms=percentiles[98],
+        requests_per_second=len(timings) / elapsed,
+    )
+
+
+async def _asgi_get(app: Litestar, path: str, headers: list[tuple[bytes, bytes]]) -> int:
+    """Serve a GET request by calling ``app`` directly on the current event loop.
+
+    Returns:
+        The response status code.
+
+    """
+    status = 0
+
+    async def _receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def _send(message: Message) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.3"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 50000),
+        "root_path": "",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": headers,
+        "state": {},
+    }
+    await app(scope, _receive, _send)  # type: ignore[arg-type]
+    return status
+
+
+# ----------
+# Sessions
+# ----------
+
+_SESSION_MAX_AGE = 60
+_PRINCIPAL = Principal(id=1, event_id=1, is_admin=False, status=UserStatus.AVAILABLE, qr_code="benchmark")
+
+
+async def _retrieve_principal(session: dict[str, Any], _: ASGIConnection[Any, Any, Any, Any]) -> Principal | None:
+    # Same checks as `config._retrieve_user_handler`, with the principal cache always hitting
+    if not session.get("user_id") or session_revocations.is_revoked(session):
+        return None
+    return _PRINCIPAL
+
+
+@post("/login", exclude_from_auth=True)
+async def _login(request: Request[Principal, Any, Any]) -> None:
+    request.set_session({"user_id": _PRINCIPAL.id})
+
+
+@get("/me")
+async def _me(request: Request[Principal, Any, Any]) -> int:
+    return request.user.id
+
+
+def _session_app(session_backend_config: BaseBackendConfig) -> Litestar:
+    auth = SessionAuth[Principal, Any](
+        retrieve_user_handler=_retrieve_principal,
+        session_backend_config=session_backend_config,
+    )
+    # The test client serves the app from its own event loop, the shared Valkey client can't be used there
+    client = Valkey(host=settings.valkey_host, port=settings.vakley_port)
+    store = ValkeyStore(client, namespace="benchmark_sessions")
+    return Litestar(
+        route_handlers=[_login, _me],
+        on_app_init=[auth.on_app_init],
+        on_shutdown=[client.aclose],
+        stores={"sessions": store},
+    )
+
+
+async def benchmark_session_backends(*, requests: int) -> list[BenchmarkResult]:
+    """Time authenticated requests with the server side and the cookie session backend.
+
+    Returns:
+        One result per session backend.
+
+    """
+    # The sessions created by the benchmark expire shortly after it is done
+    backends = {
+        "server": ServerSideSessionConfig(max_age=_SESSION_MAX_AGE),
+        "cookie": RotatingCookieBackendConfig(secret=os.urandom(32), max_age=_SESSION_MAX_AGE),
+    }
+
+    # The test client logs every request otherwise
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    results = []
+    for name, session_backend_config in backends.items():
+        async with AsyncTestClient(app=_session_app(session_backend_config)) as client:
+            await client.post("/login")
+            results.append(await _measure(name, requests, lambda client=client: client.get("/me")))
+
+    return results
+
+
+# -------------
+# Rate limits
+# -------------
+
+_RATE_LIMIT_NAMESPACE = "benchmark_rate_limit"
+
+
+class _GetThenSetRateLimitMiddleware(RateLimitMiddleware):
+    """Litestar's rate limiter, which reads and then writes the request history, with our cache keys."""
+
+    cache_key_from_request = CustomRateLimitMiddleware.cache_key_from_request
+
+
+@get("/ping")
+async def _ping() -> None:
+    return None
+
+
+async def benchmark_rate_limiters(
+    *,
+    requests: int,
+    concurrency: int,
+    clients: int,
+    policy: RateLimitPolicy,
+) -> list[BenchmarkResult]:
+    """Time requests without rate limiting, with Litestar's rate limiter and with the token bucket script.
+
+    The requests come from ``clients`` different addresses and are sent ``concurrency`` at a time.
+
+    Returns:
+        One result per rate limiter.
+
+    """
+    configs: dict[str, RateLimitConfig | None] = {
+        "none": None,
+        "get-then-set": RateLimitConfig(
+            rate_limit=policy,
+            middleware_class=_GetThenSetRateLimitMiddleware,
+            store=_RATE_LIMIT_NAMESPACE,
+        ),
+        "token-bucket": ValkeyRateLimitConfig(
+            rate_limit=policy,
+            limiter=TokenBucketLimiter(valkey, namespace=f"{_RATE_LIMIT_NAMESPACE}:token_bucket"),
+        ),
+    }
+
+    results = []
+    for name, config in configs.items():
+        app = Litestar(
+            route_handlers=[_ping],
+            middleware=[config.middleware] if config else [],
+            stores={_RATE_LIMIT_NAMESPACE: valkey_config.with_namespace(_RATE_LIMIT_NAMESPACE)},
+        )
+        addresses = itertools.cycle(
+            [(b"x-forwarded-for", f"10.0.{i // 256}.{i % 256}".encode()) for i in range(clients)]
+        )
+        results.append(
+            await _measure(
+                name,
+                requests,
+                lambda app=app, addresses=addresses: _asgi_get(app, "/ping", [next(addresses)]),
+                concurrency=concurrency,
+            ),
+        )
+
+    return results
+
+
+# --------------
+# Fingerprints
+# --------------
+
+
+@dataclass
+class FingerprintResult:
+    name: str
+    calls: int
+    mean_us: float
+    calls_per_second: float
+    collisions: int
+
+
+def _sha256_fingerprint(request: Request) -> str:
+    """The fingerprint as it was computed before it moved to BLAKE2b, kept for comparison."""
+    client_ip = (
+        request.headers.get("X-Forwarded-For", "").split(",")[0].strip()
+        or request.headers.get("X-Real-IP", "")
+        or request.client.host
+        if request.client
+        else "unknown"
+    )
+    combined = "|".join(
+        (
+            f"ip:{client_ip}",
+            f"ua:{request.headers.get('User-Agent', 'unknown')}",
+            f"lang:{request.headers.get('Accept-Language', 'unknown')}",
+            f"enc:{request.headers.get('Accept-Encoding', 'unknown')}",
+            f"host:{request.headers.get('Host', 'unknown')}",
+        ),
+    )
+    return f"browser_{hashlib.sha256(combined.encode('utf-8')).hexdigest()[:32]}"
+
+
+def _client_scope(client: int) -> Scope:
+    # Browsers differ in their address and, more rarely, in their user agent and language
+    return {  # type: ignore[return-value]
+        "type": "http",
+        "headers": [
+            (b"host", b"bytebond.example"),
+            (b"x-forwarded-for", f"10.{client >> 16 & 255}.{client >> 8 & 255}.{client & 255}, 10.0.0.1".encode()),
+            (b"user-agent", f"Mozilla/5.0 (Linux; Android 14; Build/{client % 97}) Mobile Safari/537.36".encode()),
+            (b"accept-language", [b"en-US,en;q=0.9", b"de-DE,de;q=0.8", b"hi-IN,hi;q=0.7"][client % 3]),
+            (b"accept-encoding", b"gzip, deflate, br"),
+        ],
+        "client": ("10.0.0.1", 50000),
+    }
+
+
+def benchmark_fingerprints(*, calls: int, clients: int) -> list[FingerprintResult]:
+    """Time the previous and the current fingerprint, for a burst from one client and for ``clients`` clients.
+
+    Every call fingerprints a new ``Request``, as the middleware does. The collisions are counted between the
+    fingerprints of the ``clients`` distinct clients.
+
+    Returns:
+        One result per fingerprint and workload.
+
+    """
+    scopes = [_client_scope(client) for client in range(clients)]
+    fingerprints: dict[str, Callable[[Request], str]] = {
+        "sha256": _sha256_fingerprint,
+        "blake2b + lru": BrowserFingerprint.generate_fingerprint,
+    }
+
+    results = []
+    for workload, workload_scopes in (("burst", scopes[:1]), ("distinct", scopes)):
+        for name, fingerprint in fingerprints.items():
+            _hash_fingerprint.cache_clear()
+            requests = [Request(scope) for scope in itertools.islice(itertools.cycle(workload_scopes), calls)]
+
+            start = time.perf_counter()
+            for request in requests:
+                fingerprint(request)
+            elapsed = time.perf_counter() - start
+
+            distinct = {fingerprint(Request(scope)) for scope in workload_scopes}
+            results.append(
+                FingerprintResult(
+                    name=f"{name} ({workload})",
+                    calls=calls,
+                    mean_us=elapsed / calls * 1_000_000,
+                    calls_per_second=calls / elapsed,
+                    collisions=len(workload_scopes) - len(distinct),
+                ),
+            )
+
+    return results
+
+
+# ---------
+# Signups
+# ---------
+
+_SIGNUP_EMAIL = "signup{}@benchmark.example"
+
+
+async def _four_call_signup(code: str, email: str, answers: list[tuple[int, str]]) -> None:
+    """The signup as it was done before it moved to a single statement, kept for comparison."""
+    async with sqlalchemy_config.get_session() as db_session:
+        event_service = await anext(provide_event_service(db_session))
+        event_whitelist_service = await anext(provide_event_whitelist_service(db_session))
+        question_service = await anext(provide_question_service(db_session))
+        user_service = await anext(provide_user_service(db_session))
+        user_answer_service = await anext(provide_user_answer_service(db_session))
+
+        event = await event_service.get_one(code=code)
+        await event_whitelist_service.is_whitelisted(event.id, email)
+        await question_service.list(
+            Question.id.in_([question_id for question_id, _ in answers]),
+            Question.is_signup_question.is_(True),
+        )
+        user = await user_service.create(data={"name": email, "email": email, "event_id": event.id})
+        await user_answer_service.create_many(
+            [{"answer": answer, "user_id": user.id, "question_id": question_id} for question_id, answer in answers],
+        )
+        await db_session.commit()
+
+
+async def _single_statement_signup(code: str, email: str, answers: list[tuple[int, str]]) -> None:
+    # Same calls as `UserController.post_user`
+    async with sqlalchemy_config.get_session() as db_session:
+        event_whitelist_service = await anext(provide_event_whitelist_service(db_session))
+        question_service = await anext(provide_question_service(db_session))
+        user_service = await anext(provide_user_service(db_session))
+
+        event_id, _ = await event_whitelist_service.get_signup_event(code, email)  # type: ignore[misc]
+        await question_catalog.get(question_service.list)
+        await user_service.sign_up(event_id=event_id, name=email, email=email, answers=answers)
+        await db_session.commit()
+
+
+async def benchmark_signups(*, requests: int, concurrency: int) -> list[BenchmarkResult]:
+    """Time signups with the previous four call path and with the single statement, into a throwaway event.
+
+    Returns:
+        One result per signup path.
+
+    """
+    signups = {"four calls": _four_call_signup, "single statement": _single_statement_signup}
+    # Every signup needs its own whitelisted email, including the warm up ones
+    emails_per_variant = requests + min(requests, 100)
+
+    async with sqlalchemy_config.get_session() as db_session:
+        question_service = await anext(provide_question_service(db_session))
+        question_ids = sorted(await question_service.list_signup_question_ids())[:SIGNUP_ANSWER_COUNT]
+        if len(question_ids) < SIGNUP_ANSWER_COUNT:
+            msg = f"At least {SIGNUP_ANSWER_COUNT} signup questions are required to benchmark signups"
+            raise ValueError(msg)
+
+        event_service = await anext(provide_event_service(db_session))
+        event = await event_service.create(
+            {"name": "Signup benchmark", "code": f"signup-benchmark-{os.urandom(4).hex()}"},
+        )
+        event_whitelist_service = await anext(provide_event_whitelist_service(db_session))
+        await event_whitelist_service.replace_emails(
+            event.id,
+            (_SIGNUP_EMAIL.format(i) for i in range(len(signups) * emails_per_variant)),
+        )
+        await db_session.commit()
+
+    answers = [(question_id, "benchmark") for question_id in question_ids]
+    emails = (_SIGNUP_EMAIL.format(i) for i in itertools.count())
+
+    try:
+        return [
+            await _measure(
+                name,
+                requests,
+                lambda signup=signup: signup(event.code, next(emails), answers),
+                concurrency=concurrency,
+            )
+            for name, signup in signups.items()
+        ]
+    finally:
+        # The event's users, answers and whitelist are deleted along with it
+        async with sqlalchemy_config.get_session() as db_session:
+            event_service = await anext(provide_event_service(db_session))
+            await event_service.delete(event.id, auto_commit=True)
+
+
+# -------------
+# Compression
+# -------------
+
+
+@dataclass
+class CompressionResult:
+    name: str
+    encoding: str
+    size: int
+    compressed_size: int
+    mean_ms: float
+    megabytes_per_second: float
+
+    @property
+    def saved(self) -> float:
+        return 1 - self.compressed_size / self.size
+
+
+def _pages(name: str, page_type: type[UserPage | UserAnswerPage], items: list[Any]) -> dict[str, bytes]:
+    # A page of the listing at the default and at the largest page size, each with the cursor of the next one
+    return {
+        f"{name} ({size:,})": msgspec.json.encode(
+            page_type(items=items[:size], next_cursor=_encode_cursor(items[size - 1].id)),
+        )
+        for size in sorted({DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE})
+    }
+
+
+def _compression_payloads() -> dict[str, bytes]:
+    now = datetime.now(UTC)
+    users = [
+        GetUser(
+            id=user_id,
+            name=f"Attendee {user_id}",
+            email=f"attendee{user_id}@example.com",
+            points=user_id % 120,
+            qr_code=hashlib.md5(str(user_id).encode(), usedforsecurity=False).hexdigest(),
+            connection_count=user_id % 24,
+            status=UserStatus.BUSY if user_id % 10 else UserStatus.AVAILABLE,
+            is_admin=False,
+            event_id=1,
+            created_at=now,
+            updated_at=now,
+        )
+        for user_id in range(1, MAX_PAGE_SIZE + 2)
+    ]
+    answers = [
+        GetUserAnswer(
+            id=answer_id,
+            answer=["Python", "Coffee", "Mountains", "Yes", "Jazz", "Rust", "Tea", "Beach"][answer_id % 8],
+            user_id=answer_id // SIGNUP_ANSWER_COUNT + 1,
+            question_id=answer_id % 40 + 1,
+            created_at=now,
+            updated_at=now,
+        )
+        for answer_id in range(1, MAX_PAGE_SIZE + 2)
+    ]
+    game_status = GameStatus(
+        user_status=UserStatus.BUSY,
+        qr_code=None,
+        partner_name="Attendee 42",
+        connection_questions=[
+            ConnectionQuestionData(
+                id=question_id,
+                question_id=question_id,
+                question_text=f"What is your partner's favourite thing number {question_id}?",
+                question_type=QuestionType.DEFAULT,
+                options=None,
+                question_answered=False,
+                answered_correctly=False,
+            )
+            for question_id in range(1, 6)
+        ],
+    )
+    entries = [
+        LeaderboardEntry(
+            id=user.id,
+            name=user.name,
+            email=user.email,
+            points=user.points,
+            connection_count=user.connection_count,
+            rank=rank,
+        )
+        for rank, user in enumerate(users[:10], start=1)
+    ]
+    leaderboard = Leaderboard(
+        event_id=1,
+        event_name="Byte Bond",
+        entries=entries,
+        total_users=len(users),
+        next_cursor=_encode_leaderboard_cursor(entries[-1]),
+    )
+
+    return {
+        "game status": msgspec.json.encode(game_status),
+        "leaderboard page": msgspec.json.encode(leaderboard),
+        **_pages("users", UserPage, users),
+        **_pages("user answers", UserAnswerPage, answers),
+    }
+
+
+def _compress(config: CompressionConfig, encoding: str, payload: bytes) -> bytes:
+    # The same facades and settings the compression middleware uses
+    buffer = BytesIO()
+    facade_type = GzipCompression if encoding == CompressionEncoding.GZIP else config.compression_facade
+    facade = facade_type(buffer=buffer, compression_encoding=encoding, config=config)
+    facade.write(payload)
+    facade.close()
+    return buffer.getvalue()
+
+
+def benchmark_compression(*, config: CompressionConfig, repeats: int) -> list[CompressionResult]:
+    """Time brotli and its gzip fallback, as configured, on payloads shaped like the API's responses.
+
+    Returns:
+        One result per payload and encoding.
+
+    """
+    results = []
+    for name, payload in _compression_payloads().items():
+        for encoding in (CompressionEncoding.BROTLI, CompressionEncoding.GZIP):
+            compressed = _compress(config, encoding, payload)
+
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                _compress(config, encoding, payload)
+                timings.append(time.perf_counter() - start)
+
+            mean = statistics.fmean(timings)
+            results.append(
+                CompressionResult(
+                    name=name,
+                    encoding=encoding,
+                    size=len(payload),
+                    compressed_size=len(compressed),
+                    mean_ms=mean * 1000,
+                    megabytes_per_second=len(payload) / mean / 1_000_000,
+                ),
+            )
+
+    return results
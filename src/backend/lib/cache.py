@@ -0,0 +1,294 @@
+import asyncio
+import hashlib
+import random
+import time
+from collections.abc import AsyncGenerator, Awaitable, Callable, Iterable, Mapping
+from contextlib import asynccontextmanager, suppress
+from datetime import datetime
+from operator import attrgetter
+from types import MappingProxyType
+
+import logfire
+import msgspec
+from litestar import Litestar
+from litestar.channels.backends.redis import RedisChannelsPubSubBackend
+from msgspec import Struct
+from sqlalchemy import event
+from sqlalchemy.orm import Session, UOWTransaction
+from valkey.asyncio import Valkey
+
+from src.backend.config import valkey, valkey_config
+from src.backend.models import Connection, ConnectionStatus, Question, QuestionType
+
+# Connections expire after 4 hours (see `Connection.end_time`), so no cached entry needs to outlive that
+ACTIVE_CONNECTION_TTL = 4 * 60 * 60
+
+# A question changed by another process is picked up after this long at the latest, even if its announcement is lost
+QUESTION_CATALOG_TTL = 60
+
+# Pause before subscribing again to the question catalog channel after losing it
+_RESUBSCRIBE_DELAY = 1
+
+# Key marking a session that changed a question, in `Session.info`
+_QUESTIONS_CHANGED_KEY = "questions_changed"
+
+# Marker stored once a user's connection is completed or cancelled, so lookups skip the database
+_NO_CONNECTION = b"none"
+
+active_connection_store = valkey_config.with_namespace("active_connection")
+
+
+class ActiveConnection(Struct, frozen=True):
+    """Routing information for a user's pending or active connection."""
+
+    id: int
+    partner_id: int
+    is_presenter: bool  # Presents the QR code (user1 of the connection)
+    status: ConnectionStatus
+
+    @classmethod
+    def from_connection(cls, connection: Connection, user_id: int) -> "ActiveConnection":
+        is_presenter = connection.user1_id == user_id
+        return cls(
+            id=connection.id,
+            partner_id=connection.user2_id if is_presenter else connection.user1_id,
+            is_presenter=is_presenter,
+            status=connection.status,
+        )
+
+
+_encoder = msgspec.json.Encoder()
+_decoder = msgspec.json.Decoder(ActiveConnection)
+
+
+async def get_active_connection(
+    user_id: int,
+    loader: Callable[[], Awaitable[Connection | None]],
+) -> ActiveConnection | None:
+    """Resolve a user's pending or active connection, falling back to ``loader`` on a cache miss.
+
+    Entries are only written by matchmaking and state transitions, never from the fallback path, so a
+    lookup racing with a transition can't resurrect a finished connection.
+
+    Returns:
+        The user's connection routing information, or ``None`` if the user has no open connection.
+
+    """
+    data = await active_connection_store.get(str(user_id))
+
+    if data == _NO_CONNECTION:
+        return None
+
+    if data:
+        return _decoder.decode(data)
+
+    connection = await loader()
+    return ActiveConnection.from_connection(connection, user_id) if connection else None
+
+
+async def cache_active_connection(connection: Connection) -> None:
+    """Store the connection for both of its users."""
+    for user_id in (connection.user1_id, connection.user2_id):
+        await active_connection_store.set(
+            str(user_id),
+            _encoder.encode(ActiveConnection.from_connection(connection, user_id)),
+            expires_in=ACTIVE_CONNECTION_TTL,
+        )
+
+
+async def clear_active_connection(*user_ids: int) -> None:
+    """Mark the given users as having no open connection."""
+    for user_id in user_ids:
+        await active_connection_store.set(str(user_id), _NO_CONNECTION, expires_in=ACTIVE_CONNECTION_TTL)
+
+
+# ------------------
+# Question catalog
+# ------------------
+
+
+class CatalogQuestion(Struct, frozen=True):
+    """A question as served from the catalog."""
+
+    id: int
+    question: str
+    question_type: QuestionType
+    options: tuple[str, ...] | None
+    is_signup_question: bool
+    is_game_question: bool
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def from_question(cls, question: Question) -> "CatalogQuestion":
+        return cls(
+            id=question.id,
+            question=question.question,
+            question_type=question.question_type,
+            options=tuple(question.options) if question.options is not None else None,
+            is_signup_question=question.is_signup_question,
+            is_game_question=question.is_game_question,
+            created_at=question.created_at,
+            updated_at=question.updated_at,
+        )
+
+
+class QuestionCatalog(Struct, frozen=True):
+    """Every question at a given catalog version, indexed and partitioned for sampling."""
+
+    version: int
+    etag: str  # Changes whenever a question does, even if the version counter is lost
+    listing: tuple[CatalogQuestion, ...]  # Ordered by ID
+    questions: Mapping[int, CatalogQuestion]
+    signup_question_ids: frozenset[int]
+    game_question_ids: frozenset[int]
+    # Signup questions first, and among them the ones that are not asked in the game
+    onboarding_pools: tuple[tuple[CatalogQuestion, ...], ...]
+
+    @classmethod
+    def build(cls, version: int, questions: Iterable[Question]) -> "QuestionCatalog":
+        listing = tuple(
+            sorted((CatalogQuestion.from_question(question) for question in questions), key=attrgetter("id"))
+        )
+        pools: dict[tuple[bool, bool], list[CatalogQuestion]] = {}
+        for question in listing:
+            pools.setdefault((not question.is_signup_question, question.is_game_question), []).append(question)
+
+        return cls(
+            version=version,
+            etag=hashlib.blake2b(_encoder.encode(listing), digest_size=16).hexdigest(),
+            listing=listing,
+            questions=MappingProxyType({question.id: question for question in listing}),
+            signup_question_ids=frozenset(q.id for q in listing if q.is_signup_question),
+            game_question_ids=frozenset(q.id for q in listing if q.is_game_question),
+            onboarding_pools=tuple(tuple(pools[key]) for key in sorted(pools)),
+        )
+
+    def sample(self, k: int, *, onboarding: bool = False) -> list[CatalogQuestion]:
+        """Pick ``k`` questions at random, exhausting each onboarding pool in turn if ``onboarding``."""
+        if not onboarding:
+            return random.sample(self.listing, min(k, len(self.listing)))
+
+        sample: list[CatalogQuestion] = []
+        for pool in self.onboarding_pools:
+            sample += random.sample(pool, min(k - len(sample), len(pool)))
+        return sample
+
+
+class QuestionCatalogCache:
+    """The question catalog, kept in the memory of every process.
+
+    The catalog version is a counter in Valkey. A transaction that changes a question bumps it once committed and
+    announces the new version on the ``question_catalog`` channel, every process drops an older copy as soon as it
+    hears about it. The version is re-read every ``ttl`` seconds as well, in case an announcement was missed.
+    """
+
+    def __init__(self, valkey: Valkey, *, ttl: float, key: str = "question_catalog_version") -> None:
+        self.valkey = valkey
+        self.ttl = ttl
+        self.key = key
+        self.channel = key.removesuffix("_version")
+        # The app's channels live in memory, announcements have to go through Valkey to reach the other processes
+        self._channels = RedisChannelsPubSubBackend(redis=valkey)  # type: ignore[arg-type]
+        self._catalog: QuestionCatalog | None = None
+        self._latest_version = 0
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self._announcements: set[asyncio.Task[None]] = set()
+
+        event.listen(Session, "after_flush", self._after_flush)
+        event.listen(Session, "after_commit", self._after_commit)
+        event.listen(Session, "after_rollback", self._after_rollback)
+
+    async def get(self, loader: Callable[[], Awaitable[Iterable[Question]]]) -> QuestionCatalog:
+        """Return the current catalog, reloading it with ``loader`` once it is outdated."""
+        catalog = self._catalog
+        if catalog and catalog.version >= self._latest_version and self._checked_at + self.ttl > time.monotonic():
+            return catalog
+
+        async with self._lock:
+            version = int(await self.valkey.get(self.key) or 0)
+            self._latest_version = max(self._latest_version, version)
+            catalog = self._catalog
+            if catalog is None or catalog.version < self._latest_version:
+                # The version is read first, a change committed while loading only makes the next get reload
+                catalog = QuestionCatalog.build(version, await loader())
+
+            # A newer version announced while loading wins, the catalog is only kept until the next get
+            if catalog.version >= self._latest_version:
+                self._catalog = catalog
+                self._checked_at = time.monotonic()
+
+        return catalog
+
+    def clear(self) -> None:
+        self._catalog = None
+
+    async def invalidate(self) -> None:
+        """Bump the catalog version and tell every process about it."""
+        self.clear()
+        version = await self.valkey.incr(self.key)
+        self._seen(version)
+        await self._channels.publish(str(version).encode(), [self.channel])
+
+    async def _announce(self) -> None:
+        try:
+            await self.invalidate()
+        except Exception:  # noqa: BLE001
+            logfire.exception("Failed to announce a question catalog change")
+
+    def _seen(self, version: int) -> None:
+        self._latest_version = max(self._latest_version, version)
+        if self._catalog and self._catalog.version < version:
+            self._catalog = None
+
+    async def _listen_forever(self) -> None:
+        while True:
+            try:
+                await self._channels.subscribe([self.channel])
+                async for _, data in self._channels.stream_events():
+                    self._seen(int(data))
+            except Exception:  # noqa: BLE001
+                logfire.exception("Lost the question catalog channel")
+                await self._channels.on_shutdown()
+                # Changes made while disconnected are only picked up by the version check
+                self.clear()
+
+            await asyncio.sleep(_RESUBSCRIBE_DELAY)
+
+    @asynccontextmanager
+    async def lifespan(self, _: Litestar) -> AsyncGenerator[None, None]:
+        task = asyncio.create_task(self._listen_forever())
+        try:
+            yield
+        finally:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+            await self._channels.on_shutdown()
+
+    @staticmethod
+    def _after_flush(session: Session, _flush_context: UOWTransaction) -> None:
+        if any(isinstance(obj, Question) for obj in (*session.new, *session.dirty, *session.deleted)):
+            session.info[_QUESTIONS_CHANGED_KEY] = True
+
+    def _after_commit(self, session: Session) -> None:
+        if not session.info.pop(_QUESTIONS_CHANGED_KEY, False):
+            return
+
+        self.clear()
+        try:
+            task = asyncio.get_running_loop().create_task(self._announce())
+        except RuntimeError:
+            # Committed outside of an event loop, the other processes catch up with their version check
+            return
+
+        self._announcements.add(task)
+        task.add_done_callback(self._announcements.discard)
+
+    @staticmethod
+    def _after_rollback(session: Session) -> None:
+        session.info.pop(_QUESTIONS_CHANGED_KEY, None)
+
+
+question_catalog = QuestionCatalogCache(valkey, ttl=QUESTION_CATALOG_TTL)
@@ -6,6 +6,7 @@ from src.backend.lib.services import (
     ConnectionQuestionService,
     ConnectionService,
     EventService,
+    EventWhitelistService,
     QuestionService,
     UserAnswerService,
     UserService,
@@ -24,6 +25,18 @@ async def provide_event_service(
         yield service
 
 
+async def provide_event_whitelist_service(
+    db_session: AsyncSession | None = None,
+) -> AsyncGenerator[EventWhitelistService, None]:
+    async with EventWhitelistService.new(
+        session=db_session,
+        error_messages={
+            "not_found": "No whitelist entry found with the given ID.",
+        },
+    ) as service:
+        yield service
+
+
 async def provide_user_service(
     db_session: AsyncSession | None = None,
 ) -> AsyncGenerator[UserService, None]:
@@ -0,0 +1,192 @@
+"""Streaming exports of an event's data.
+
+Each dataset is read through a server-side cursor and written out as CSV or NDJSON one batch of rows at a time.
+An export only ever holds one batch in memory however large the event is, and its first bytes go out as soon as the
+first batch is read.
+
+CSV files start with a header of the column names, NDJSON lines are objects keyed by them. CSV cells that a
+spreadsheet would run as a formula are prefixed with ``'``.
+"""
+
+import csv
+import io
+from collections.abc import AsyncIterator, Callable, Sequence
+from datetime import datetime
+from typing import Any
+
+import msgspec
+from sqlalchemy import Row, Select, select
+
+from src.backend.config import sqlalchemy_config
+from src.backend.models import Connection, ConnectionQuestion, GameLogEntry, Question, User, UserAnswer
+from src.backend.schema.event import ExportDataset, ImportFormat
+
+# Rows fetched from the cursor and written out at a time
+EXPORT_BATCH_SIZE = 1000
+
+MEDIA_TYPES = {ImportFormat.CSV: "text/csv; charset=utf-8", ImportFormat.NDJSON: "application/x-ndjson"}
+
+_encoder = msgspec.json.Encoder()
+
+# Spreadsheets evaluate a cell starting with one of these, attendees choose their own names and answers
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+# ---------
+# Queries
+# ---------
+
+
+def _users(event_id: int) -> Select[Any]:
+    return (
+        select(
+            User.id,
+            User.name,
+            User.email,
+            User.points,
+            User.connection_count,
+            User.status,
+            User.created_at,
+        )
+        .where(User.event_id == event_id, User.is_admin.is_(False))
+        .order_by(User.id)
+    )
+
+
+def _answers(event_id: int) -> Select[Any]:
+    return (
+        select(
+            UserAnswer.id,
+            UserAnswer.user_id,
+            User.email,
+            UserAnswer.question_id,
+            Question.question,
+            UserAnswer.answer,
+            UserAnswer.created_at,
+        )
+        .join(User, UserAnswer.user_id == User.id)
+        .join(Question, UserAnswer.question_id == Question.id)
+        .where(User.event_id == event_id)
+        .order_by(UserAnswer.id)
+    )
+
+
+def _connections(event_id: int) -> Select[Any]:
+    return (
+        select(
+            Connection.id,
+            Connection.user1_id,
+            Connection.user2_id,
+            Connection.status,
+            Connection.start_time,
+            Connection.end_time,
+            Connection.updated_at,
+        )
+        .where(Connection.event_id == event_id)
+        .order_by(Connection.id)
+    )
+
+
+def _question_outcomes(event_id: int) -> Select[Any]:
+    return (
+        select(
+            ConnectionQuestion.id,
+            ConnectionQuestion.connection_id,
+            ConnectionQuestion.user_id,
+            ConnectionQuestion.question_id,
+            Question.question,
+            ConnectionQuestion.question_answered,
+            ConnectionQuestion.answered_correctly,
+            ConnectionQuestion.updated_at,
+        )
+        .join(Connection, ConnectionQuestion.connection_id == Connection.id)
+        .join(Question, ConnectionQuestion.question_id == Question.id)
+        .where(Connection.event_id == event_id)
+        .order_by(ConnectionQuestion.id)
+    )
+
+
+def _game_log(event_id: int) -> Select[Any]:
+    return (
+        select(
+            GameLogEntry.id,
+            GameLogEntry.occurred_at,
+            GameLogEntry.kind,
+            GameLogEntry.connection_id,
+            GameLogEntry.user_id,
+            GameLogEntry.question_id,
+            GameLogEntry.answered_correctly,
+        )
+        .where(GameLogEntry.event_id == event_id)
+        .order_by(GameLogEntry.id)
+    )
+
+
+_QUERIES: dict[ExportDataset, Callable[[int], Select[Any]]] = {
+    ExportDataset.USERS: _users,
+    ExportDataset.ANSWERS: _answers,
+    ExportDataset.CONNECTIONS: _connections,
+    ExportDataset.QUESTION_OUTCOMES: _question_outcomes,
+    ExportDataset.GAME_LOG: _game_log,
+}
+
+
+# ----------
+# Encoding
+# ----------
+
+
+def _csv_value(value: Any) -> Any:
+    # Written the way they are in NDJSON
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, datetime):
+        return value.isoformat().replace("+00:00", "Z")
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def _csv_lines(rows: Sequence[Sequence[Any]]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+def _ndjson_lines(columns: Sequence[str], rows: Sequence[Row[Any]]) -> bytes:
+    return _encoder.encode_lines([dict(zip(columns, row, strict=True)) for row in rows])
+
+
+# --------
+# Export
+# --------
+
+
+def export_filename(event_id: int, dataset: ExportDataset, export_format: ImportFormat) -> str:
+    return f"event-{event_id}-{dataset}.{export_format}"
+
+
+async def export_event(
+    *,
+    event_id: int,
+    dataset: ExportDataset,
+    export_format: ImportFormat,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[bytes]:
+    """Stream one of the event's datasets, a batch of encoded rows at a time.
+
+    The export has its own session, it outlives the request that starts it.
+    """
+    statement = _QUERIES[dataset](event_id).execution_options(yield_per=batch_size)
+
+    async with sqlalchemy_config.get_session() as db_session:
+        result = await db_session.stream(statement)
+        columns = list(result.keys())
+        if export_format is ImportFormat.CSV:
+            yield _csv_lines([columns])
+
+        async for rows in result.partitions():
+            yield _csv_lines(rows) if export_format is ImportFormat.CSV else _ndjson_lines(columns, rows)
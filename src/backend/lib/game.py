@@ -1,18 +1,27 @@
 import random
+from collections import Counter
 from datetime import UTC, datetime
 from itertools import combinations
 
 from saq.types import Context
 
 from src.backend.config import sqlalchemy_config
+from src.backend.lib.analytics import record_cancellations, record_pairings
+from src.backend.lib.cache import cache_active_connection, clear_active_connection
 from src.backend.lib.dependencies import provide_connection_service, provide_event_service, provide_user_service
+from src.backend.lib.game_log import game_log
+from src.backend.lib.otel import track_queries
 from src.backend.lib.services import ConnectionService, UserService
-from src.backend.models import Connection, ConnectionStatus, Event, UserStatus
+from src.backend.models import Connection, ConnectionStatus, Event, GameLogKind, UserStatus
 
 MINIMUM_REQUIRED_USERS = 2
 
 
-async def _create_connection(user_service: UserService, connection_service: ConnectionService, event: Event) -> None:
+async def _create_connection(
+    user_service: UserService,
+    connection_service: ConnectionService,
+    event: Event,
+) -> list[Connection]:
     available_users = list(
         await user_service.list(
             event_id=event.id,
@@ -22,7 +31,7 @@ async def _create_connection(user_service: UserService, connection_service: Conn
     )
 
     if len(available_users) < MINIMUM_REQUIRED_USERS:
-        return
+        return []
 
     existing_connections = await connection_service.list(event_id=event.id)
     existing_pairs = {tuple(sorted((c.user1_id, c.user2_id))) for c in existing_connections}
@@ -50,19 +59,21 @@ async def _create_connection(user_service: UserService, connection_service: Conn
             paired_user_ids.add(user2_id)
 
     if not new_connections:
-        return
+        return []
 
     users_to_update = [{"id": user_id, "status": UserStatus.CONNECTING} for user_id in paired_user_ids]
 
-    await connection_service.create_many(new_connections)
+    connections = await connection_service.create_many(new_connections)
     await user_service.update_many(users_to_update)
 
+    return list(connections)
+
 
 async def _cleanup_expired_connections(
     user_service: UserService,
     connection_service: ConnectionService,
     event: Event,
-) -> None:
+) -> list[Connection]:
     current_time = datetime.now(UTC)
 
     # Find expired connections that are still pending or active
@@ -73,7 +84,7 @@ async def _cleanup_expired_connections(
     )
 
     if not expired_connections:
-        return
+        return []
 
     connection_ids_to_cancel = {conn.id for conn in expired_connections}
     user_ids_to_make_available = set()
@@ -92,9 +103,18 @@ async def _cleanup_expired_connections(
             [{"id": user_id, "status": UserStatus.AVAILABLE} for user_id in user_ids_to_make_available],
         )
 
+    return list(expired_connections)
+
 
 async def process_game(_: Context) -> None:
+    with track_queries("process_game"):
+        await _process_game()
+
+
+async def _process_game() -> None:
     active_events = []
+    expired_connections: list[Connection] = []
+    new_connections: list[Connection] = []
 
     async with sqlalchemy_config.get_session() as db_session:
         connection_service = await anext(provide_connection_service(db_session))
@@ -103,7 +123,7 @@ async def process_game(_: Context) -> None:
 
         active_events = await event_service.list(Event.is_active.is_(True))
         for event in active_events:
-            await _cleanup_expired_connections(
+            expired_connections += await _cleanup_expired_connections(
                 user_service=user_service,
                 connection_service=connection_service,
                 event=event,
@@ -111,15 +131,29 @@ async def process_game(_: Context) -> None:
 
         await db_session.commit()
 
+    # Only touch the active connection cache, the analytics and the log once the state change is committed
+    released_user_ids = {user_id for conn in expired_connections for user_id in (conn.user1_id, conn.user2_id)}
+    await clear_active_connection(*released_user_ids)
+    for event_id, count in Counter(conn.event_id for conn in expired_connections).items():
+        await record_cancellations(event_id, count, expired=True)
+    for conn in expired_connections:
+        await game_log.record(GameLogKind.EXPIRED, event_id=conn.event_id, connection_id=conn.id)
+
     async with sqlalchemy_config.get_session() as db_session:
         connection_service = await anext(provide_connection_service(db_session))
         user_service = await anext(provide_user_service(db_session))
 
         for event in active_events:
-            await _create_connection(
+            new_connections += await _create_connection(
                 user_service=user_service,
                 connection_service=connection_service,
                 event=event,
             )
 
         await db_session.commit()
+
+    for connection in new_connections:
+        await cache_active_connection(connection)
+        await game_log.record(GameLogKind.PAIRED, event_id=connection.event_id, connection_id=connection.id)
+    for event_id, count in Counter(conn.event_id for conn in new_connections).items():
+        await record_pairings(event_id, count)
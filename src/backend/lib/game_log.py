@@ -0,0 +1,112 @@
+"""Append-only log of the game's connection transitions.
+
+Handlers and the game loop queue entries in memory once the transition is committed, and a background task writes
+them to the ``game_log`` table in batches with ``COPY``, so logging a transition never costs a round trip to the
+database and a rolled back transition is never logged. The queue is bounded. When the writer falls behind, logging
+a transition waits for room in the queue instead of letting memory grow.
+
+Entries still queued when the app shuts down are written before it exits. A batch that fails to write is logged and
+dropped, the game itself never waits on the log.
+"""
+
+import asyncio
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+
+import logfire
+from litestar import Litestar
+
+from src.backend.config import sqlalchemy_config
+from src.backend.models import GameLogKind
+
+GAME_LOG_QUEUE_SIZE = 10_000
+GAME_LOG_BATCH_SIZE = 1_000
+
+# How long the writer waits after the first queued entry, so that entries are written in batches
+GAME_LOG_LINGER = 0.5
+
+_COPY_SQL = (
+    "COPY game_log (occurred_at, kind, event_id, connection_id, user_id, question_id, answered_correctly) FROM STDIN"
+)
+
+type _Row = tuple[datetime, str, int, int, int | None, int | None, bool | None]
+
+
+class GameLog:
+    """Buffers the game log in a bounded queue, written by the task ``lifespan`` runs."""
+
+    def __init__(
+        self,
+        *,
+        maxsize: int = GAME_LOG_QUEUE_SIZE,
+        batch_size: int = GAME_LOG_BATCH_SIZE,
+        linger: float = GAME_LOG_LINGER,
+    ) -> None:
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.linger = linger
+        # Created by the lifespan, on the loop of the app, None means there is no writer
+        self._queue: asyncio.Queue[_Row | None] | None = None
+
+    async def record(
+        self,
+        kind: GameLogKind,
+        *,
+        event_id: int,
+        connection_id: int,
+        user_id: int | None = None,
+        question_id: int | None = None,
+        answered_correctly: bool | None = None,
+    ) -> None:
+        """Queue an entry, waiting for room while the queue is full."""
+        # Nothing writes the log outside of the app, e.g. in CLI commands
+        if self._queue is None:
+            return
+
+        row = (datetime.now(UTC), kind.name, event_id, connection_id, user_id, question_id, answered_correctly)
+        await self._queue.put(row)
+
+    async def _write(self, batch: list[_Row]) -> None:
+        try:
+            async with sqlalchemy_config.get_session() as db_session:
+                connection = await (await db_session.connection()).get_raw_connection()
+                async with connection.driver_connection.cursor() as cursor, cursor.copy(_COPY_SQL) as copy:
+                    for row in batch:
+                        await copy.write_row(row)
+                await db_session.commit()
+        except Exception:  # noqa: BLE001
+            logfire.exception("Failed to write the game log", entries=len(batch))
+
+    async def _write_forever(self, queue: "asyncio.Queue[_Row | None]") -> None:
+        # A None in the queue stops the writer once everything queued before it is written
+        stopping = False
+        while not stopping:
+            if (first := await queue.get()) is None:
+                return
+
+            if queue.qsize() < self.batch_size - 1:
+                await asyncio.sleep(self.linger)
+
+            batch = [first]
+            while len(batch) < self.batch_size and not queue.empty():
+                if (row := queue.get_nowait()) is None:
+                    stopping = True
+                    break
+                batch.append(row)
+
+            await self._write(batch)
+
+    @asynccontextmanager
+    async def lifespan(self, _: Litestar) -> AsyncGenerator[None, None]:
+        queue = self._queue = asyncio.Queue(maxsize=self.maxsize)
+        task = asyncio.create_task(self._write_forever(queue))
+        try:
+            yield
+        finally:
+            self._queue = None
+            await queue.put(None)
+            await task
+
+
+game_log = GameLog()
@@ -0,0 +1,571 @@
+"""Per-event leaderboard kept in a Valkey sorted set.
+
+Members are user IDs scored by ``points * SCORE_SCALE + connection_count``, so the set orders players by points
+and then by connections. Scoring transitions apply their deltas in place, a set that is missing or has expired
+is rebuilt from Postgres on the next read.
+
+Both leaderboards break ties by name and then by ID, names compared by code point (``COLLATE "C"``) so that Postgres
+and Python agree on their order whatever the database's collation.
+
+The paginated admin view is read from Postgres instead, with dense ranks computed by the database and keyset
+pagination over the ``ix_user_event_leaderboard`` covering index.
+
+Changes also mark the event as dirty, ``live_leaderboard`` then publishes the difference in its top entries to
+the ``leaderboard-{event_id}`` channel, at most once per ``LIVE_LEADERBOARD_INTERVAL``. The app's channels live in
+the memory of each process, so the events a process changes are also announced on the ``leaderboard_changes``
+Valkey channel. Every process publishes deltas to its own subscribers, for its own changes and the announced ones.
+"""
+
+import asyncio
+import base64
+import binascii
+import secrets
+from collections.abc import AsyncGenerator, Awaitable, Callable, Sequence
+from contextlib import asynccontextmanager, suppress
+
+import logfire
+import msgspec
+from litestar import Litestar
+from litestar.channels.backends.redis import RedisChannelsPubSubBackend
+from litestar.exceptions import ClientException
+from msgspec import Struct
+from sqlalchemy import ColumnElement, and_, func, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.backend.config import channels_plugin, sqlalchemy_config, valkey
+from src.backend.lib.dependencies import provide_user_service
+from src.backend.models import User
+from src.backend.schema.game import LeaderboardDelta, LeaderboardEntry, LiveLeaderboardEntry
+
+# Connection counts stay far below this, and points * SCORE_SCALE stays exact within a double
+SCORE_SCALE = 1_000_000
+
+# Sets expire once their event has gone quiet, every change to a set refreshes its TTL
+LEADERBOARD_TTL = 15 * 60
+
+# Live updates cover the top of the leaderboard shown on the admin page
+LIVE_LEADERBOARD_SIZE = 10
+LIVE_LEADERBOARD_INTERVAL = 1.0
+
+# Delay before subscribing again after losing the Valkey channel
+_RESUBSCRIBE_DELAY = 1
+
+# Deltas and profile changes are only applied while the set is built, otherwise the next read rebuilds it
+_INCREMENT_SCRIPT = valkey.register_script(
+    b"""
+    if redis.call('EXISTS', KEYS[1]) == 0 then
+        return 0
+    end
+
+    for i = 3, #ARGV do
+        redis.call('ZADD', KEYS[2], 'XX', 'INCR', ARGV[2], ARGV[i])
+    end
+
+    for i = 1, #KEYS do
+        redis.call('EXPIRE', KEYS[i], ARGV[1])
+    end
+
+    return 1
+    """,
+)
+_STORE_PLAYER_SCRIPT = valkey.register_script(
+    b"""
+    if redis.call('EXISTS', KEYS[1]) == 0 then
+        return 0
+    end
+
+    redis.call('ZADD', KEYS[2], 'NX', ARGV[3], ARGV[2])
+    redis.call('HSET', KEYS[3], ARGV[2], ARGV[4])
+
+    for i = 1, #KEYS do
+        redis.call('EXPIRE', KEYS[i], ARGV[1])
+    end
+
+    return 1
+    """,
+)
+
+
+class _Profile(Struct, array_like=True):
+    name: str
+    email: str
+
+
+_encoder = msgspec.msgpack.Encoder()
+_decoder = msgspec.msgpack.Decoder(_Profile)
+
+
+def _keys(event_id: int) -> tuple[str, str, str]:
+    prefix = f"leaderboard:{event_id}"
+    return f"{prefix}:ready", prefix, f"{prefix}:profiles"
+
+
+def _score(user: User) -> int:
+    return user.points * SCORE_SCALE + user.connection_count
+
+
+async def rebuild_leaderboard(event_id: int, users: Sequence[User]) -> None:
+    """Replace the event's leaderboard with the given (non-admin) users."""
+    ready_key, scores_key, profiles_key = _keys(event_id)
+
+    async with valkey.pipeline(transaction=True) as pipe:
+        pipe.delete(ready_key, scores_key, profiles_key)
+        if users:
+            pipe.zadd(scores_key, {str(user.id): _score(user) for user in users})
+            pipe.hset(
+                profiles_key,
+                mapping={str(user.id): _encoder.encode(_Profile(user.name, user.email)) for user in users},
+            )
+            pipe.expire(scores_key, LEADERBOARD_TTL)
+            pipe.expire(profiles_key, LEADERBOARD_TTL)
+        pipe.set(ready_key, 1, ex=LEADERBOARD_TTL)
+        await pipe.execute()
+
+    _mark_dirty(event_id)
+
+
+async def get_top_entries(
+    event_id: int,
+    *,
+    limit: int,
+    loader: Callable[[], Awaitable[Sequence[User]]],
+) -> tuple[list[LeaderboardEntry], int]:
+    """Return the top of the leaderboard, rebuilding it with ``loader`` if it isn't built.
+
+    Ranks are dense, players tied on points and connections share a rank.
+
+    Returns:
+        The top entries and the number of players on the leaderboard.
+
+    """
+    ready_key, scores_key, profiles_key = _keys(event_id)
+
+    # One more member than needed, to tell whether the players tied with the last one all make the top
+    async with valkey.pipeline(transaction=True) as pipe:
+        pipe.exists(ready_key)
+        pipe.zcard(scores_key)
+        pipe.zrevrange(scores_key, 0, limit, withscores=True)
+        ready, total, members = await pipe.execute()
+
+    if not ready:
+        users = await loader()
+        await rebuild_leaderboard(event_id, users)
+        return await get_top_entries(event_id, limit=limit, loader=loader)
+
+    # The set breaks ties by member, so when the players tied with the last one don't all fit, which of them make
+    # the top is read from the covering index instead of ordering all of them. At the start of a game that is
+    # every player of the event.
+    tied: list[tuple[int, int, _Profile]] = []
+    if len(members) > limit and members[limit][1] == members[limit - 1][1]:
+        cut_off = int(members[limit][1])
+        members = [(member, score) for member, score in members if score > cut_off]
+        async with sqlalchemy_config.get_session() as db_session:
+            players = await get_tied_players(
+                db_session,
+                event_id,
+                points=cut_off // SCORE_SCALE,
+                connection_count=cut_off % SCORE_SCALE,
+                limit=limit - len(members),
+            )
+        tied = [(user_id, cut_off, _Profile(name, email)) for user_id, name, email in players]
+    else:
+        members = members[:limit]
+
+    profiles = await valkey.hmget(profiles_key, [member for member, _ in members]) if members else []
+
+    top = sorted(
+        ((int(member), int(score), _decoder.decode(profile)) for (member, score), profile in zip(members, profiles)),
+        key=lambda item: (-item[1], item[2].name, item[0]),
+    )
+    top += tied
+
+    entries = []
+    rank = 1
+    for i, (user_id, score, profile) in enumerate(top):
+        if i > 0 and score != top[i - 1][1]:
+            rank += 1
+
+        entries.append(
+            LeaderboardEntry(
+                id=user_id,
+                name=profile.name,
+                email=profile.email,
+                points=score // SCORE_SCALE,
+                connection_count=score % SCORE_SCALE,
+                rank=rank,
+            ),
+        )
+
+    return entries, total
+
+
+async def _increment(event_id: int, delta: int, user_ids: Sequence[int]) -> None:
+    await _INCREMENT_SCRIPT(keys=_keys(event_id), args=[LEADERBOARD_TTL, delta, *user_ids])
+    _mark_dirty(event_id)
+
+
+async def record_points(event_id: int, *user_ids: int, points: int = 1) -> None:
+    """Award points to the given users."""
+    await _increment(event_id, points * SCORE_SCALE, user_ids)
+
+
+async def record_connection(event_id: int, *user_ids: int) -> None:
+    """Count a completed connection for the given users."""
+    await _increment(event_id, 1, user_ids)
+
+
+async def store_player(user: User) -> None:
+    """Add a new player, or refresh the profile of an existing one."""
+    if user.event_id is None or user.is_admin:
+        return
+
+    await _STORE_PLAYER_SCRIPT(
+        keys=_keys(user.event_id),
+        args=[LEADERBOARD_TTL, user.id, _score(user), _encoder.encode(_Profile(user.name, user.email))],
+    )
+    _mark_dirty(user.event_id)
+
+
+async def invalidate_leaderboard(event_id: int) -> None:
+    """Drop the event's leaderboard after a bulk change, the next read rebuilds it."""
+    await valkey.delete(*_keys(event_id))
+    _mark_dirty(event_id)
+
+
+async def remove_player(event_id: int, user_id: int) -> None:
+    _, scores_key, profiles_key = _keys(event_id)
+
+    async with valkey.pipeline(transaction=True) as pipe:
+        pipe.zrem(scores_key, str(user_id))
+        pipe.hdel(profiles_key, str(user_id))
+        await pipe.execute()
+
+    _mark_dirty(event_id)
+
+
+# ---------------------------------------------------------------------------
+# Paginated leaderboard
+# ---------------------------------------------------------------------------
+
+
+class _Cursor(Struct, array_like=True):
+    """Position of an entry in leaderboard order."""
+
+    points: int
+    connection_count: int
+    name: str
+    id: int
+
+
+def _encode_cursor(entry: LeaderboardEntry) -> str:
+    cursor = _Cursor(entry.points, entry.connection_count, entry.name, entry.id)
+    return base64.urlsafe_b64encode(msgspec.json.encode(cursor)).decode()
+
+
+def _decode_cursor(cursor: str) -> _Cursor:
+    try:
+        return msgspec.json.decode(base64.urlsafe_b64decode(cursor), type=_Cursor)
+    except (binascii.Error, ValueError, msgspec.DecodeError) as e:
+        raise ClientException(detail="Invalid leaderboard cursor") from e
+
+
+# Names in code point order, as Python compares them. The covering index is built on the same expression.
+_NAME = User.name.collate("C")
+
+
+def _players(event_id: int) -> tuple[ColumnElement[bool], ...]:
+    # Matches the predicate of the ix_user_event_leaderboard partial index
+    return User.event_id == event_id, ~User.is_admin
+
+
+def _after(cursor: _Cursor) -> ColumnElement[bool]:
+    # Points and connections sort descending while name and ID sort ascending, so a single row comparison won't do
+    return or_(
+        User.points < cursor.points,
+        and_(User.points == cursor.points, User.connection_count < cursor.connection_count),
+        and_(
+            User.points == cursor.points,
+            User.connection_count == cursor.connection_count,
+            tuple_(_NAME, User.id) > tuple_(cursor.name, cursor.id),
+        ),
+    )
+
+
+def _before(cursor: _Cursor) -> ColumnElement[bool]:
+    return or_(
+        User.points > cursor.points,
+        and_(User.points == cursor.points, User.connection_count > cursor.connection_count),
+        and_(
+            User.points == cursor.points,
+            User.connection_count == cursor.connection_count,
+            tuple_(_NAME, User.id) < tuple_(cursor.name, cursor.id),
+        ),
+    )
+
+
+async def count_players(db_session: AsyncSession, event_id: int) -> int:
+    return await db_session.scalar(select(func.count()).select_from(User).where(*_players(event_id))) or 0
+
+
+async def get_tied_players(
+    db_session: AsyncSession,
+    event_id: int,
+    *,
+    points: int,
+    connection_count: int,
+    limit: int,
+) -> list[tuple[int, str, str]]:
+    """Return the IDs, names and emails of the first ``limit`` players tied on points and connections."""
+    rows = await db_session.execute(
+        select(User.id, User.name, User.email)
+        .where(*_players(event_id), User.points == points, User.connection_count == connection_count)
+        .order_by(_NAME, User.id)
+        .limit(limit),
+    )
+    return [(row.id, row.name, row.email) for row in rows]
+
+
+async def _count_ranks_above(db_session: AsyncSession, event_id: int, *, points: int, connection_count: int) -> int:
+    ranks = (
+        select(User.points, User.connection_count)
+        .where(
+            *_players(event_id),
+            or_(User.points > points, and_(User.points == points, User.connection_count > connection_count)),
+        )
+        .distinct()
+        .subquery()
+    )
+    return await db_session.scalar(select(func.count()).select_from(ranks)) or 0
+
+
+async def get_leaderboard_page(
+    db_session: AsyncSession,
+    event_id: int,
+    *,
+    limit: int,
+    cursor: str | None = None,
+) -> tuple[list[LeaderboardEntry], str | None]:
+    """Return the page of the leaderboard following ``cursor``, or the first page.
+
+    The page is read in index order and ranked with ``DENSE_RANK()`` over the page, offset by the number of
+    distinct (points, connections) pairs ranked above it. Ranking the whole event in one window would make
+    Postgres sort every player of the event for each page.
+
+    Returns:
+        The entries of the page and the cursor of the next page, if there is one.
+
+    """
+    return await _get_page(db_session, event_id, limit=limit, after=_decode_cursor(cursor) if cursor else None)
+
+
+async def _get_page(
+    db_session: AsyncSession,
+    event_id: int,
+    *,
+    limit: int,
+    after: _Cursor | None,
+) -> tuple[list[LeaderboardEntry], str | None]:
+    page = (
+        select(User.id, User.name, User.email, User.points, User.connection_count)
+        .where(*_players(event_id), *((_after(after),) if after else ()))
+        .order_by(User.points.desc(), User.connection_count.desc(), _NAME, User.id)
+        .limit(limit + 1)
+        .subquery()
+    )
+    rows = (
+        await db_session.execute(
+            select(
+                page,
+                func.dense_rank().over(order_by=(page.c.points.desc(), page.c.connection_count.desc())).label("rank"),
+            ).order_by(page.c.points.desc(), page.c.connection_count.desc(), page.c.name.collate("C"), page.c.id),
+        )
+    ).all()
+    if not rows:
+        return [], None
+
+    ranks_above = (
+        await _count_ranks_above(
+            db_session,
+            event_id,
+            points=rows[0].points,
+            connection_count=rows[0].connection_count,
+        )
+        if after
+        else 0
+    )
+
+    entries = [
+        LeaderboardEntry(
+            id=row.id,
+            name=row.name,
+            email=row.email,
+            points=row.points,
+            connection_count=row.connection_count,
+            rank=ranks_above + row.rank,
+        )
+        for row in rows[:limit]
+    ]
+
+    return entries, _encode_cursor(entries[-1]) if len(rows) > limit else None
+
+
+async def get_leaderboard_around(
+    db_session: AsyncSession,
+    event_id: int,
+    user_id: int,
+    *,
+    size: int,
+) -> tuple[list[LeaderboardEntry], str | None]:
+    """Return the ``size`` entries above and below a player, along with the player's own entry.
+
+    Returns:
+        The entries around the player, empty if the player isn't on the leaderboard, and the cursor of the page
+        following them, if there is one.
+
+    """
+    player = (
+        await db_session.execute(
+            select(User.points, User.connection_count, User.name, User.id).where(
+                *_players(event_id),
+                User.id == user_id,
+            ),
+        )
+    ).first()
+    if not player:
+        return [], None
+
+    # Walk back from the player to find the entry the window starts after
+    above = (
+        await db_session.execute(
+            select(User.points, User.connection_count, User.name, User.id)
+            .where(*_players(event_id), _before(_Cursor(*player)))
+            .order_by(User.points, User.connection_count, _NAME.desc(), User.id.desc())
+            .limit(size + 1),
+        )
+    ).all()
+
+    after = _Cursor(*above[-1]) if len(above) > size else None
+    return await _get_page(db_session, event_id, limit=min(len(above), size) + 1 + size, after=after)
+
+
+# ---------------------------------------------------------------------------
+# Live updates
+# ---------------------------------------------------------------------------
+
+_CHANGES_CHANNEL = "leaderboard_changes"
+
+# Announcements are tagged with the process that made them, a process skips its own
+_PROCESS_ID = secrets.token_hex(8)
+
+_changes = RedisChannelsPubSubBackend(redis=valkey)  # type: ignore[arg-type]
+
+# Events to publish deltas for, and those among them changed by this process, which still have to be announced
+_dirty_events: set[int] = set()
+_changed_events: set[int] = set()
+_dirty = asyncio.Event()
+
+# Last published top entries and player count per event
+_published: dict[int, tuple[dict[int, LiveLeaderboardEntry], int]] = {}
+
+
+def _mark_dirty(event_id: int, *, announce: bool = True) -> None:
+    _dirty_events.add(event_id)
+    if announce:
+        _changed_events.add(event_id)
+    _dirty.set()
+
+
+async def _load_players(event_id: int) -> Sequence[User]:
+    async with sqlalchemy_config.get_session() as db_session:
+        user_service = await anext(provide_user_service(db_session))
+        return await user_service.list(event_id=event_id, is_admin=False)
+
+
+async def _publish_delta(event_id: int) -> None:
+    entries, total_users = await get_top_entries(
+        event_id,
+        limit=LIVE_LEADERBOARD_SIZE,
+        loader=lambda: _load_players(event_id),
+    )
+
+    top = {
+        entry.id: LiveLeaderboardEntry(
+            id=entry.id,
+            name=entry.name,
+            points=entry.points,
+            connection_count=entry.connection_count,
+            rank=entry.rank,
+        )
+        for entry in entries
+    }
+    previous_top, previous_total_users = _published.get(event_id, ({}, 0))
+    _published[event_id] = (top, total_users)
+
+    delta = LeaderboardDelta(
+        event_id=event_id,
+        entries=[entry for user_id, entry in top.items() if previous_top.get(user_id) != entry],
+        removed=[user_id for user_id in previous_top if user_id not in top],
+        total_users=total_users,
+    )
+    if delta.entries or delta.removed or total_users != previous_total_users:
+        channels_plugin.publish(delta, channels=f"leaderboard-{event_id}")
+
+
+async def _publish_deltas() -> None:
+    while True:
+        await _dirty.wait()
+        _dirty.clear()
+
+        event_ids = set(_dirty_events)
+        _dirty_events.clear()
+
+        if changed_event_ids := set(_changed_events):
+            _changed_events.clear()
+            try:
+                await _announce(changed_event_ids)
+            except Exception:  # noqa: BLE001
+                logfire.exception("Failed to announce leaderboard changes")
+
+        for event_id in event_ids:
+            try:
+                await _publish_delta(event_id)
+            except Exception:  # noqa: BLE001
+                logfire.exception("Failed to publish leaderboard delta", event_id=event_id)
+
+        # Changes made in the meantime are coalesced into the next delta
+        await asyncio.sleep(LIVE_LEADERBOARD_INTERVAL)
+
+
+async def _announce(event_ids: set[int]) -> None:
+    message = f"{_PROCESS_ID}:{','.join(map(str, event_ids))}"
+    await _changes.publish(message.encode(), [_CHANGES_CHANNEL])
+
+
+async def _listen_forever() -> None:
+    while True:
+        try:
+            await _changes.subscribe([_CHANGES_CHANNEL])
+            async for _, data in _changes.stream_events():
+                process_id, _, event_ids = data.decode().partition(":")
+                if process_id != _PROCESS_ID:
+                    for event_id in event_ids.split(","):
+                        _mark_dirty(int(event_id), announce=False)
+        except Exception:  # noqa: BLE001
+            # Changes announced while disconnected show up with the next change to the same event
+            logfire.exception("Lost the leaderboard changes channel")
+            await _changes.on_shutdown()
+
+        await asyncio.sleep(_RESUBSCRIBE_DELAY)
+
+
+@asynccontextmanager
+async def live_leaderboard(_: Litestar) -> AsyncGenerator[None, None]:
+    tasks = [asyncio.create_task(_publish_deltas()), asyncio.create_task(_listen_forever())]
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+        await _changes.on_shutdown()
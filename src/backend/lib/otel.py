@@ -1,19 +1,51 @@
 from __future__ import annotations
 
 import copy
-from typing import TYPE_CHECKING, ClassVar
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, ClassVar
 
 import logfire
 from litestar.contrib.opentelemetry import (
     OpenTelemetryConfig,
     OpenTelemetryInstrumentationMiddleware,
 )
+from litestar.enums import ScopeType
 from litestar.middleware import AbstractMiddleware
-from opentelemetry import metrics
+from opentelemetry import metrics, trace
+from sqlalchemy import event
 
 if TYPE_CHECKING:
-    from litestar.types import ASGIApp
+    from collections.abc import Iterator
+
+    from litestar.config.app import AppConfig
+    from litestar.types import ASGIApp, Message, Receive, Scope, Send
     from opentelemetry.instrumentation.asgi import OpenTelemetryMiddleware
+    from sqlalchemy.engine import Connection, ExceptionContext, ExecutionContext
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+# The same statement running this many times within one request is most likely an N+1 loop
+REPEATED_STATEMENT_THRESHOLD = 3
+
+meter = metrics.get_meter(__name__)
+query_count_histogram = meter.create_histogram(
+    "db.client.queries_per_unit",
+    unit="{query}",
+    description="Number of SQL statements executed per request or job",
+)
+query_duration_histogram = meter.create_histogram(
+    "db.client.query_time_per_unit",
+    unit="s",
+    description="Total time spent executing SQL statements per request or job",
+)
+query_rows_histogram = meter.create_histogram(
+    "db.client.rows_per_unit",
+    unit="{row}",
+    description="Number of rows returned or affected by SQL statements per request or job",
+)
 
 
 class OpenTelemetrySingletonMiddleware(OpenTelemetryInstrumentationMiddleware):
@@ -36,8 +68,148 @@ class OpenTelemetrySingletonMiddleware(OpenTelemetryInstrumentationMiddleware):
             cls.__open_telemetry_middleware__ = self.open_telemetry_middleware
 
 
-def configure_instrumentation() -> OpenTelemetryConfig:
+@dataclass
+class QueryStats:
+    count: int = 0
+    duration: float = 0.0
+    rows: int = 0
+    statements: Counter[str] = field(default_factory=Counter)
+
+    def record(self, statement: str, duration: float, rows: int) -> None:
+        self.count += 1
+        self.duration += duration
+        self.rows += max(rows, 0)
+        self.statements[statement] += 1
+
+
+_query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+# Key of the start times of the statements being executed on a connection, in `Connection.info`
+_START_TIMES_KEY = "query_start_time"
+
+
+def _before_cursor_execute(
+    conn: Connection,
+    _cursor: Any,
+    _statement: str,
+    _parameters: Any,
+    context: ExecutionContext,
+    _executemany: bool,
+) -> None:
+    conn.info.setdefault(_START_TIMES_KEY, []).append((context, perf_counter()))
+
+
+def _after_cursor_execute(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    _parameters: Any,
+    _context: ExecutionContext,
+    _executemany: bool,
+) -> None:
+    _, started_at = conn.info[_START_TIMES_KEY].pop()
+    if stats := _query_stats.get():
+        stats.record(statement, perf_counter() - started_at, cursor.rowcount)
+
+
+def _handle_error(exception_context: ExceptionContext) -> None:
+    # A statement that fails never gets to `after_cursor_execute`. Errors raised after it, e.g. while fetching,
+    # belong to a statement whose start time is already gone.
+    conn = exception_context.connection
+    start_times = conn.info.get(_START_TIMES_KEY) if conn is not None else None
+    if start_times and start_times[-1][0] is exception_context.execution_context:
+        start_times.pop()
+
+
+def _set_span_attributes(stats: QueryStats) -> None:
+    span = trace.get_current_span()
+    if span.is_recording():
+        span.set_attribute("db.query_count", stats.count)
+        span.set_attribute("db.query_time", stats.duration)
+        span.set_attribute("db.rows", stats.rows)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Count the statements, DB time and rows of every query executed through ``engine``."""
+    if not event.contains(engine.sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine.sync_engine, "handle_error", _handle_error)
+
+
+@contextmanager
+def track_queries(name: str, query_budget: int | None = None) -> Iterator[QueryStats]:
+    """Collect the queries executed within the block and export them as metrics and span attributes.
+
+    In debug mode, a warning is logged when the block exceeds ``query_budget`` or repeats a statement.
+    """
     from src.backend.config import settings
 
+    stats = QueryStats()
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+        attributes = {"db.query_unit": name}
+        query_count_histogram.record(stats.count, attributes)
+        query_duration_histogram.record(stats.duration, attributes)
+        query_rows_histogram.record(stats.rows, attributes)
+
+        _set_span_attributes(stats)
+
+        if settings.debug:
+            if query_budget is not None and stats.count > query_budget:
+                logfire.warn(
+                    "{name} executed {count} queries, over its budget of {query_budget}",
+                    name=name,
+                    count=stats.count,
+                    query_budget=query_budget,
+                )
+
+            for statement, count in stats.statements.items():
+                if count >= REPEATED_STATEMENT_THRESHOLD:
+                    logfire.warn(
+                        "{name} executed the same statement {count} times, possible N+1 query",
+                        name=name,
+                        count=count,
+                        statement=statement,
+                    )
+
+
+class QueryStatsMiddleware(AbstractMiddleware):
+    """Track the queries of each request, handlers can declare a ``query_budget`` opt."""
+
+    scopes = {ScopeType.HTTP}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        route_handler = scope["route_handler"]
+
+        with track_queries(route_handler.handler_name, query_budget=route_handler.opt.get("query_budget")) as stats:
+
+            async def send_wrapper(message: Message) -> None:
+                # The request span ends with the last body message, so annotate it before that goes out
+                if message["type"] == "http.response.body" and not message.get("more_body", False):
+                    _set_span_attributes(stats)
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+
+def configure_instrumentation() -> OpenTelemetryConfig:
+    from src.backend.config import settings, sqlalchemy_config
+
     logfire.configure(environment="development" if settings.debug else "production")
-    return OpenTelemetryConfig(meter=metrics.get_meter(__name__), middleware_class=OpenTelemetrySingletonMiddleware)
+    instrument_engine(sqlalchemy_config.get_engine())
+    return OpenTelemetryConfig(meter=meter, middleware_class=OpenTelemetrySingletonMiddleware)
+
+
+def track_request_queries(app_config: AppConfig) -> AppConfig:
+    """Put ``QueryStatsMiddleware`` in front of the other middleware.
+
+    Registered after the session auth's ``on_app_init``, which puts its own middleware first, so that loading the
+    principal counts against the request's query budget.
+    """
+    app_config.middleware.insert(0, QueryStatsMiddleware)
+    return app_config
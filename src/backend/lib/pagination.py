@@ -0,0 +1,73 @@
+"""Keyset pagination for the admin listings.
+
+Pages are read in primary key order and start right after the last row of the previous page, so every page is a
+single index range scan however deep into the table it is, and only one page of rows is ever loaded. The cursor is
+opaque to clients, they pass back the ``next_cursor`` of a page to get the next one.
+"""
+
+import base64
+import binascii
+from collections.abc import Sequence
+from typing import Annotated, Any
+
+import msgspec
+from advanced_alchemy.filters import LimitOffset, OrderBy
+from advanced_alchemy.repository import ModelT
+from advanced_alchemy.service import SQLAlchemyAsyncRepositoryService
+from litestar.exceptions import ClientException
+from litestar.params import Parameter
+from msgspec import Struct
+
+from src.backend.settings import get_settings
+
+MAX_PAGE_SIZE = get_settings().max_page_size
+
+# The frontend relies on the default being a valid page size
+DEFAULT_PAGE_SIZE = min(100, MAX_PAGE_SIZE)
+
+PageSize = Annotated[int, Parameter(ge=1, le=MAX_PAGE_SIZE, description="Number of items per page")]
+
+
+class _Cursor(Struct, array_like=True):
+    """Position of the last row of a page."""
+
+    id: int
+
+
+def _encode_cursor(row_id: int) -> str:
+    return base64.urlsafe_b64encode(msgspec.json.encode(_Cursor(row_id))).decode()
+
+
+def _decode_cursor(cursor: str) -> _Cursor:
+    try:
+        return msgspec.json.decode(base64.urlsafe_b64decode(cursor), type=_Cursor)
+    except (binascii.Error, ValueError, msgspec.DecodeError) as e:
+        raise ClientException(detail="Invalid page cursor") from e
+
+
+async def get_page(
+    service: SQLAlchemyAsyncRepositoryService[ModelT],
+    *filters: Any,
+    limit: int,
+    cursor: str | None = None,
+    **kwargs: Any,
+) -> tuple[Sequence[ModelT], str | None]:
+    """Return the page of ``service``'s rows matching the filters that follows ``cursor``, or the first page.
+
+    Returns:
+        The rows of the page and the cursor of the next page, if there is one.
+
+    """
+    model = service.repository.model_type
+    after = (model.id > _decode_cursor(cursor).id,) if cursor else ()  # type: ignore[attr-defined]
+
+    # One row more than the page tells whether there is a next page without counting
+    rows = await service.list(
+        *filters,
+        *after,
+        OrderBy("id", "asc"),
+        LimitOffset(limit=limit + 1, offset=0),
+        **kwargs,
+    )
+
+    return rows[:limit], _encode_cursor(rows[limit - 1].id) if len(rows) > limit else None  # type: ignore[attr-defined]
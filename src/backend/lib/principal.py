@@ -0,0 +1,212 @@
+"""Authenticated principal cached in process memory and in a shared store.
+
+The principal holds the few user fields that authentication, guards and the game handlers read, so most
+requests authenticate without touching the database. Entries are dropped once a transaction that changed one
+of those fields commits, whether it went through the ORM unit of work or a bulk ``update(User)``. A principal read
+while such a transaction commits is returned but not cached, it may predate the change.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+
+import msgspec
+from litestar.stores.base import Store
+from msgspec import Struct
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import ORMExecuteState, Session, UOWTransaction
+
+from src.backend.models import User, UserStatus
+
+# Columns copied into the principal, a change to any other column keeps the cached entry
+PRINCIPAL_FIELDS = frozenset({"event_id", "is_admin", "status", "qr_code"})
+
+# Key of the user IDs to invalidate once the session commits, in `Session.info`
+_PENDING_KEY = "invalidated_principals"
+_ALL_USERS = 0
+
+
+class Principal(Struct, frozen=True, gc=False, array_like=True):
+    """The authenticated user, as seen by request handlers."""
+
+    id: int
+    event_id: int | None
+    is_admin: bool
+    status: UserStatus
+    qr_code: str
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            event_id=user.event_id,
+            is_admin=user.is_admin,
+            status=user.status,
+            qr_code=user.qr_code,
+        )
+
+
+class TTLCache[K, V]:
+    """A least recently used cache whose entries also expire after ``ttl`` seconds, or their own ``ttl``."""
+
+    def __init__(self, *, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: K) -> V | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V, *, ttl: float | None = None) -> None:
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class PrincipalCache:
+    """Two-level principal cache, a process-local ``TTLCache`` in front of ``store``.
+
+    Creating the cache registers the session event listeners that invalidate it.
+    """
+
+    def __init__(self, store: Store, *, maxsize: int = 10_000, ttl: float = 60, store_ttl: int = 10 * 60) -> None:
+        self.store = store
+        self.store_ttl = store_ttl
+        self._local = TTLCache[int, Principal](maxsize=maxsize, ttl=ttl)
+        self._encoder = msgspec.msgpack.Encoder()
+        self._decoder = msgspec.msgpack.Decoder(Principal)
+
+        # Users whose store entry is being deleted, the store must not be read for them until that's done
+        self._deleting: set[int] = set()
+        self._tasks: set[asyncio.Task] = set()
+
+        # Bumped on every invalidation, per user and for all of them, so a read that raced one isn't cached
+        self._generations: dict[int, int] = {}
+        self._epoch = 0
+
+        event.listen(Session, "after_flush", self._after_flush)
+        event.listen(Session, "do_orm_execute", self._do_orm_execute)
+        event.listen(Session, "after_commit", self._after_commit)
+        event.listen(Session, "after_rollback", self._after_rollback)
+
+    async def get(self, user_id: int, loader: Callable[[], Awaitable[User | None]]) -> Principal | None:
+        """Return the user's principal, falling back to ``loader`` when neither level has it."""
+        if principal := self._local.get(user_id):
+            return principal
+
+        generation = self._generation(user_id)
+
+        if user_id not in self._deleting and (data := await self.store.get(str(user_id))):
+            principal = self._decoder.decode(data)
+            if self._generation(user_id) == generation:
+                self._local.set(user_id, principal)
+            return principal
+
+        user = await loader()
+        if not user:
+            return None
+
+        principal = Principal.from_user(user)
+        if self._generation(user_id) == generation:
+            self._local.set(user_id, principal)
+            await self.store.set(str(user_id), self._encoder.encode(principal), expires_in=self.store_ttl)
+        return principal
+
+    def _generation(self, user_id: int) -> tuple[int, int]:
+        return self._epoch, self._generations.get(user_id, 0)
+
+    def invalidate(self, user_ids: Iterable[int]) -> None:
+        """Drop the given users from both levels."""
+        user_ids = set(user_ids)
+        for user_id in user_ids:
+            self._local.pop(user_id)
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Committed outside of the event loop, the store entries expire on their own
+            return
+
+        self._deleting |= user_ids
+        task = loop.create_task(self._delete(user_ids))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _delete(self, user_ids: set[int]) -> None:
+        try:
+            for user_id in user_ids:
+                await self.store.delete(str(user_id))
+        finally:
+            self._deleting -= user_ids
+
+    # ----------------
+    # Session events
+    # ----------------
+
+    @staticmethod
+    def _mark(session: Session, user_ids: Iterable[int]) -> None:
+        session.info.setdefault(_PENDING_KEY, set()).update(user_ids)
+
+    def _after_flush(self, session: Session, _flush_context: UOWTransaction) -> None:
+        # Changes made through the unit of work, e.g. `UserService.update` or the admin views
+        changed = [obj.id for obj in session.deleted if isinstance(obj, User)] + [
+            obj.id
+            for obj in session.dirty
+            if isinstance(obj, User)
+            and any(inspect(obj).attrs[field].history.has_changes() for field in PRINCIPAL_FIELDS)
+        ]
+        if changed:
+            self._mark(session, changed)
+
+    def _do_orm_execute(self, state: ORMExecuteState) -> None:
+        if not (state.is_update or state.is_delete) or state.bind_mapper is not inspect(User):
+            return
+
+        # Bulk updates by primary key, e.g. `UserService.update_many`
+        if isinstance(state.parameters, list):
+            self._mark(
+                state.session,
+                [row["id"] for row in state.parameters if state.is_delete or PRINCIPAL_FIELDS & row.keys()],
+            )
+            return
+
+        # Criteria based statements, e.g. the points increment in `GameController.answer_question`. The affected
+        # users aren't known, so a statement that may change the principal drops every local entry.
+        values = getattr(state.statement, "_values", None) or {}
+        if state.is_delete or any(getattr(column, "key", column) in PRINCIPAL_FIELDS for column in values):
+            self._mark(state.session, [_ALL_USERS])
+
+    def _after_commit(self, session: Session) -> None:
+        if not (user_ids := session.info.pop(_PENDING_KEY, None)):
+            return
+
+        if _ALL_USERS in user_ids:
+            self._local = TTLCache[int, Principal](maxsize=self._local.maxsize, ttl=self._local.ttl)
+            self._epoch += 1
+            user_ids.discard(_ALL_USERS)
+
+        if user_ids:
+            self.invalidate(user_ids)
+
+    @staticmethod
+    def _after_rollback(session: Session) -> None:
+        session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,329 @@
+"""EXPLAIN-based regression checks for the hot game queries.
+
+Each workload issues the same service calls as the handler or job it is named after, the SQL they emit is
+captured from the engine and run through ``EXPLAIN (FORMAT JSON)``. A workload fails when one of its
+statements sequentially scans a table that must stay indexed or when its estimated cost exceeds the budget.
+"""
+
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.backend.lib.dependencies import (
+    provide_connection_question_service,
+    provide_connection_service,
+    provide_user_answer_service,
+    provide_user_service,
+)
+from src.backend.lib.leaderboard import (
+    count_players,
+    get_leaderboard_around,
+    get_leaderboard_page,
+    get_tied_players,
+)
+from src.backend.lib.pagination import get_page
+from src.backend.lib.services import (
+    ConnectionQuestionService,
+    ConnectionService,
+    UserAnswerService,
+    UserService,
+)
+from src.backend.models import Connection, ConnectionQuestion, ConnectionStatus, User, UserStatus
+
+# Tables that grow with the size of an event, they must never be read with a sequential scan
+LARGE_TABLES = frozenset({"users", "connections", "connection_questions", "user_answers"})
+
+
+@dataclass
+class PlanContext:
+    db_session: AsyncSession
+    event_id: int
+    user_id: int
+    connection_id: int
+    user_service: UserService
+    connection_service: ConnectionService
+    connection_question_service: ConnectionQuestionService
+    user_answer_service: UserAnswerService
+
+
+@dataclass
+class HotQuery:
+    name: str
+    run: Callable[[PlanContext], Awaitable[Any]]
+    max_cost: float
+    require_index: bool = True
+
+
+@dataclass
+class PlanResult:
+    name: str
+    statement: str
+    total_cost: float
+    seq_scans: list[str] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def passed(self) -> bool:
+        return not self.errors
+
+
+async def _open_connection_as_user1(ctx: PlanContext) -> None:
+    # GameController._get_user_active_connection
+    await ctx.connection_service.get_one_or_none(
+        Connection.status.in_([ConnectionStatus.PENDING, ConnectionStatus.ACTIVE]),
+        user1_id=ctx.user_id,
+        event_id=ctx.event_id,
+    )
+
+
+async def _open_connection_as_user2(ctx: PlanContext) -> None:
+    # GameController._get_user_active_connection
+    await ctx.connection_service.get_one_or_none(
+        Connection.status.in_([ConnectionStatus.PENDING, ConnectionStatus.ACTIVE]),
+        user2_id=ctx.user_id,
+        event_id=ctx.event_id,
+    )
+
+
+async def _connection_questions(ctx: PlanContext) -> None:
+    # GameController._get_user_connection_questions
+    await ctx.connection_question_service.list(
+        ConnectionQuestion.user_id == ctx.user_id,
+        ConnectionQuestion.connection_id == ctx.connection_id,
+    )
+
+
+async def _partner_answers(ctx: PlanContext) -> None:
+    # GameController.answer_question
+    await ctx.user_service.get_one(id=ctx.user_id, load=[User.answers])
+
+
+async def _signup_answers(ctx: PlanContext) -> None:
+    # GameController._create_connection_questions
+    await ctx.user_answer_service.list(user_id=ctx.user_id)
+
+
+async def _leaderboard(ctx: PlanContext) -> None:
+    # GameController.get_leaderboard, first and second page
+    _, cursor = await get_leaderboard_page(ctx.db_session, ctx.event_id, limit=10)
+    await get_leaderboard_page(ctx.db_session, ctx.event_id, limit=10, cursor=cursor)
+
+
+async def _leaderboard_total(ctx: PlanContext) -> None:
+    # GameController.get_leaderboard
+    await count_players(ctx.db_session, ctx.event_id)
+
+
+async def _leaderboard_around_user(ctx: PlanContext) -> None:
+    # GameController.get_leaderboard_around_user
+    await get_leaderboard_around(ctx.db_session, ctx.event_id, ctx.user_id, size=5)
+
+
+async def _live_leaderboard_ties(ctx: PlanContext) -> None:
+    # lib.leaderboard.get_top_entries, when the players tied with the last one don't all make the top
+    await get_tied_players(ctx.db_session, ctx.event_id, points=0, connection_count=0, limit=10)
+
+
+async def _expired_connections(ctx: PlanContext) -> None:
+    # lib.game._cleanup_expired_connections
+    await ctx.connection_service.list(
+        Connection.status.in_([ConnectionStatus.PENDING, ConnectionStatus.ACTIVE]),
+        Connection.end_time < datetime.now(UTC),
+        event_id=ctx.event_id,
+    )
+
+
+async def _available_users(ctx: PlanContext) -> None:
+    # lib.game._create_connection
+    await ctx.user_service.list(
+        event_id=ctx.event_id,
+        status=UserStatus.AVAILABLE,
+        is_admin=False,
+    )
+
+
+async def _users_page(ctx: PlanContext) -> None:
+    # UserController.get_users, first and second page
+    _, cursor = await get_page(ctx.user_service, limit=100)
+    await get_page(ctx.user_service, limit=100, cursor=cursor)
+
+
+async def _user_answers_page(ctx: PlanContext) -> None:
+    # UserAnswerController.get_all_user_answers, first and second page
+    _, cursor = await get_page(ctx.user_answer_service, limit=100)
+    await get_page(ctx.user_answer_service, limit=100, cursor=cursor)
+
+
+HOT_QUERIES: tuple[HotQuery, ...] = (
+    HotQuery(name="game.open_connection_as_user1", run=_open_connection_as_user1, max_cost=50),
+    HotQuery(name="game.open_connection_as_user2", run=_open_connection_as_user2, max_cost=50),
+    HotQuery(name="game.connection_questions", run=_connection_questions, max_cost=50),
+    HotQuery(name="game.partner_answers", run=_partner_answers, max_cost=100),
+    HotQuery(name="game.signup_answers", run=_signup_answers, max_cost=100),
+    HotQuery(name="game.leaderboard", run=_leaderboard, max_cost=100),
+    # Counting the players of an event, or the ranks above one of them, reads a large part of the event anyway
+    HotQuery(name="game.leaderboard_total", run=_leaderboard_total, max_cost=2_500, require_index=False),
+    HotQuery(name="game.leaderboard_around_user", run=_leaderboard_around_user, max_cost=2_500, require_index=False),
+    HotQuery(name="game.live_leaderboard_ties", run=_live_leaderboard_ties, max_cost=100),
+    HotQuery(name="game.expired_connections", run=_expired_connections, max_cost=500),
+    HotQuery(name="game.available_users", run=_available_users, max_cost=2_500),
+    HotQuery(name="admin.users_page", run=_users_page, max_cost=100),
+    HotQuery(name="admin.user_answers_page", run=_user_answers_page, max_cost=100),
+)
+
+
+@contextmanager
+def _record_statements(db_session: AsyncSession) -> Iterator[list[tuple[str, Any]]]:
+    statements: list[tuple[str, Any]] = []
+    engine = db_session.get_bind()
+
+    def _before_cursor_execute(
+        _conn: Any,
+        _cursor: Any,
+        statement: str,
+        parameters: Any,
+        _context: Any,
+        executemany: bool,
+    ) -> None:
+        if not executemany and statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+
+
+def _walk_plan(node: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk_plan(child)
+
+
+async def _explain(db_session: AsyncSession, hot_query: HotQuery, statement: str, parameters: Any) -> PlanResult:
+    connection = await db_session.connection()
+    result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+    plan = result.scalar_one()[0]["Plan"]
+
+    plan_result = PlanResult(name=hot_query.name, statement=statement, total_cost=plan["Total Cost"])
+    plan_result.seq_scans = [
+        node["Relation Name"]
+        for node in _walk_plan(plan)
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in LARGE_TABLES
+    ]
+
+    if hot_query.require_index and plan_result.seq_scans:
+        plan_result.errors.append(f"sequential scan on {', '.join(sorted(set(plan_result.seq_scans)))}")
+    if plan_result.total_cost > hot_query.max_cost:
+        plan_result.errors.append(
+            f"estimated cost {plan_result.total_cost:.0f} exceeds budget {hot_query.max_cost:.0f}"
+        )
+
+    return plan_result
+
+
+async def seed_event(db_session: AsyncSession, *, users: int, connections: int) -> int:
+    """Seed a synthetic, active event and refresh the planner statistics.
+
+    Meant to run inside a transaction that is rolled back afterwards.
+
+    Returns:
+        The ID of the seeded event.
+
+    """
+    event_id = (
+        await db_session.execute(
+            text(
+                "INSERT INTO events (name, code, is_active, created_at, updated_at) "
+                "VALUES ('Query plan check', md5(random()::text), true, now(), now()) "
+                "RETURNING id",
+            ),
+        )
+    ).scalar_one()
+
+    # Most players are mid-game, roughly one in ten is waiting for a match
+    await db_session.execute(
+        text(
+            "INSERT INTO users "
+            "(name, email, points, qr_code, connection_count, status, is_admin, event_id, created_at, updated_at) "
+            "SELECT 'Player ' || g, 'player' || g || '@example.com', (random() * 50)::int, md5(random()::text || g), "
+            "(random() * 20)::int, (CASE WHEN g % 10 = 0 THEN 'AVAILABLE' ELSE 'BUSY' END)::userstatus, "
+            "false, :event_id, now(), now() "
+            "FROM generate_series(1, :users) AS g",
+        ),
+        {"event_id": event_id, "users": users},
+    )
+
+    # Pair player i with player i + k, which keeps every pair unique while k stays below users / 2.
+    # In the first round (k = 1) one in twenty five connections is still open, without any player being in
+    # two open connections. Everything else is finished.
+    await db_session.execute(
+        text(
+            "WITH players AS ("
+            "  SELECT id, row_number() OVER (ORDER BY id) - 1 AS idx FROM users WHERE event_id = :event_id"
+            ") "
+            "INSERT INTO connections "
+            "(start_time, end_time, status, event_id, user1_id, user2_id, created_at, updated_at) "
+            "SELECT now(), now() + interval '4 hours', "
+            "(CASE WHEN g < :users AND g % 50 = 0 THEN 'PENDING' WHEN g < :users AND g % 50 = 2 THEN 'ACTIVE' "
+            "WHEN g % 5 = 0 THEN 'CANCELLED' ELSE 'COMPLETED' END)::connectionstatus, "
+            ":event_id, p1.id, p2.id, now(), now() "
+            "FROM generate_series(0, :connections - 1) AS g "
+            "JOIN players AS p1 ON p1.idx = g % :users "
+            "JOIN players AS p2 ON p2.idx = (g % :users + 1 + g / :users) % :users",
+        ),
+        {"event_id": event_id, "users": users, "connections": connections},
+    )
+
+    for table in ("events", "users", "connections"):
+        await db_session.execute(text(f"ANALYZE {table}"))
+
+    return event_id
+
+
+async def check_query_plans(db_session: AsyncSession, *, event_id: int) -> list[PlanResult]:
+    """EXPLAIN every hot query against the given event.
+
+    Returns:
+        One result per captured statement.
+
+    """
+    sample = (
+        await db_session.execute(
+            text(
+                "SELECT id, user1_id FROM connections "
+                "WHERE event_id = :event_id AND status IN ('PENDING', 'ACTIVE') ORDER BY id LIMIT 1",
+            ),
+            {"event_id": event_id},
+        )
+    ).first()
+    if not sample:
+        msg = f"Event {event_id} has no open connections to sample"
+        raise ValueError(msg)
+
+    ctx = PlanContext(
+        db_session=db_session,
+        event_id=event_id,
+        connection_id=sample.id,
+        user_id=sample.user1_id,
+        user_service=await anext(provide_user_service(db_session)),
+        connection_service=await anext(provide_connection_service(db_session)),
+        connection_question_service=await anext(provide_connection_question_service(db_session)),
+        user_answer_service=await anext(provide_user_answer_service(db_session)),
+    )
+
+    results = []
+    for hot_query in HOT_QUERIES:
+        with _record_statements(db_session) as statements:
+            await hot_query.run(ctx)
+
+        for statement, parameters in statements:
+            results.append(await _explain(db_session, hot_query, statement, parameters))
+
+    return results
@@ -1,11 +1,92 @@
-import hashlib
+"""Rate limiting with token buckets kept in Valkey.
+
+A bucket holds up to ``quantity`` tokens and refills at ``quantity`` per ``unit``, every request takes one token.
+Refilling and taking tokens happen in a single server side script, so concurrent requests can't overspend a bucket.
+The refill uses the server's clock, so every worker agrees on it.
+
+Each process leases a few tokens at a time and hands them out from memory, it only goes back to Valkey once its
+lease is spent or has expired. A rejection is remembered until the bucket has a token again, so a client hammering
+a limited route is turned away without reaching Valkey at all. Unused leased tokens are dropped when the lease
+expires, so a client is never let through more often than its policy allows, at worst slightly less often.
+
+The app wide policy can be overridden per route with a ``rate_limit`` opt, e.g. ``@post(rate_limit=("minute", 5))``.
+Those routes get a bucket of their own instead of drawing from the app wide one.
+"""
+
+import asyncio
+import math
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from hashlib import blake2b
 from typing import Any
 
 from litestar.connection import Request
+from litestar.datastructures import MutableScopeHeaders
+from litestar.exceptions import TooManyRequestsException
 from litestar.exceptions.http_exceptions import ImproperlyConfiguredException
-from litestar.middleware.rate_limit import RateLimitMiddleware
+from litestar.middleware.rate_limit import DURATION_VALUES, DurationUnit, RateLimitConfig, RateLimitMiddleware
+from litestar.types import Message, Receive, Scope, Send
+from msgspec import Struct
+from valkey.asyncio import Valkey
+
+from src.backend.lib.principal import Principal, TTLCache
+
+type RateLimitPolicy = tuple[DurationUnit, int]
+
+# Leases hand out at most this share of a bucket, so a single process can't drain it for the others
+LEASE_FRACTION = 10
+
+# Refills the bucket for the time elapsed since the last request and takes up to ARGV[3] tokens.
+# Returns the tokens taken, the tokens left, the seconds until the bucket is full again and the seconds until it
+# has a token again.
+_TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "updated_at")
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + (now - updated_at) * capacity / period)
+
+local granted = math.min(requested, math.floor(tokens))
+tokens = tokens - granted
+
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "updated_at", tostring(now))
+redis.call("EXPIRE", KEYS[1], period)
+return {
+    granted,
+    math.floor(tokens),
+    math.ceil((capacity - tokens) * period / capacity),
+    math.ceil(math.max(0, 1 - tokens) * period / capacity),
+}
+"""
+
+
+# Position of each fingerprinted header in the fingerprint, by its name as it appears in the ASGI scope
+_FINGERPRINT_HEADERS = {
+    b"x-forwarded-for": 0,
+    b"x-real-ip": 1,
+    b"user-agent": 2,
+    b"accept-language": 3,
+    b"accept-encoding": 4,
+    b"host": 5,
+}
+
+# Distinct header combinations whose fingerprint is kept, a burst from one client is hashed once
+FINGERPRINT_CACHE_SIZE = 4096
 
-from src.backend.models import User
+
+@lru_cache(maxsize=FINGERPRINT_CACHE_SIZE)
+def _hash_fingerprint(
+    client_ip: bytes, user_agent: bytes, accept_language: bytes, accept_encoding: bytes, host: bytes
+) -> str:
+    # Header values can't contain NUL, so the joined values are unambiguous
+    data = b"\0".join((client_ip, user_agent, accept_language, accept_encoding, host))
+    return f"browser_{blake2b(data, digest_size=16).hexdigest()}"
 
 
 class BrowserFingerprint:
@@ -15,45 +96,28 @@ class BrowserFingerprint:
     def generate_fingerprint(request: Request) -> str:
         """Generate a browser fingerprint from request headers.
 
+        The headers are read straight from the ASGI scope and hashed with BLAKE2b, which is faster than SHA-256
+        and, unlike ``hash()``, gives the same fingerprint in every worker.
+
         Returns:
             A browser fingerprint string.
 
         """
-        fingerprint_data = []
+        values = [b"", b"", b"", b"", b"", b""]
+        for name, value in request.scope["headers"]:
+            index = _FINGERPRINT_HEADERS.get(name)
+            if index is not None and not values[index]:
+                values[index] = value
+        forwarded_for, real_ip, user_agent, accept_language, accept_encoding, host = values
 
         # IP address (with fallback for proxies)
         client_ip = (
-            request.headers.get("X-Forwarded-For", "").split(",")[0].strip()
-            or request.headers.get("X-Real-IP", "")
-            or request.client.host
-            if request.client
-            else "unknown"
+            forwarded_for.split(b",", 1)[0].strip()
+            or real_ip
+            or (request.client.host.encode() if request.client else b"unknown")
         )
-        fingerprint_data.append(f"ip:{client_ip}")
-
-        # User agent (most stable identifier)
-        user_agent = request.headers.get("User-Agent", "unknown")
-        fingerprint_data.append(f"ua:{user_agent}")
-
-        # Accept language (relatively stable)
-        accept_language = request.headers.get("Accept-Language", "unknown")
-        fingerprint_data.append(f"lang:{accept_language}")
-
-        # Accept encoding (stable for same browser)
-        accept_encoding = request.headers.get("Accept-Encoding", "unknown")
-        fingerprint_data.append(f"enc:{accept_encoding}")
-
-        # Host header (for multi-tenant scenarios)
-        host = request.headers.get("Host", "unknown")
-        fingerprint_data.append(f"host:{host}")
-
-        # Combine all data and hash
-        combined = "|".join(fingerprint_data)
 
-        # Use SHA-256 for consistent, collision-resistant fingerprint
-        fingerprint_hash = hashlib.sha256(combined.encode("utf-8")).hexdigest()
-
-        return f"browser_{fingerprint_hash[:32]}"
+        return _hash_fingerprint(client_ip, user_agent, accept_language, accept_encoding, host)
 
     @staticmethod
     def get_stable_user_id(request: Request) -> str:
@@ -66,13 +130,130 @@ class BrowserFingerprint:
         return BrowserFingerprint.generate_fingerprint(request)
 
 
+class RateLimitResult(Struct, frozen=True, gc=False):
+    allowed: bool
+    remaining: int
+    reset: int  # Seconds until the bucket is full again
+
+
+class _Lease(Struct, gc=False):
+    allowed: bool  # False if the lease only remembers a rejection
+    tokens: int  # Tokens left to hand out
+    remaining: int  # Tokens left in the shared bucket when the lease was taken
+    reset_at: float
+
+
+class TokenBucketLimiter:
+    """Token buckets stored in ``valkey`` under ``namespace``, leased to the process a few tokens at a time."""
+
+    def __init__(self, valkey: Valkey, *, namespace: str, max_leases: int = 100_000) -> None:
+        self.namespace = namespace
+        self._script = valkey.register_script(_TOKEN_BUCKET_SCRIPT)
+        # Lease expiries vary, every lease is stored with its own TTL
+        self._leases = TTLCache[str, _Lease](maxsize=max_leases, ttl=0)
+        self._renewing: dict[str, asyncio.Event] = {}
+
+    async def hit(self, key: str, policy: RateLimitPolicy) -> RateLimitResult:
+        while True:
+            if lease := self._leases.get(key):
+                if lease.tokens:
+                    lease.tokens -= 1
+                    return self._result(lease, allowed=True)
+
+                if not lease.allowed:
+                    return self._result(lease, allowed=False)
+
+            # Concurrent requests for the same key wait for one lease instead of each taking their own
+            if not (renewing := self._renewing.get(key)):
+                break
+            await renewing.wait()
+
+        self._renewing[key] = renewing = asyncio.Event()
+        try:
+            lease = await self._renew(key, policy)
+        finally:
+            del self._renewing[key]
+            renewing.set()
+
+        return self._result(lease, allowed=lease.allowed)
+
+    async def _renew(self, key: str, policy: RateLimitPolicy) -> _Lease:
+        unit, quantity = policy
+        period = DURATION_VALUES[unit]
+        granted, remaining, reset, retry_after = await self._script(
+            keys=[f"{self.namespace}:{key}"],
+            args=[quantity, period, max(1, quantity // LEASE_FRACTION)],
+        )
+
+        now = time.monotonic()
+        lease = _Lease(allowed=bool(granted), tokens=max(0, granted - 1), remaining=remaining, reset_at=now + reset)
+        if granted:
+            # The leased tokens are valid for as long as the bucket takes to refill them
+            self._leases.set(key, lease, ttl=granted * period / quantity)
+        else:
+            # Remember the rejection until the bucket has a token again
+            self._leases.set(key, lease, ttl=retry_after)
+
+        return lease
+
+    @staticmethod
+    def _result(lease: _Lease, *, allowed: bool) -> RateLimitResult:
+        return RateLimitResult(
+            allowed=allowed,
+            remaining=lease.remaining + lease.tokens,
+            reset=max(0, math.ceil(lease.reset_at - time.monotonic())),
+        )
+
+
 class CustomRateLimitMiddleware(RateLimitMiddleware):
     """Custom rate limiting middleware.
 
     Uses user ID for logged in users and browser fingerprint for anonymous users.
     """
 
-    def cache_key_from_request(self, request: Request[User, Any, Any]) -> str:
+    config: "ValkeyRateLimitConfig"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        request: Request[Principal, Any, Any] = scope["litestar_app"].request_class(scope)
+
+        if await self.should_check_request(request=request):
+            policy, key = self.config.rate_limit, self.cache_key_from_request(request=request)
+            if route_policy := scope["route_handler"].opt.get(self.config.policy_opt_key):
+                policy, key = route_policy, f"{key}::{scope['path_template']}"
+
+            result = await self.config.limiter.hit(key, policy)
+            headers = self._create_headers(policy, result) if self.config.set_rate_limit_headers else None
+            if not result.allowed:
+                raise TooManyRequestsException(headers=headers)
+
+            if headers:
+                send = self._create_send_wrapper(send, headers)
+
+        await self.app(scope, receive, send)
+
+    def _create_headers(self, policy: RateLimitPolicy, result: RateLimitResult) -> dict[str, str]:
+        unit, quantity = policy
+        return {
+            self.config.rate_limit_policy_header_key: f"{quantity}; w={DURATION_VALUES[unit]}",
+            self.config.rate_limit_limit_header_key: str(quantity),
+            self.config.rate_limit_remaining_header_key: str(result.remaining),
+            self.config.rate_limit_reset_header_key: str(result.reset),
+        }
+
+    @staticmethod
+    def _create_send_wrapper(send: Send, headers: dict[str, str]) -> Send:
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                response_headers = MutableScopeHeaders(message)
+                # Handlers never set these, appending skips the search for an existing header
+                for key, value in headers.items():
+                    response_headers.add(key, value)
+            await send(message)
+
+        return send_wrapper
+
+    def cache_key_from_request(self, request: Request[Principal, Any, Any]) -> str:
         """Get a cache-key from a ``Request`` using user ID or browser fingerprint.
 
         Args:
@@ -87,7 +268,7 @@ class CustomRateLimitMiddleware(RateLimitMiddleware):
         except ImproperlyConfiguredException:
             user = None
 
-        if user and isinstance(user, User) and hasattr(user, "id"):
+        if isinstance(user, Principal):
             identifier = f"user_{user.id}"
         else:
             identifier = BrowserFingerprint.get_stable_user_id(request)
@@ -100,3 +281,13 @@ class CustomRateLimitMiddleware(RateLimitMiddleware):
             identifier += "::static"
 
         return f"{type(self).__name__}::{identifier}"
+
+
+@dataclass
+class ValkeyRateLimitConfig(RateLimitConfig):
+    """``RateLimitConfig`` for ``CustomRateLimitMiddleware``, ``store`` is unused as the buckets live in ``limiter``."""
+
+    limiter: TokenBucketLimiter = field(kw_only=True)
+    policy_opt_key: str = "rate_limit"
+    """Route opt holding a ``(unit, quantity)`` policy that replaces ``rate_limit`` for that route."""
+    middleware_class: type[RateLimitMiddleware] = CustomRateLimitMiddleware
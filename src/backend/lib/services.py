@@ -1,17 +1,39 @@
+import uuid
+from collections.abc import Iterable, Sequence
+
 from advanced_alchemy.repository import SQLAlchemyAsyncRepository
 from advanced_alchemy.service import (
     SQLAlchemyAsyncRepositoryService,
 )
+from sqlalchemy import Row, delete, exists, select, text
+from sqlalchemy.dialects.postgresql import insert
 
 from src.backend.models import (
     Connection,
     ConnectionQuestion,
     Event,
+    EventWhitelistEntry,
     Question,
     User,
     UserAnswer,
 )
 
+# The user and their answers in one statement. An email that already signed up for the event inserts nothing.
+_SIGN_UP_SQL = text(
+    "WITH created AS ("
+    "  INSERT INTO users "
+    "  (name, email, points, qr_code, connection_count, status, is_admin, event_id, created_at, updated_at) "
+    "  VALUES (:name, :email, 0, :qr_code, 0, 'AVAILABLE', false, :event_id, now(), now()) "
+    "  ON CONFLICT ON CONSTRAINT uq_user_email_event DO NOTHING "
+    "  RETURNING *"
+    "), answers AS ("
+    "  INSERT INTO user_answers (answer, user_id, question_id, created_at, updated_at) "
+    "  SELECT answer.answer, created.id, answer.question_id, now(), now() "
+    "  FROM created, unnest(CAST(:answers AS text[]), CAST(:question_ids AS bigint[])) AS answer(answer, question_id)"
+    ") "
+    "SELECT * FROM created",
+)
+
 
 class EventService(SQLAlchemyAsyncRepositoryService[Event]):
     class EventRepository(SQLAlchemyAsyncRepository[Event]):
@@ -20,12 +42,89 @@ class EventService(SQLAlchemyAsyncRepositoryService[Event]):
     repository_type = EventRepository
 
 
+class EventWhitelistService(SQLAlchemyAsyncRepositoryService[EventWhitelistEntry]):
+    class EventWhitelistRepository(SQLAlchemyAsyncRepository[EventWhitelistEntry]):
+        model_type = EventWhitelistEntry
+
+    repository_type = EventWhitelistRepository
+
+    async def is_whitelisted(self, event_id: int, email: str) -> bool:
+        return bool(
+            await self.repository.session.scalar(
+                select(
+                    exists().where(
+                        EventWhitelistEntry.event_id == event_id,
+                        EventWhitelistEntry.email == email,
+                    ),
+                ),
+            ),
+        )
+
+    async def get_signup_event(self, code: str, email: str) -> Row[tuple[int, bool]] | None:
+        """Find the event by code along with whether ``email`` is whitelisted for it, in one query."""
+        result = await self.repository.session.execute(
+            select(
+                Event.id,
+                exists().where(EventWhitelistEntry.event_id == Event.id, EventWhitelistEntry.email == email),
+            ).where(Event.code == code),
+        )
+        return result.one_or_none()
+
+    async def list_emails(self, event_id: int) -> list[str]:
+        result = await self.repository.session.scalars(
+            select(EventWhitelistEntry.email)
+            .where(EventWhitelistEntry.event_id == event_id)
+            .order_by(EventWhitelistEntry.email),
+        )
+        return list(result)
+
+    async def replace_emails(self, event_id: int, emails: Iterable[str]) -> None:
+        """Replace the event's whitelist, inserting the emails in batches."""
+        await self.repository.session.execute(
+            delete(EventWhitelistEntry).where(EventWhitelistEntry.event_id == event_id)
+        )
+
+        rows = [{"event_id": event_id, "email": email} for email in dict.fromkeys(emails)]
+        if rows:
+            await self.repository.session.execute(
+                insert(EventWhitelistEntry).on_conflict_do_nothing(constraint="uq_event_whitelist_email"),
+                rows,
+            )
+
+
 class UserService(SQLAlchemyAsyncRepositoryService[User]):
     class UserRepository(SQLAlchemyAsyncRepository[User]):
         model_type = User
 
     repository_type = UserRepository
 
+    async def sign_up(
+        self,
+        *,
+        event_id: int,
+        name: str,
+        email: str,
+        answers: Sequence[tuple[int, str]],
+    ) -> User | None:
+        """Insert a user and their signup answers, as ``(question_id, answer)`` pairs.
+
+        Returns:
+            The new user, or ``None`` if the email already signed up for the event.
+
+        """
+        result = await self.repository.session.scalars(
+            select(User).from_statement(_SIGN_UP_SQL),
+            {
+                "event_id": event_id,
+                "name": name,
+                "email": email,
+                "qr_code": uuid.uuid4().hex,
+                "question_ids": [question_id for question_id, _ in answers],
+                "answers": [answer for _, answer in answers],
+            },
+        )
+        return result.one_or_none()
+
 
 class QuestionService(SQLAlchemyAsyncRepositoryService[Question]):
     class QuestionRepository(SQLAlchemyAsyncRepository[Question]):
@@ -33,6 +132,12 @@ class QuestionService(SQLAlchemyAsyncRepositoryService[Question]):
 
     repository_type = QuestionRepository
 
+    async def list_signup_question_ids(self) -> frozenset[int]:
+        result = await self.repository.session.scalars(
+            select(Question.id).where(Question.is_signup_question.is_(True)),
+        )
+        return frozenset(result)
+
 
 class UserAnswerService(SQLAlchemyAsyncRepositoryService[UserAnswer]):
     class UserAnswerRepository(SQLAlchemyAsyncRepository[UserAnswer]):
@@ -0,0 +1,173 @@
+"""Stateless cookie sessions with rotating keys and a revocation list.
+
+The session only holds the user ID, so it is kept in an AES-GCM encrypted cookie instead of Valkey and a
+request authenticates without a round trip to the session store. The first secret encrypts, the others are still
+accepted for decryption so keys can be rotated without logging everybody out. A cookie can't be taken back once
+issued, logging out revokes the session's ID instead, and the next response to carry the cookie clears it. Revoked
+IDs live in a Valkey sorted set that each process mirrors into memory, so checking one is a dictionary lookup.
+"""
+
+import asyncio
+import binascii
+import time
+from base64 import b64decode
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass, field
+from secrets import token_urlsafe
+from typing import Any
+
+import logfire
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from litestar import Litestar
+from litestar.connection import ASGIConnection
+from litestar.exceptions import ImproperlyConfiguredException
+from litestar.middleware.session.client_side import AAD, NONCE_SIZE, ClientSideSessionBackend, CookieBackendConfig
+from litestar.serialization import decode_json
+from litestar.types import Empty, Message, ScopeSession
+from valkey.asyncio import Valkey
+
+# Key of the session ID in the session data
+SESSION_ID_KEY = "sid"
+
+# How often every process pulls the revocations made by the others
+REVOCATION_SYNC_INTERVAL = 5
+
+
+class RotatingCookieBackend(ClientSideSessionBackend):
+    """Cookie backend that decrypts with any of the configured secrets and tags every session with an ID."""
+
+    __slots__ = ("ciphers",)
+
+    config: "RotatingCookieBackendConfig"
+
+    def __init__(self, config: "RotatingCookieBackendConfig") -> None:
+        super().__init__(config)
+        self.ciphers = [self.aesgcm, *(AESGCM(secret) for secret in config.fallback_secrets)]
+
+    def load_data(self, data: list[bytes]) -> dict[str, Any]:
+        decoded = b64decode(b"".join(data))
+        nonce = decoded[:NONCE_SIZE]
+        aad_starts_from = decoded.find(AAD)
+        if aad_starts_from == -1:
+            return {}
+
+        associated_data = decoded[aad_starts_from + len(AAD) :]
+        if decode_json(value=associated_data)["expires_at"] <= round(time.time()):
+            return {}
+
+        encrypted_session = decoded[NONCE_SIZE:aad_starts_from]
+        for cipher in self.ciphers:
+            with suppress(InvalidTag):
+                return self.deserialize_data(cipher.decrypt(nonce, encrypted_session, associated_data=associated_data))
+
+        # Encrypted with a key that was rotated out, `load_from_connection` treats it as an empty session
+        raise InvalidTag
+
+    async def store_in_message(
+        self,
+        scope_session: ScopeSession,
+        message: Message,
+        connection: ASGIConnection,
+    ) -> None:
+        # The cookie is re-encrypted with the current secret on every response, the ID is kept across them
+        if scope_session and scope_session is not Empty and SESSION_ID_KEY not in scope_session:
+            scope_session[SESSION_ID_KEY] = token_urlsafe(16)
+
+        await super().store_in_message(scope_session, message, connection)
+
+    async def load_from_connection(self, connection: ASGIConnection) -> dict[str, Any]:
+        # A malformed cookie is an anonymous request rather than a server error
+        with suppress(binascii.Error, ValueError, KeyError):
+            session = await super().load_from_connection(connection)
+            # Dropped rather than re-issued with a fresh expiry, routes excluded from auth included
+            if self.config.revocations and self.config.revocations.is_revoked(session):
+                return {}
+            return session
+        return {}
+
+
+@dataclass
+class RotatingCookieBackendConfig(CookieBackendConfig):
+    _backend_class = RotatingCookieBackend
+
+    fallback_secrets: list[bytes] = field(default_factory=list)
+    """Previous secrets, only used to decrypt the cookies issued before the last rotation."""
+
+    revocations: "SessionRevocationList | None" = None
+    """Revoked sessions, loaded as empty sessions so their cookies are cleared."""
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        if any(len(secret) not in {16, 24, 32} for secret in self.fallback_secrets):
+            msg = "fallback secrets must be 16 (128 bit), 24 (192 bit) or 32 (256 bit) long"
+            raise ImproperlyConfiguredException(msg)
+
+    @classmethod
+    def from_hex_secrets(cls, secrets: list[str], **kwargs: Any) -> "RotatingCookieBackendConfig":
+        if not secrets:
+            msg = "SESSION_SECRETS must contain at least one key for cookie sessions"
+            raise ImproperlyConfiguredException(msg)
+
+        try:
+            primary, *fallbacks = (bytes.fromhex(secret) for secret in secrets)
+        except ValueError as e:
+            msg = "SESSION_SECRETS must be a comma separated list of hex encoded keys"
+            raise ImproperlyConfiguredException(msg) from e
+
+        return cls(secret=primary, fallback_secrets=fallbacks, **kwargs)
+
+
+class SessionRevocationList:
+    """Revoked session IDs, shared through ``valkey`` and checked against a copy kept in memory."""
+
+    def __init__(self, valkey: Valkey, *, ttl: int, key: str = "revoked_sessions") -> None:
+        self.valkey = valkey
+        self.ttl = ttl
+        self.key = key
+        self._revoked: dict[str, float] = {}
+
+    def is_revoked(self, session: dict[str, Any]) -> bool:
+        if not (session_id := session.get(SESSION_ID_KEY)):
+            return False
+
+        expires_at = self._revoked.get(session_id)
+        return expires_at is not None and expires_at > time.time()
+
+    async def revoke(self, session: dict[str, Any]) -> None:
+        """Revoke the session until every cookie issued for it has expired."""
+        if not (session_id := session.get(SESSION_ID_KEY)):
+            return
+
+        expires_at = time.time() + self.ttl
+        self._revoked[session_id] = expires_at
+        await self.valkey.zadd(self.key, {session_id: expires_at})
+
+    async def sync(self) -> None:
+        now = time.time()
+        async with self.valkey.pipeline(transaction=False) as pipe:
+            pipe.zremrangebyscore(self.key, "-inf", now)
+            pipe.zrange(self.key, 0, -1, withscores=True)
+            _, entries = await pipe.execute()
+
+        self._revoked = {session_id.decode(): expires_at for session_id, expires_at in entries}
+
+    async def _sync_forever(self) -> None:
+        while True:
+            try:
+                await self.sync()
+            except Exception:  # noqa: BLE001
+                logfire.exception("Failed to sync revoked sessions")
+
+            await asyncio.sleep(REVOCATION_SYNC_INTERVAL)
+
+    @asynccontextmanager
+    async def lifespan(self, _: Litestar) -> AsyncGenerator[None, None]:
+        task = asyncio.create_task(self._sync_forever())
+        try:
+            yield
+        finally:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
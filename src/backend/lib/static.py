@@ -0,0 +1,204 @@
+"""Serving the built frontend from memory.
+
+Every route the API doesn't handle answers with the same ``index.html`` shell. It is read once at startup and
+compressed ahead of time with brotli and gzip, so a deep link or a refresh is answered from memory. Each encoding
+has its own strong ETag. In debug mode the shell is read again whenever the file changes, so edits show up without
+a restart.
+
+The rest of the build is indexed at startup. The Vite build writes ``.br`` and ``.gz`` files next to the hashed
+assets, each request gets the best of them the client accepts, and hashed assets are cached by browsers for good.
+"""
+
+import gzip
+import hashlib
+import os
+import re
+from collections.abc import Container
+from pathlib import Path
+
+import brotli
+from litestar import MediaType, Request, Response
+from litestar.exceptions import NotFoundException
+from litestar.response import File
+from litestar.status_codes import HTTP_200_OK, HTTP_304_NOT_MODIFIED
+from msgspec import Struct
+
+# Content encodings in order of preference, `identity` is always acceptable
+ENCODINGS = ("br", "gzip")
+
+IDENTITY = "identity"
+
+# Vite writes what it builds to `assets/[name]-[hash].[ext]` with an 8 character hash, a hashed file never changes
+# once it has been deployed. Files of the public directory are copied to the root as they are, e.g. `favicon.ico`.
+_HASHED_FILE = re.compile(r"^assets/(?:.+/)?[^/]+-[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$")
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def _compress(content: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(content, quality=11)
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+def accepted_encodings(accept_encoding: str) -> set[str]:
+    """Parse an ``Accept-Encoding`` header, leaving out the codings it refuses with ``q=0``."""
+    accepted: set[str] = set()
+    refused: set[str] = set()
+    for part in accept_encoding.lower().split(","):
+        coding, *params = (item.strip() for item in part.split(";"))
+        quality = next((param.removeprefix("q=") for param in params if param.startswith("q=")), "1")
+        try:
+            (accepted if float(quality) > 0 else refused).add(coding)
+        except ValueError:
+            refused.add(coding)
+
+    # A wildcard accepts every coding that isn't listed on its own
+    if "*" in accepted:
+        accepted.update(set(ENCODINGS) - refused)
+    return accepted
+
+
+def pick_encoding(accept_encoding: str, available: Container[str]) -> str:
+    """Return the preferred encoding that is both accepted and available, or ``identity``."""
+    accepted = accepted_encodings(accept_encoding)
+    return next((encoding for encoding in ENCODINGS if encoding in accepted and encoding in available), IDENTITY)
+
+
+def if_none_match(request: Request, etag: str) -> bool:
+    """Whether the client's copy, per its ``If-None-Match`` header, is the one with ``etag``."""
+    header = request.headers.get("If-None-Match", "")
+    return header.strip() == "*" or etag in (tag.strip() for tag in header.split(","))
+
+
+class Representation(Struct, frozen=True):
+    """One encoding of a file, with its own strong ETag."""
+
+    content: bytes
+    etag: str
+
+
+class CompressedFile(Struct, frozen=True):
+    mtime_ns: int
+    representations: dict[str, Representation]  # By content encoding
+
+    @classmethod
+    def read(cls, path: Path) -> "CompressedFile":
+        content = path.read_bytes()
+        digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+        representations = {IDENTITY: Representation(content=content, etag=f'"{digest}"')}
+        for encoding in ENCODINGS:
+            representations[encoding] = Representation(
+                content=_compress(content, encoding),
+                etag=f'"{digest}-{encoding}"',
+            )
+
+        return cls(mtime_ns=path.stat().st_mtime_ns, representations=representations)
+
+
+class SpaShell:
+    """The ``index.html`` of the single page app, compressed and kept in memory."""
+
+    def __init__(self, path: Path, *, reload: bool) -> None:
+        self.path = path
+        self.reload = reload
+        self._file: CompressedFile | None = None
+
+    def load(self) -> CompressedFile:
+        self._file = CompressedFile.read(self.path)
+        return self._file
+
+    def _get(self) -> CompressedFile:
+        if self._file is None or (self.reload and self.path.stat().st_mtime_ns != self._file.mtime_ns):
+            return self.load()
+        return self._file
+
+    def respond(self, request: Request) -> Response[bytes]:
+        file = self._get()
+        encoding = pick_encoding(request.headers.get("Accept-Encoding", ""), file.representations.keys())
+        representation = file.representations[encoding]
+
+        # The shell names the hashed bundles of the current build, browsers check it is still current every time
+        headers = {"Cache-Control": "no-cache", "ETag": representation.etag, "Vary": "Accept-Encoding"}
+        if if_none_match(request, representation.etag):
+            return Response(content=b"", status_code=HTTP_304_NOT_MODIFIED, headers=headers)
+
+        if encoding != IDENTITY:
+            headers["Content-Encoding"] = encoding
+        return Response(
+            content=representation.content,
+            status_code=HTTP_200_OK,
+            media_type=MediaType.HTML,
+            headers=headers,
+        )
+
+
+# ---------------
+# Static assets
+# ---------------
+
+
+class AssetVariant(Struct, frozen=True):
+    path: Path
+    stat: os.stat_result
+    etag: str
+
+    @classmethod
+    def from_path(cls, path: Path) -> "AssetVariant":
+        stat = path.stat()
+        return cls(path=path, stat=stat, etag=f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"')
+
+
+class Asset(Struct, frozen=True):
+    variants: dict[str, AssetVariant]  # By content encoding
+    cache_control: str
+
+
+class StaticAssets:
+    """Files of the frontend build, indexed once so a request never looks around the file system."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self._assets: dict[str, Asset] = {}
+
+    def load(self) -> None:
+        assets: dict[str, Asset] = {}
+        for path in self.directory.rglob("*"):
+            if not path.is_file() or path.suffix in {".br", ".gz"}:
+                continue
+
+            variants = {IDENTITY: AssetVariant.from_path(path)}
+            for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+                if (compressed := path.with_name(path.name + suffix)).is_file():
+                    variants[encoding] = AssetVariant.from_path(compressed)
+
+            relative_path = path.relative_to(self.directory).as_posix()
+            assets[relative_path] = Asset(
+                variants=variants,
+                cache_control=IMMUTABLE if _HASHED_FILE.match(relative_path) else "no-cache",
+            )
+
+        self._assets = assets
+
+    def respond(self, request: Request, file_path: str) -> Response:
+        if not (asset := self._assets.get(file_path.lstrip("/"))):
+            raise NotFoundException
+
+        encoding = pick_encoding(request.headers.get("Accept-Encoding", ""), asset.variants.keys())
+        variant = asset.variants[encoding]
+
+        headers = {"Cache-Control": asset.cache_control, "ETag": variant.etag}
+        if len(asset.variants) > 1:
+            headers["Vary"] = "Accept-Encoding"
+        if if_none_match(request, variant.etag):
+            return Response(content=b"", status_code=HTTP_304_NOT_MODIFIED, headers=headers)
+
+        if encoding != IDENTITY:
+            headers["Content-Encoding"] = encoding
+        return File(
+            path=variant.path,
+            filename=asset.variants[IDENTITY].path.name,  # The media type is guessed from it
+            content_disposition_type="inline",
+            stat_result=variant.stat,
+            headers=headers,
+        )
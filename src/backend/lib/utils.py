@@ -19,7 +19,7 @@ from litestar.status_codes import (
 )
 from litestar.types import LitestarEncodableType
 
-from src.backend.models import User
+from src.backend.lib.principal import Principal
 
 if TYPE_CHECKING:
     from litestar.channels.plugin import ChannelsPlugin
@@ -32,7 +32,7 @@ class _HTTPConflictException(HTTPException):
 
 
 def exception_handler(
-    request: Request[User, Any, Any],
+    request: Request[Principal, Any, Any],
     exc: Exception,
 ) -> Response:
     http_exc: type[HTTPException]
@@ -58,7 +58,7 @@ def admin_user_guard(connection: ASGIConnection, _: BaseRouteHandler) -> None:
         raise NotAuthorizedException
 
 
-def publish_to_channel(request: Request[User, Any, Any], data: LitestarEncodableType, channel: str) -> None:
+def publish_to_channel(request: Request[Principal, Any, Any], data: LitestarEncodableType, channel: str) -> None:
     channels: ChannelsPlugin = request.app.plugins.get(
         "litestar.channels.plugin.ChannelsPlugin",
     )
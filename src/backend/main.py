@@ -10,8 +10,10 @@ from src.backend.config import (
     admin_plugin,
     alchemy_plugin,
     channels_plugin,
+    compression_config,
     global_rate_limit_config,
     saq_plugin,
+    session_revocations,
     settings,
     sss_auth,
     valkey_config,
@@ -19,12 +21,15 @@ from src.backend.config import (
 )
 from src.backend.controllers.auth import AuthController
 from src.backend.controllers.event import EventController
-from src.backend.controllers.frontend import WebController
+from src.backend.controllers.frontend import StaticController, WebController, spa_shell, static_assets
 from src.backend.controllers.game import GameController
 from src.backend.controllers.question import QuestionController
 from src.backend.controllers.user import UserController
 from src.backend.controllers.user_answer import UserAnswerController
-from src.backend.lib.otel import configure_instrumentation
+from src.backend.lib.cache import question_catalog
+from src.backend.lib.game_log import game_log
+from src.backend.lib.leaderboard import live_leaderboard
+from src.backend.lib.otel import configure_instrumentation, track_request_queries
 from src.backend.lib.utils import exception_handler
 
 app = Litestar(
@@ -37,6 +42,7 @@ app = Litestar(
         UserController,
         UserAnswerController,
         WebController,
+        *([] if settings.debug else [StaticController]),
     ],
     plugins=[
         admin_plugin,
@@ -46,7 +52,9 @@ app = Litestar(
         vite_plugin,
         CLIPlugin(),
     ],
-    on_app_init=[sss_auth.on_app_init],
+    on_app_init=[sss_auth.on_app_init, track_request_queries],
+    on_startup=[spa_shell.load, static_assets.load],
+    lifespan=[live_leaderboard, question_catalog.lifespan, session_revocations.lifespan, game_log.lifespan],
     openapi_config=OpenAPIConfig(
         title="Byte Bond",
         version="dev",
@@ -73,11 +81,12 @@ app = Litestar(
         Exception: exception_handler,
         RepositoryError: exception_handler,
     },
-    middleware=[configure_instrumentation().middleware, global_rate_limit_config.middleware],
+    middleware=[
+        configure_instrumentation().middleware,
+        global_rate_limit_config.middleware,
+    ],
+    compression_config=compression_config,
     stores={
         "sessions": valkey_config,
-        "global_rate_limit": valkey_config,
-        "one_rpm_rate_limit": valkey_config,
-        "five_rpm_rate_limit": valkey_config,
     },
 )
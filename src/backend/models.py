@@ -2,9 +2,9 @@ import datetime
 import uuid
 from enum import StrEnum
 
-from advanced_alchemy.base import BigIntAuditBase
+from advanced_alchemy.base import BigIntAuditBase, BigIntBase
 from advanced_alchemy.types import DateTimeUTC, JsonB
-from sqlalchemy import CheckConstraint, ForeignKey, Index, UniqueConstraint, text
+from sqlalchemy import BigInteger, CheckConstraint, ForeignKey, Index, UniqueConstraint, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 
@@ -21,6 +21,15 @@ class UserStatus(StrEnum):
     BUSY = "busy"
 
 
+class GameLogKind(StrEnum):
+    PAIRED = "paired"
+    SCANNED = "scanned"
+    ANSWERED = "answered"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+    EXPIRED = "expired"
+
+
 class QuestionType(StrEnum):
     MCQ = "multiple_choice"
     TRUE_FALSE = "true_false"
@@ -38,10 +47,6 @@ class Event(BigIntAuditBase):
     name: Mapped[str]
     code: Mapped[str] = mapped_column(unique=True, index=True)
     is_active: Mapped[bool] = mapped_column(default=False)
-    whitelist: Mapped[dict] = mapped_column(
-        JsonB,
-        default={"emails": []},
-    )
 
     # -----------------
     # ORM Relationships
@@ -49,11 +54,39 @@ class Event(BigIntAuditBase):
 
     users: Mapped[list["User"]] = relationship(back_populates="event", cascade="all, delete")
     connections: Mapped[list["Connection"]] = relationship(back_populates="event", cascade="all, delete")
+    # Can hold tens of thousands of rows, the database deletes them along with the event
+    whitelist_entries: Mapped[list["EventWhitelistEntry"]] = relationship(
+        back_populates="event",
+        cascade="all, delete",
+        passive_deletes=True,
+    )
 
     def __repr__(self):
         return f"<Event(id={self.id}, name='{self.name}', code='{self.code}', active={self.is_active})>"
 
 
+class EventWhitelistEntry(BigIntAuditBase):
+    """An email allowed to sign up for an event."""
+
+    __tablename__ = "event_whitelist"
+    __table_args__ = (
+        # Also serves the signup lookup by event and email
+        UniqueConstraint("event_id", "email", name="uq_event_whitelist_email"),
+    )
+
+    email: Mapped[str]
+    event_id: Mapped[int] = mapped_column(ForeignKey("events.id", ondelete="CASCADE"))
+
+    # -----------------
+    # ORM Relationships
+    # -----------------
+
+    event: Mapped["Event"] = relationship(back_populates="whitelist_entries")
+
+    def __repr__(self):
+        return f"<EventWhitelistEntry(event_id={self.event_id}, email='{self.email}')>"
+
+
 class User(BigIntAuditBase):
     """Represents an attendee/player in the game."""
 
@@ -61,8 +94,24 @@ class User(BigIntAuditBase):
     __table_args__ = (
         # Ensure email is unique within each event, but same email can exist across different events
         UniqueConstraint("email", "event_id", name="uq_user_email_event"),
-        # Index for leaderboard queries (event + points descending)
-        Index("ix_user_event_points", "event_id", "points"),
+        # Covering index for leaderboard queries, in leaderboard order with the ID as tie-breaker for keyset pagination.
+        # Names are in code point order, the order the live leaderboard sorts them in.
+        Index(
+            "ix_user_event_leaderboard",
+            "event_id",
+            text("points DESC"),
+            text("connection_count DESC"),
+            text('name COLLATE "C"'),
+            "id",
+            postgresql_include=["email"],
+            postgresql_where=text("NOT is_admin"),
+        ),
+        # Partial index for matchmaking, which only looks at available players
+        Index(
+            "ix_user_event_available",
+            "event_id",
+            postgresql_where=text("status = 'AVAILABLE' AND NOT is_admin"),
+        ),
     )
 
     name: Mapped[str]
@@ -169,6 +218,25 @@ class Connection(BigIntAuditBase):
         ),
         # Ensure user1 and user2 are different
         CheckConstraint("user1_id != user2_id", name="ck_different_users"),
+        # Partial indexes for open (pending/active) connections, which are a small slice of the table
+        Index(
+            "ix_connection_open_user1",
+            "user1_id",
+            "event_id",
+            postgresql_where=text("status IN ('PENDING', 'ACTIVE')"),
+        ),
+        Index(
+            "ix_connection_open_user2",
+            "user2_id",
+            "event_id",
+            postgresql_where=text("status IN ('PENDING', 'ACTIVE')"),
+        ),
+        Index(
+            "ix_connection_open_event_end_time",
+            "event_id",
+            "end_time",
+            postgresql_where=text("status IN ('PENDING', 'ACTIVE')"),
+        ),
     )
 
     start_time: Mapped[datetime.datetime] = mapped_column(
@@ -225,3 +293,28 @@ class ConnectionQuestion(BigIntAuditBase):
 
     def __repr__(self):
         return f"<ConnectionQuestion(id={self.id}, question_answered={self.question_answered}, answered_correctly={self.answered_correctly}, user_id={self.user_id}, connection_id={self.connection_id}, question_id={self.question_id})>"  # noqa: E501
+
+
+class GameLogEntry(BigIntBase):
+    """A connection transition, in the append-only game log.
+
+    Entries are only ever inserted. They have no foreign keys, so writing them never waits on the game tables and
+    the log keeps the history of connections and users that have since been deleted.
+    """
+
+    __tablename__ = "game_log"
+    __table_args__ = (
+        # Replaying an event reads its entries in order
+        Index("ix_game_log_event_occurred_at", "event_id", "occurred_at"),
+    )
+
+    occurred_at: Mapped[datetime.datetime] = mapped_column(DateTimeUTC(timezone=True))
+    kind: Mapped[GameLogKind]
+    event_id: Mapped[int] = mapped_column(BigInteger)
+    connection_id: Mapped[int] = mapped_column(BigInteger)
+    user_id: Mapped[int | None] = mapped_column(BigInteger)  # Who made the transition, None when the game made it
+    question_id: Mapped[int | None] = mapped_column(BigInteger)  # Answers only
+    answered_correctly: Mapped[bool | None]  # Answers only
+
+    def __repr__(self):
+        return f"<GameLogEntry(id={self.id}, kind='{self.kind}', event_id={self.event_id}, connection_id={self.connection_id})>"
@@ -1,4 +1,5 @@
 from datetime import datetime
+from enum import StrEnum
 from typing import Annotated
 
 from msgspec import UNSET, Meta, Struct, UnsetType
@@ -14,13 +15,58 @@ class GetEvent(Struct):
     name: str
     code: str
     is_active: bool
-    whitelist: dict
     created_at: datetime
     updated_at: datetime
 
 
+class EventPage(Struct):
+    items: list[GetEvent]
+    next_cursor: str | None = None  # Pass as `cursor` to get the next page
+
+
+class EventWhitelist(Struct):
+    emails: list[str]
+
+
 class PatchEvent(Struct):
     name: Annotated[str, Meta(min_length=1)] | UnsetType = UNSET
     code: Annotated[str, Meta(min_length=1, max_length=64)] | UnsetType = UNSET
     is_active: bool | UnsetType = UNSET
-    whitelist: dict | UnsetType = UNSET
+    whitelist: EventWhitelist | UnsetType = UNSET  # Replaces the whole whitelist
+
+
+class ImportFormat(StrEnum):
+    """Format of attendee imports and event exports."""
+
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class ExportDataset(StrEnum):
+    USERS = "users"
+    ANSWERS = "answers"  # Signup answers
+    CONNECTIONS = "connections"
+    QUESTION_OUTCOMES = "question_outcomes"  # Questions asked in connections and whether they were answered correctly
+    GAME_LOG = "game_log"  # Connection transitions in the order they happened
+
+
+class AttendeeImportRow(Struct, forbid_unknown_fields=True):
+    """One row of an attendee import, an email to whitelist and optionally an attendee to sign up."""
+
+    email: str
+    name: str | None = None
+    answers: dict[int, str] = {}  # Signup answers by question ID
+
+
+class AttendeeImportError(Struct):
+    line: int
+    detail: str
+
+
+class AttendeeImport(Struct):
+    rows: int
+    rejected: int
+    whitelisted: int  # New whitelist entries, emails that were already whitelisted aren't counted
+    attendees: int  # New attendees, emails that already signed up are skipped
+    answers: int
+    errors: list[AttendeeImportError]  # The first rejected rows
@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Annotated
 
 from msgspec import Meta, Struct
@@ -63,3 +64,48 @@ class Leaderboard(Struct):
     event_name: str
     entries: list[LeaderboardEntry]
     total_users: int
+    next_cursor: str | None = None  # Pass as `cursor` to get the next page
+
+
+class LiveLeaderboardEntry(Struct, frozen=True):
+    id: int
+    name: str
+    points: int
+    connection_count: int
+    rank: int
+
+
+class LeaderboardDelta(Struct):
+    event_id: int
+    entries: list[LiveLeaderboardEntry]  # New or changed entries of the top of the leaderboard
+    removed: list[int]  # Users that dropped out of the top
+    total_users: int
+
+
+class ConnectionRate(Struct):
+    minute: datetime  # Start of the minute
+    paired: int
+    completed: int
+
+
+class QuestionCorrectness(Struct):
+    question_id: int
+    question: str
+    answered: int
+    correct: int
+    correct_rate: float
+
+
+class EventAnalytics(Struct):
+    event_id: int
+    paired: int
+    scanned: int
+    completed: int
+    cancelled: int  # By a player or by stopping the game
+    expired: int
+    completion_rate: float | None  # Share of the finished connections, None until one finishes
+    cancellation_rate: float | None
+    expiry_rate: float | None
+    average_seconds_to_scan: float | None  # From pairing to scanning the QR code
+    connections_per_minute: list[ConnectionRate]  # The last hour, oldest first
+    questions: list[QuestionCorrectness]
@@ -6,12 +6,15 @@ from msgspec import UNSET, Meta, Struct, UnsetType
 from src.backend.models import UserStatus
 from src.backend.schema.user_answer import PostUserAnswer
 
+# Number of signup questions every user answers
+SIGNUP_ANSWER_COUNT = 10
+
 
 class PostUser(Struct):
     name: Annotated[str, Meta(min_length=1)]
     email: Annotated[str, Meta(min_length=1)]
     event_code: Annotated[str, Meta(min_length=1, max_length=64)]
-    user_answer: Annotated[list[PostUserAnswer], Meta(min_length=10, max_length=10)]
+    user_answer: Annotated[list[PostUserAnswer], Meta(min_length=SIGNUP_ANSWER_COUNT, max_length=SIGNUP_ANSWER_COUNT)]
 
 
 class GetUser(Struct):
@@ -28,5 +31,10 @@ class GetUser(Struct):
     updated_at: datetime
 
 
+class UserPage(Struct):
+    items: list[GetUser]
+    next_cursor: str | None = None  # Pass as `cursor` to get the next page
+
+
 class PatchUser(Struct):
     name: Annotated[str, Meta(min_length=1)] | UnsetType = UNSET
@@ -18,5 +18,10 @@ class GetUserAnswer(Struct):
     updated_at: datetime
 
 
+class UserAnswerPage(Struct):
+    items: list[GetUserAnswer]
+    next_cursor: str | None = None  # Pass as `cursor` to get the next page
+
+
 class PatchUserAnswer(Struct):
     answer: Annotated[str, Meta(min_length=1)] | UnsetType = UNSET
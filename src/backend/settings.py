@@ -44,6 +44,29 @@ class Settings:
     valkey_host: str = field(
         default_factory=lambda: os.getenv("VALKEY_HOST", "localhost"),
     )
+    # "server" keeps sessions in Valkey, "cookie" keeps them in an encrypted cookie
+    session_backend: str = field(
+        default_factory=lambda: os.getenv("SESSION_BACKEND", "server").lower(),
+    )
+    # Hex encoded 128, 192 or 256 bit keys for the cookie sessions, the first one encrypts and the others are only
+    # accepted for decryption while they are rotated out
+    session_secrets: list[str] = field(
+        default_factory=lambda: [
+            secret.strip() for secret in os.getenv("SESSION_SECRETS", "").split(",") if secret.strip()
+        ],
+    )
+    # Compress HTTP responses of at least `response_compression_min_size` bytes with brotli, or gzip for clients
+    # without it. Off unless enabled, see `litestar benchmarks compression` for what it costs and saves.
+    response_compression: bool = field(
+        default_factory=lambda: os.getenv("RESPONSE_COMPRESSION", "false").lower() in {"true", "1", "yes"},
+    )
+    response_compression_min_size: int = field(
+        default_factory=lambda: int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", "4096")),
+    )
+    # Largest page the admin listings accept
+    max_page_size: int = field(
+        default_factory=lambda: int(os.getenv("MAX_PAGE_SIZE", "1000")),
+    )
     vite: ViteSettings = field(default_factory=ViteSettings)
 
     def __post_init__(self) -> None: ...
@@ -1,7 +1,7 @@
 // This file is auto-generated by @hey-api/openapi-ts
 
 import type { Options as ClientOptions, TDataShape, Client } from './client';
-import type { ApiAuthMeGetUserData, ApiAuthMeGetUserResponses, ApiAuthLoginLoginData, ApiAuthLoginLoginResponses, ApiAuthLoginLoginErrors, ApiAuthLogoutLogoutData, ApiAuthLogoutLogoutResponses, ApiEventsEventIdDeleteEventData, ApiEventsEventIdDeleteEventResponses, ApiEventsEventIdDeleteEventErrors, ApiEventsEventIdGetEventData, ApiEventsEventIdGetEventResponses, ApiEventsEventIdGetEventErrors, ApiEventsEventIdPatchEventData, ApiEventsEventIdPatchEventResponses, ApiEventsEventIdPatchEventErrors, ApiEventsGetEventsData, ApiEventsGetEventsResponses, ApiEventsPostEventData, ApiEventsPostEventResponses, ApiEventsPostEventErrors, ApiGameAnswerQuestionAnswerQuestionData, ApiGameAnswerQuestionAnswerQuestionResponses, ApiGameAnswerQuestionAnswerQuestionErrors, ApiGameCancelConnectionCancelConnectionData, ApiGameCancelConnectionCancelConnectionResponses, ApiGameChatChatData, ApiGameChatChatResponses, ApiGameChatChatErrors, ApiGameCompleteConnectionCompleteConnectionData, ApiGameCompleteConnectionCompleteConnectionResponses, ApiGameStatusGetGameStatusData, ApiGameStatusGetGameStatusResponses, ApiGameLeaderboardEventIdGetLeaderboardData, ApiGameLeaderboardEventIdGetLeaderboardResponses, ApiGameLeaderboardEventIdGetLeaderboardErrors, ApiGameScanQrScanQrCodeData, ApiGameScanQrScanQrCodeResponses, ApiGameScanQrScanQrCodeErrors, ApiGameStartStartGameData, ApiGameStartStartGameResponses, ApiGameStartStartGameErrors, ApiGameStopStopGameData, ApiGameStopStopGameResponses, ApiGameStopStopGameErrors, ApiQuestionsQuestionIdDeleteQuestionData, ApiQuestionsQuestionIdDeleteQuestionResponses, ApiQuestionsQuestionIdDeleteQuestionErrors, ApiQuestionsQuestionIdGetQuestionData, ApiQuestionsQuestionIdGetQuestionResponses, ApiQuestionsQuestionIdGetQuestionErrors, ApiQuestionsQuestionIdPatchQuestionData, ApiQuestionsQuestionIdPatchQuestionResponses, ApiQuestionsQuestionIdPatchQuestionErrors, ApiQuestionsGetQuestionsData, ApiQuestionsGetQuestionsResponses, ApiQuestionsGetQuestionsErrors, ApiQuestionsPostQuestionData, ApiQuestionsPostQuestionResponses, ApiQuestionsPostQuestionErrors, ApiUsersUserIdDeleteUserData, ApiUsersUserIdDeleteUserResponses, ApiUsersUserIdDeleteUserErrors, ApiUsersUserIdGetUserData, ApiUsersUserIdGetUserResponses, ApiUsersUserIdGetUserErrors, ApiUsersUserIdPatchUserData, ApiUsersUserIdPatchUserResponses, ApiUsersUserIdPatchUserErrors, ApiUsersGetUsersData, ApiUsersGetUsersResponses, ApiUsersPostUserData, ApiUsersPostUserResponses, ApiUsersPostUserErrors, ApiUserAnswersUserAnswerIdDeleteUserAnswerData, ApiUserAnswersUserAnswerIdDeleteUserAnswerResponses, ApiUserAnswersUserAnswerIdDeleteUserAnswerErrors, ApiUserAnswersUserAnswerIdGetUserAnswerData, ApiUserAnswersUserAnswerIdGetUserAnswerResponses, ApiUserAnswersUserAnswerIdGetUserAnswerErrors, ApiUserAnswersUserAnswerIdPatchUserAnswerData, ApiUserAnswersUserAnswerIdPatchUserAnswerResponses, ApiUserAnswersUserAnswerIdPatchUserAnswerErrors, ApiUserAnswersAllGetAllUserAnswersData, ApiUserAnswersAllGetAllUserAnswersResponses, ApiUserAnswersGetUserAnswersData, ApiUserAnswersGetUserAnswersResponses, ApiUserAnswersPostUserAnswerData, ApiUserAnswersPostUserAnswerResponses, ApiUserAnswersPostUserAnswerErrors } from './types.gen';
+import type { ApiAuthMeGetUserData, ApiAuthMeGetUserResponses, ApiAuthLoginLoginData, ApiAuthLoginLoginResponses, ApiAuthLoginLoginErrors, ApiAuthLogoutLogoutData, ApiAuthLogoutLogoutResponses, ApiEventsEventIdDeleteEventData, ApiEventsEventIdDeleteEventResponses, ApiEventsEventIdDeleteEventErrors, ApiEventsEventIdGetEventData, ApiEventsEventIdGetEventResponses, ApiEventsEventIdGetEventErrors, ApiEventsEventIdPatchEventData, ApiEventsEventIdPatchEventResponses, ApiEventsEventIdPatchEventErrors, ApiEventsEventIdExportDatasetExportEventDataData, ApiEventsEventIdExportDatasetExportEventDataResponses, ApiEventsEventIdExportDatasetExportEventDataErrors, ApiEventsEventIdWhitelistGetEventWhitelistData, ApiEventsEventIdWhitelistGetEventWhitelistResponses, ApiEventsEventIdWhitelistGetEventWhitelistErrors, ApiEventsGetEventsData, ApiEventsGetEventsResponses, ApiEventsGetEventsErrors, ApiEventsPostEventData, ApiEventsPostEventResponses, ApiEventsPostEventErrors, ApiEventsEventIdImportImportEventAttendeesData, ApiEventsEventIdImportImportEventAttendeesResponses, ApiEventsEventIdImportImportEventAttendeesErrors, ApiGameAnswerQuestionAnswerQuestionData, ApiGameAnswerQuestionAnswerQuestionResponses, ApiGameAnswerQuestionAnswerQuestionErrors, ApiGameCancelConnectionCancelConnectionData, ApiGameCancelConnectionCancelConnectionResponses, ApiGameChatChatData, ApiGameChatChatResponses, ApiGameChatChatErrors, ApiGameCompleteConnectionCompleteConnectionData, ApiGameCompleteConnectionCompleteConnectionResponses, ApiGameAnalyticsEventIdGetAnalyticsData, ApiGameAnalyticsEventIdGetAnalyticsResponses, ApiGameAnalyticsEventIdGetAnalyticsErrors, ApiGameStatusGetGameStatusData, ApiGameStatusGetGameStatusResponses, ApiGameLeaderboardEventIdGetLeaderboardData, ApiGameLeaderboardEventIdGetLeaderboardResponses, ApiGameLeaderboardEventIdGetLeaderboardErrors, ApiGameLeaderboardEventIdAroundUserIdGetLeaderboardAroundUserData, ApiGameLeaderboardEventIdAroundUserIdGetLeaderboardAroundUserResponses, ApiGameLeaderboardEventIdAroundUserIdGetLeaderboardAroundUserErrors, ApiGameScanQrScanQrCodeData, ApiGameScanQrScanQrCodeResponses, ApiGameScanQrScanQrCodeErrors, ApiGameStartStartGameData, ApiGameStartStartGameResponses, ApiGameStartStartGameErrors, ApiGameStopStopGameData, ApiGameStopStopGameResponses, ApiGameStopStopGameErrors, ApiQuestionsQuestionIdDeleteQuestionData, ApiQuestionsQuestionIdDeleteQuestionResponses, ApiQuestionsQuestionIdDeleteQuestionErrors, ApiQuestionsQuestionIdGetQuestionData, ApiQuestionsQuestionIdGetQuestionResponses, ApiQuestionsQuestionIdGetQuestionErrors, ApiQuestionsQuestionIdPatchQuestionData, ApiQuestionsQuestionIdPatchQuestionResponses, ApiQuestionsQuestionIdPatchQuestionErrors, ApiQuestionsGetQuestionsData, ApiQuestionsGetQuestionsResponses, ApiQuestionsGetQuestionsErrors, ApiQuestionsPostQuestionData, ApiQuestionsPostQuestionResponses, ApiQuestionsPostQuestionErrors, ApiUsersUserIdDeleteUserData, ApiUsersUserIdDeleteUserResponses, ApiUsersUserIdDeleteUserErrors, ApiUsersUserIdGetUserData, ApiUsersUserIdGetUserResponses, ApiUsersUserIdGetUserErrors, ApiUsersUserIdPatchUserData, ApiUsersUserIdPatchUserResponses, ApiUsersUserIdPatchUserErrors, ApiUsersGetUsersData, ApiUsersGetUsersResponses, ApiUsersGetUsersErrors, ApiUsersPostUserData, ApiUsersPostUserResponses, ApiUsersPostUserErrors, ApiUserAnswersUserAnswerIdDeleteUserAnswerData, ApiUserAnswersUserAnswerIdDeleteUserAnswerResponses, ApiUserAnswersUserAnswerIdDeleteUserAnswerErrors, ApiUserAnswersUserAnswerIdGetUserAnswerData, ApiUserAnswersUserAnswerIdGetUserAnswerResponses, ApiUserAnswersUserAnswerIdGetUserAnswerErrors, ApiUserAnswersUserAnswerIdPatchUserAnswerData, ApiUserAnswersUserAnswerIdPatchUserAnswerResponses, ApiUserAnswersUserAnswerIdPatchUserAnswerErrors, ApiUserAnswersAllGetAllUserAnswersData, ApiUserAnswersAllGetAllUserAnswersResponses, ApiUserAnswersAllGetAllUserAnswersErrors, ApiUserAnswersGetUserAnswersData, ApiUserAnswersGetUserAnswersResponses, ApiUserAnswersGetUserAnswersErrors, ApiUserAnswersPostUserAnswerData, ApiUserAnswersPostUserAnswerResponses, ApiUserAnswersPostUserAnswerErrors } from './types.gen';
 import { client as _heyApiClient } from './client.gen';
 
 export type Options<TData extends TDataShape = TDataShape, ThrowOnError extends boolean = boolean> = ClientOptions<TData, ThrowOnError> & {
@@ -134,11 +134,46 @@ export const apiEventsEventIdPatchEvent = <ThrowOnError extends boolean = false>
     });
 };
 
+/**
+ * ExportEventData
+ */
+export const apiEventsEventIdExportDatasetExportEventData = <ThrowOnError extends boolean = false>(options: Options<ApiEventsEventIdExportDatasetExportEventDataData, ThrowOnError>) => {
+    return (options.client ?? _heyApiClient).get<ApiEventsEventIdExportDatasetExportEventDataResponses, ApiEventsEventIdExportDatasetExportEventDataErrors, ThrowOnError>({
+        security: [
+            {
+                in: 'cookie',
+                name: 'session',
+                type: 'apiKey'
+            }
+        ],
+        url: '/api/events/{event_id}/export/{dataset}',
+        ...options
+    });
+};
+
+/**
+ * GetEventWhitelist
+ */
+export const apiEventsEventIdWhitelistGetEventWhitelist = <ThrowOnError extends boolean = false>(options: Options<ApiEventsEventIdWhitelistGetEventWhitelistData, ThrowOnError>) => {
+    return (options.client ?? _heyApiClient).get<ApiEventsEventIdWhitelistGetEventWhitelistResponses, ApiEventsEventIdWhitelistGetEventWhitelistErrors, ThrowOnError>({
+        responseType: 'json',
+        security: [
+            {
+                in: 'cookie',
+                name: 'session',
+                type: 'apiKey'
+            }
+        ],
+        url: '/api/events/{event_id}/whitelist',
+        ...options
+    });
+};
+
 /**
  * GetEvents
  */
 export const apiEventsGetEvents = <ThrowOnError extends boolean = false>(options?: Options<ApiEventsGetEventsData, ThrowOnError>) => {
-    return (options?.client ?? _heyApiClient).get<ApiEventsGetEventsResponses, unknown, ThrowOnError>({
+    return (options?.client ?? _heyApiClient).get<ApiEventsGetEventsResponses, ApiEventsGetEventsErrors, ThrowOnError>({
         responseType: 'json',
         security: [
             {
@@ -174,6 +209,24 @@ export const apiEventsPostEvent = <ThrowOnError extends boolean = false>(options
     });
 };
 
+/**
+ * ImportEventAttendees
+ */
+export const apiEventsEventIdImportImportEventAttendees = <ThrowOnError extends boolean = false>(options: Options<ApiEventsEventIdImportImportEventAttendeesData, ThrowOnError>) => {
+    return (options.client ?? _heyApiClient).post<ApiEventsEventIdImportImportEventAttendeesResponses, ApiEventsEventIdImportImportEventAttendeesErrors, ThrowOnError>({
+        responseType: 'json',
+        security: [
+            {
+                in: 'cookie',
+                name: 'session',
+                type: 'apiKey'
+            }
+        ],
+        url: '/api/events/{event_id}/import',
+        ...options
+    });
+};
+
 /**
  * AnswerQuestion
  */
@@ -251,6 +304,24 @@ export const apiGameCompleteConnectionCompleteConnection = <ThrowOnError extends
     });
 };
 
+/**
+ * GetAnalytics
+ */
+export const apiGameAnalyticsEventIdGetAnalytics = <ThrowOnError extends boolean = false>(options: Options<ApiGameAnalyticsEventIdGetAnalyticsData, ThrowOnError>) => {
+    return (options.client ?? _heyApiClient).get<ApiGameAnalyticsEventIdGetAnalyticsResponses, ApiGameAnalyticsEventIdGetAnalyticsErrors, ThrowOnError>({
+        responseType: 'json',
+        security: [
+            {
+                in: 'cookie',
+                name: 'session',
+                type: 'apiKey'
+            }
+        ],
+        url: '/api/game/analytics/{event_id}',
+        ...options
+    });
+};
+
 /**
  * GetGameStatus
  */
@@ -287,6 +358,24 @@ export const apiGameLeaderboardEventIdGetLeaderboard = <ThrowOnError extends boo
     });
 };
 
+/**
+ * GetLeaderboardAroundUser
+ */
+export const apiGameLeaderboardEventIdAroundUserIdGetLeaderboardAroundUser = <ThrowOnError extends boolean = false>(options: Options<ApiGameLeaderboardEventIdAroundUserIdGetLeaderboardAroundUserData, ThrowOnError>) => {
+    return (options.client ?? _heyApiClient).get<ApiGameLeaderboardEventIdAroundUserIdGetLeaderboardAroundUserResponses, ApiGameLeaderboardEventIdAroundUserIdGetLeaderboardAroundUserErrors, ThrowOnError>({
+        responseType: 'json',
+        security: [
+            {
+                in: 'cookie',
+                name: 'session',
+                type: 'apiKey'
+            }
+        ],
+        url: '/api/game/leaderboard/{event_id}/around/{user_id}',
+        ...options
+    });
+};
+
 /**
  * ScanQrCode
  */
@@ -512,7 +601,7 @@ export const apiUsersUserIdPatchUser = <ThrowOnError extends boolean = false>(op
  * GetUsers
  */
 export const apiUsersGetUsers = <ThrowOnError extends boolean = false>(options?: Options<ApiUsersGetUsersData, ThrowOnError>) => {
-    return (options?.client ?? _heyApiClient).get<ApiUsersGetUsersResponses, unknown, ThrowOnError>({
+    return (options?.client ?? _heyApiClient).get<ApiUsersGetUsersResponses, ApiUsersGetUsersErrors, ThrowOnError>({
         responseType: 'json',
         security: [
             {
@@ -610,7 +699,7 @@ export const apiUserAnswersUserAnswerIdPatchUserAnswer = <ThrowOnError extends b
  * GetAllUserAnswers
  */
 export const apiUserAnswersAllGetAllUserAnswers = <ThrowOnError extends boolean = false>(options?: Options<ApiUserAnswersAllGetAllUserAnswersData, ThrowOnError>) => {
-    return (options?.client ?? _heyApiClient).get<ApiUserAnswersAllGetAllUserAnswersResponses, unknown, ThrowOnError>({
+    return (options?.client ?? _heyApiClient).get<ApiUserAnswersAllGetAllUserAnswersResponses, ApiUserAnswersAllGetAllUserAnswersErrors, ThrowOnError>({
         responseType: 'json',
         security: [
             {
@@ -628,7 +717,7 @@ export const apiUserAnswersAllGetAllUserAnswers = <ThrowOnError extends boolean
  * GetUserAnswers
  */
 export const apiUserAnswersGetUserAnswers = <ThrowOnError extends boolean = false>(options?: Options<ApiUserAnswersGetUserAnswersData, ThrowOnError>) => {
-    return (options?.client ?? _heyApiClient).get<ApiUserAnswersGetUserAnswersResponses, unknown, ThrowOnError>({
+    return (options?.client ?? _heyApiClient).get<ApiUserAnswersGetUserAnswersResponses, ApiUserAnswersGetUserAnswersErrors, ThrowOnError>({
         responseType: 'json',
         security: [
             {
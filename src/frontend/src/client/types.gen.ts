@@ -1,5 +1,25 @@
 // This file is auto-generated by @hey-api/openapi-ts
 
+/**
+ * AttendeeImport
+ */
+export type AttendeeImport = {
+    rows: number;
+    rejected: number;
+    whitelisted: number;
+    attendees: number;
+    answers: number;
+    errors: Array<AttendeeImportError>;
+};
+
+/**
+ * AttendeeImportError
+ */
+export type AttendeeImportError = {
+    line: number;
+    detail: string;
+};
+
 /**
  * ConnectionQuestionData
  */
@@ -13,6 +33,53 @@ export type ConnectionQuestionData = {
     answered_correctly: boolean;
 };
 
+/**
+ * ConnectionRate
+ */
+export type ConnectionRate = {
+    minute: string;
+    paired: number;
+    completed: number;
+};
+
+/**
+ * EventAnalytics
+ */
+export type EventAnalytics = {
+    event_id: number;
+    paired: number;
+    scanned: number;
+    completed: number;
+    cancelled: number;
+    expired: number;
+    completion_rate?: number | null;
+    cancellation_rate?: number | null;
+    expiry_rate?: number | null;
+    average_seconds_to_scan?: number | null;
+    connections_per_minute: Array<ConnectionRate>;
+    questions: Array<QuestionCorrectness>;
+};
+
+/**
+ * EventPage
+ */
+export type EventPage = {
+    items: Array<GetEvent>;
+    next_cursor?: string | null;
+};
+
+/**
+ * EventWhitelist
+ */
+export type EventWhitelist = {
+    emails: Array<string>;
+};
+
+/**
+ * ExportDataset
+ */
+export type ExportDataset = 'users' | 'answers' | 'connections' | 'question_outcomes' | 'game_log';
+
 /**
  * GameChatRequest
  */
@@ -60,9 +127,6 @@ export type GetEvent = {
     name: string;
     code: string;
     is_active: boolean;
-    whitelist: {
-        [key: string]: unknown;
-    };
     created_at: string;
     updated_at: string;
 };
@@ -110,6 +174,11 @@ export type GetUserAnswer = {
     updated_at: string;
 };
 
+/**
+ * Format of attendee imports and event exports.
+ */
+export type ImportFormat = 'csv' | 'ndjson';
+
 /**
  * Leaderboard
  */
@@ -118,6 +187,7 @@ export type Leaderboard = {
     event_name: string;
     entries: Array<LeaderboardEntry>;
     total_users: number;
+    next_cursor?: string | null;
 };
 
 /**
@@ -139,9 +209,7 @@ export type PatchEvent = {
     name?: string;
     code?: string;
     is_active?: boolean;
-    whitelist?: {
-        [key: string]: unknown;
-    };
+    whitelist?: EventWhitelist;
 };
 
 /**
@@ -221,6 +289,17 @@ export type QrScanRequest = {
     qr_code: string;
 };
 
+/**
+ * QuestionCorrectness
+ */
+export type QuestionCorrectness = {
+    question_id: number;
+    question: string;
+    answered: number;
+    correct: number;
+    correct_rate: number;
+};
+
 /**
  * QuestionResult
  */
@@ -235,6 +314,22 @@ export type QuestionResult = {
  */
 export type QuestionType = 'multiple_choice' | 'true_false' | 'default';
 
+/**
+ * UserAnswerPage
+ */
+export type UserAnswerPage = {
+    items: Array<GetUserAnswer>;
+    next_cursor?: string | null;
+};
+
+/**
+ * UserPage
+ */
+export type UserPage = {
+    items: Array<GetUser>;
+    next_cursor?: string | null;
+};
+
 /**
  * UserStatus
  */
@@ -396,32 +491,102 @@ export type ApiEventsEventIdPatchEventResponses = {
 
 export type ApiEventsEventIdPatchEventResponse = ApiEventsEventIdPatchEventResponses[keyof ApiEventsEventIdPatchEventResponses];
 
+export type ApiEventsEventIdExportDatasetExportEventDataData = {
+    body?: never;
+    path: {
+        event_id: number;
+        dataset: ExportDataset;
+    };
+    query?: {
+        /**
+         * Format of attendee imports and event exports.
+         */
+        format?: ImportFormat;
+    };
+    url: '/api/events/{event_id}/export/{dataset}';
+};
+
+export type ApiEventsEventIdExportDatasetExportEventDataErrors = {
+    /**
+     * Validation Exception
+     */
+    400: {
+        status_code: number;
+        detail: string;
+        extra?: null | Array<unknown> | Array<unknown>;
+    };
+};
+
+export type ApiEventsEventIdExportDatasetExportEventDataError = ApiEventsEventIdExportDatasetExportEventDataErrors[keyof ApiEventsEventIdExportDatasetExportEventDataErrors];
+
+export type ApiEventsEventIdExportDatasetExportEventDataResponses = {
+    /**
+     * Stream Response
+     */
+    200: Blob | File;
+};
+
+export type ApiEventsEventIdExportDatasetExportEventDataResponse = ApiEventsEventIdExportDatasetExportEventDataResponses[keyof ApiEventsEventIdExportDatasetExportEventDataResponses];
+
+export type ApiEventsEventIdWhitelistGetEventWhitelistData = {
+    body?: never;
+    path: {
+        event_id: number;
+    };
+    query?: never;
+    url: '/api/events/{event_id}/whitelist';
+};
+
+export type ApiEventsEventIdWhitelistGetEventWhitelistErrors = {
+    /**
+     * Validation Exception
+     */
+    400: {
+        status_code: number;
+        detail: string;
+        extra?: null | Array<unknown> | Array<unknown>;
+    };
+};
+
+export type ApiEventsEventIdWhitelistGetEventWhitelistError = ApiEventsEventIdWhitelistGetEventWhitelistErrors[keyof ApiEventsEventIdWhitelistGetEventWhitelistErrors];
+
+export type ApiEventsEventIdWhitelistGetEventWhitelistResponses = {
+    /**
+     * Request fulfilled, document follows
+     */
+    200: EventWhitelist;
+};
+
+export type ApiEventsEventIdWhitelistGetEventWhitelistResponse = ApiEventsEventIdWhitelistGetEventWhitelistResponses[keyof ApiEventsEventIdWhitelistGetEventWhitelistResponses];
+
 export type ApiEventsGetEventsData = {
     body?: never;
     path?: never;
-    query?: never;
+    query?: {
+        limit?: number;
+        cursor?: string | null;
+    };
     url: '/api/events';
 };
 
+export type ApiEventsGetEventsErrors = {
+    /**
+     * Validation Exception
+     */
+    400: {
+        status_code: number;
+        detail: string;
+        extra?: null | Array<unknown> | Array<unknown>;
+    };
+};
+
+export type ApiEventsGetEventsError = ApiEventsGetEventsErrors[keyof ApiEventsGetEventsErrors];
+
 export type ApiEventsGetEventsResponses = {
     /**
      * Request fulfilled, document follows
      */
-    200: {
-        items?: Array<GetEvent>;
-        /**
-         * Maximal number of items to send.
-         */
-        limit?: number;
-        /**
-         * Offset from the beginning of the query.
-         */
-        offset?: number;
-        /**
-         * Total number of items.
-         */
-        total?: number;
-    };
+    200: EventPage;
 };
 
 export type ApiEventsGetEventsResponse = ApiEventsGetEventsResponses[keyof ApiEventsGetEventsResponses];
@@ -455,6 +620,42 @@ export type ApiEventsPostEventResponses = {
 
 export type ApiEventsPostEventResponse = ApiEventsPostEventResponses[keyof ApiEventsPostEventResponses];
 
+export type ApiEventsEventIdImportImportEventAttendeesData = {
+    body?: never;
+    path: {
+        event_id: number;
+    };
+    query?: {
+        /**
+         * Format of attendee imports and event exports.
+         */
+        format?: ImportFormat;
+    };
+    url: '/api/events/{event_id}/import';
+};
+
+export type ApiEventsEventIdImportImportEventAttendeesErrors = {
+    /**
+     * Validation Exception
+     */
+    400: {
+        status_code: number;
+        detail: string;
+        extra?: null | Array<unknown> | Array<unknown>;
+    };
+};
+
+export type ApiEventsEventIdImportImportEventAttendeesError = ApiEventsEventIdImportImportEventAttendeesErrors[keyof ApiEventsEventIdImportImportEventAttendeesErrors];
+
+export type ApiEventsEventIdImportImportEventAttendeesResponses = {
+    /**
+     * Request fulfilled, document follows
+     */
+    200: AttendeeImport;
+};
+
+export type ApiEventsEventIdImportImportEventAttendeesResponse = ApiEventsEventIdImportImportEventAttendeesResponses[keyof ApiEventsEventIdImportImportEventAttendeesResponses];
+
 export type ApiGameAnswerQuestionAnswerQuestionData = {
     body: GameQuestionResponse;
     path?: never;
@@ -539,6 +740,37 @@ export type ApiGameCompleteConnectionCompleteConnectionResponses = {
     201: unknown;
 };
 
+export type ApiGameAnalyticsEventIdGetAnalyticsData = {
+    body?: never;
+    path: {
+        event_id: number;
+    };
+    query?: never;
+    url: '/api/game/analytics/{event_id}';
+};
+
+export type ApiGameAnalyticsEventIdGetAnalyticsErrors = {
+    /**
+     * Validation Exception
+     */
+    400: {
+        status_code: number;
+        detail: string;
+        extra?: null | Array<unknown> | Array<unknown>;
+    };
+};
+
+export type ApiGameAnalyticsEventIdGetAnalyticsError = ApiGameAnalyticsEventIdGetAnalyticsErrors[keyof ApiGameAnalyticsEventIdGetAnalyticsErrors];
+
+export type ApiGameAnalyticsEventIdGetAnalyticsResponses = {
+    /**
+     * Request fulfilled, document follows
+     */
+    200: EventAnalytics;
+};
+
+export type ApiGameAnalyticsEventIdGetAnalyticsResponse = ApiGameAnalyticsEventIdGetAnalyticsResponses[keyof ApiGameAnalyticsEventIdGetAnalyticsResponses];
+
 export type ApiGameStatusGetGameStatusData = {
     body?: never;
     path?: never;
@@ -560,7 +792,10 @@ export type ApiGameLeaderboardEventIdGetLeaderboardData = {
     path: {
         event_id: number;
     };
-    query?: never;
+    query?: {
+        limit?: number;
+        cursor?: string | null;
+    };
     url: '/api/game/leaderboard/{event_id}';
 };
 
@@ -586,6 +821,40 @@ export type ApiGameLeaderboardEventIdGetLeaderboardResponses = {
 
 export type ApiGameLeaderboardEventIdGetLeaderboardResponse = ApiGameLeaderboardEventIdGetLeaderboardResponses[keyof ApiGameLeaderboardEventIdGetLeaderboardResponses];
 
+export type ApiGameLeaderboardEventIdAroundUserIdGetLeaderboardAroundUserData = {
+    body?: never;
+    path: {
+        event_id: number;
+        user_id: number;
+    };
+    query?: {
+        size?: number;
+    };
+    url: '/api/game/leaderboard/{event_id}/around/{user_id}';
+};
+
+export type ApiGameLeaderboardEventIdAroundUserIdGetLeaderboardAroundUserErrors = {
+    /**
+     * Validation Exception
+     */
+    400: {
+        status_code: number;
+        detail: string;
+        extra?: null | Array<unknown> | Array<unknown>;
+    };
+};
+
+export type ApiGameLeaderboardEventIdAroundUserIdGetLeaderboardAroundUserError = ApiGameLeaderboardEventIdAroundUserIdGetLeaderboardAroundUserErrors[keyof ApiGameLeaderboardEventIdAroundUserIdGetLeaderboardAroundUserErrors];
+
+export type ApiGameLeaderboardEventIdAroundUserIdGetLeaderboardAroundUserResponses = {
+    /**
+     * Request fulfilled, document follows
+     */
+    200: Leaderboard;
+};
+
+export type ApiGameLeaderboardEventIdAroundUserIdGetLeaderboardAroundUserResponse = ApiGameLeaderboardEventIdAroundUserIdGetLeaderboardAroundUserResponses[keyof ApiGameLeaderboardEventIdAroundUserIdGetLeaderboardAroundUserResponses];
+
 export type ApiGameScanQrScanQrCodeData = {
     body: QrScanRequest;
     path?: never;
@@ -935,29 +1204,31 @@ export type ApiUsersUserIdPatchUserResponse = ApiUsersUserIdPatchUserResponses[k
 export type ApiUsersGetUsersData = {
     body?: never;
     path?: never;
-    query?: never;
+    query?: {
+        limit?: number;
+        cursor?: string | null;
+    };
     url: '/api/users';
 };
 
+export type ApiUsersGetUsersErrors = {
+    /**
+     * Validation Exception
+     */
+    400: {
+        status_code: number;
+        detail: string;
+        extra?: null | Array<unknown> | Array<unknown>;
+    };
+};
+
+export type ApiUsersGetUsersError = ApiUsersGetUsersErrors[keyof ApiUsersGetUsersErrors];
+
 export type ApiUsersGetUsersResponses = {
     /**
      * Request fulfilled, document follows
      */
-    200: {
-        items?: Array<GetUser>;
-        /**
-         * Maximal number of items to send.
-         */
-        limit?: number;
-        /**
-         * Offset from the beginning of the query.
-         */
-        offset?: number;
-        /**
-         * Total number of items.
-         */
-        total?: number;
-    };
+    200: UserPage;
 };
 
 export type ApiUsersGetUsersResponse = ApiUsersGetUsersResponses[keyof ApiUsersGetUsersResponses];
@@ -1087,29 +1358,31 @@ export type ApiUserAnswersUserAnswerIdPatchUserAnswerResponse = ApiUserAnswersUs
 export type ApiUserAnswersAllGetAllUserAnswersData = {
     body?: never;
     path?: never;
-    query?: never;
+    query?: {
+        limit?: number;
+        cursor?: string | null;
+    };
     url: '/api/user-answers/all';
 };
 
+export type ApiUserAnswersAllGetAllUserAnswersErrors = {
+    /**
+     * Validation Exception
+     */
+    400: {
+        status_code: number;
+        detail: string;
+        extra?: null | Array<unknown> | Array<unknown>;
+    };
+};
+
+export type ApiUserAnswersAllGetAllUserAnswersError = ApiUserAnswersAllGetAllUserAnswersErrors[keyof ApiUserAnswersAllGetAllUserAnswersErrors];
+
 export type ApiUserAnswersAllGetAllUserAnswersResponses = {
     /**
      * Request fulfilled, document follows
      */
-    200: {
-        items?: Array<GetUserAnswer>;
-        /**
-         * Maximal number of items to send.
-         */
-        limit?: number;
-        /**
-         * Offset from the beginning of the query.
-         */
-        offset?: number;
-        /**
-         * Total number of items.
-         */
-        total?: number;
-    };
+    200: UserAnswerPage;
 };
 
 export type ApiUserAnswersAllGetAllUserAnswersResponse = ApiUserAnswersAllGetAllUserAnswersResponses[keyof ApiUserAnswersAllGetAllUserAnswersResponses];
@@ -1117,29 +1390,31 @@ export type ApiUserAnswersAllGetAllUserAnswersResponse = ApiUserAnswersAllGetAll
 export type ApiUserAnswersGetUserAnswersData = {
     body?: never;
     path?: never;
-    query?: never;
+    query?: {
+        limit?: number;
+        cursor?: string | null;
+    };
     url: '/api/user-answers';
 };
 
+export type ApiUserAnswersGetUserAnswersErrors = {
+    /**
+     * Validation Exception
+     */
+    400: {
+        status_code: number;
+        detail: string;
+        extra?: null | Array<unknown> | Array<unknown>;
+    };
+};
+
+export type ApiUserAnswersGetUserAnswersError = ApiUserAnswersGetUserAnswersErrors[keyof ApiUserAnswersGetUserAnswersErrors];
+
 export type ApiUserAnswersGetUserAnswersResponses = {
     /**
      * Request fulfilled, document follows
      */
-    200: {
-        items?: Array<GetUserAnswer>;
-        /**
-         * Maximal number of items to send.
-         */
-        limit?: number;
-        /**
-         * Offset from the beginning of the query.
-         */
-        offset?: number;
-        /**
-         * Total number of items.
-         */
-        total?: number;
-    };
+    200: UserAnswerPage;
 };
 
 export type ApiUserAnswersGetUserAnswersResponse = ApiUserAnswersGetUserAnswersResponses[keyof ApiUserAnswersGetUserAnswersResponses];
@@ -1,6 +1,25 @@
+import { type GetEvent, apiEventsGetEvents } from "@/client"
 import { type ClassValue, clsx } from "clsx"
 import { twMerge } from "tailwind-merge"
 
 export function cn(...inputs: ClassValue[]) {
   return twMerge(clsx(inputs))
 }
+
+// Admin listings come in keyset pages, follow the cursors to collect every event. Pages are left at the server's
+// default size, which is always within its MAX_PAGE_SIZE.
+export async function fetchAllEvents(): Promise<GetEvent[] | null> {
+  const events: GetEvent[] = []
+  let cursor: string | null | undefined
+
+  do {
+    const response = await apiEventsGetEvents({ query: { cursor } })
+    if (response.status !== 200 || !response.data) {
+      return null
+    }
+    events.push(...response.data.items)
+    cursor = response.data.next_cursor
+  } while (cursor)
+
+  return events
+}
@@ -1,16 +1,45 @@
-import { type GetEvent, type Leaderboard, apiEventsGetEvents, apiGameLeaderboardEventIdGetLeaderboard } from "@/client"
+import { type GetEvent, type Leaderboard, type LeaderboardEntry, apiGameLeaderboardEventIdGetLeaderboard } from "@/client"
 import { Button } from "@/components/ui/button"
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card"
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@/components/ui/select"
 import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from "@/components/ui/table"
+import { fetchAllEvents } from "@/lib/utils"
 import { createFileRoute } from "@tanstack/react-router"
 import { Award, Crown, Medal, Sparkles, Target, Trophy, Users, Zap } from "lucide-react"
-import { useEffect, useRef, useState } from "react"
+import { useEffect, useState } from "react"
 
 export const Route = createFileRoute("/_admin/leaderboard")({
   component: LeaderboardPage,
 })
 
+// Pushed on the `leaderboard-{event_id}` channel, at most once per second
+type LeaderboardDelta = {
+  event_id: number
+  entries: Omit<LeaderboardEntry, "email">[]
+  removed: number[]
+  total_users: number
+}
+
+const applyLeaderboardDelta = (leaderboard: Leaderboard, delta: LeaderboardDelta): Leaderboard => {
+  const entries = new Map(leaderboard.entries.map((entry) => [entry.id, entry]))
+
+  for (const id of delta.removed) {
+    entries.delete(id)
+  }
+  for (const entry of delta.entries) {
+    entries.set(entry.id, { email: "", ...entries.get(entry.id), ...entry })
+  }
+
+  // Ties are ordered like the server orders them, by name compared by code point and then by ID
+  const byRank = (a: LeaderboardEntry, b: LeaderboardEntry) => a.rank - b.rank || (a.name < b.name ? -1 : a.name > b.name ? 1 : 0) || a.id - b.id
+
+  return {
+    ...leaderboard,
+    entries: [...entries.values()].sort(byRank).slice(0, 10),
+    total_users: delta.total_users,
+  }
+}
+
 function LeaderboardPage() {
   const [events, setEvents] = useState<GetEvent[]>([])
   const [leaderboard, setLeaderboard] = useState<Leaderboard | null>(null)
@@ -18,15 +47,14 @@ function LeaderboardPage() {
   const [loading, setLoading] = useState(false)
   const [eventsLoading, setEventsLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
-  const intervalRef = useRef<NodeJS.Timeout | null>(null)
 
   useEffect(() => {
     const fetchEvents = async () => {
       setEventsLoading(true)
 
-      const response = await apiEventsGetEvents()
-      if (response.status === 200 && response.data) {
-        setEvents(response.data.items || [])
+      const allEvents = await fetchAllEvents()
+      if (allEvents) {
+        setEvents(allEvents)
       } else {
         setError("Failed to fetch events")
       }
@@ -58,25 +86,27 @@ function LeaderboardPage() {
     }
   }
 
-  // Auto-refresh effect for leaderboard
-  // biome-ignore lint/correctness/useExhaustiveDependencies: <explanation>
+  // Live updates for the selected event
   useEffect(() => {
-    if (intervalRef.current) {
-      clearInterval(intervalRef.current)
-    }
+    if (!selectedEventId) return
 
-    if (selectedEventId && leaderboard) {
-      intervalRef.current = setInterval(() => {
-        fetchLeaderboard(Number.parseInt(selectedEventId), false) // Don't show loading for auto-refresh
-      }, 30000) // 30 seconds
-    }
+    const protocol = window.location.protocol === "https:" ? "wss:" : "ws:"
+    const host = window.location.host
+    const socket = new WebSocket(`${protocol}//${host}/ws/leaderboard-${selectedEventId}`)
+
+    socket.addEventListener("message", (event) => {
+      const delta: LeaderboardDelta = JSON.parse(event.data)
+      setLeaderboard((current) => (current && current.event_id === delta.event_id ? applyLeaderboardDelta(current, delta) : current))
+    })
+
+    socket.addEventListener("error", (error) => {
+      console.error("Leaderboard WebSocket error:", error)
+    })
 
     return () => {
-      if (intervalRef.current) {
-        clearInterval(intervalRef.current)
-      }
+      socket.close()
     }
-  }, [selectedEventId, leaderboard])
+  }, [selectedEventId])
 
   const handleEventSelect = (eventId: string) => {
     setSelectedEventId(eventId)
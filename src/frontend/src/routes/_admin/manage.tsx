@@ -1,9 +1,10 @@
 import {
+  type EventWhitelist,
   type GetEvent,
   type GetQuestion,
   apiEventsEventIdDeleteEvent,
   apiEventsEventIdPatchEvent,
-  apiEventsGetEvents,
+  apiEventsEventIdWhitelistGetEventWhitelist,
   apiEventsPostEvent,
   apiGameStartStartGame,
   apiGameStopStopGame,
@@ -19,6 +20,7 @@ import { Form, FormControl, FormField, FormItem, FormLabel, FormMessage } from "
 import { Input } from "@/components/ui/input"
 import { Label } from "@/components/ui/label"
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@/components/ui/select"
+import { fetchAllEvents } from "@/lib/utils"
 import { zodResolver } from "@hookform/resolvers/zod"
 import { createFileRoute } from "@tanstack/react-router"
 import { CircleAlert, Edit, Eye, HelpCircle, Play, Plus, Square, Trash2 } from "lucide-react"
@@ -94,6 +96,7 @@ function ManagePage() {
 
   // Form states
   const [selectedEventForAction, setSelectedEventForAction] = useState<GetEvent | null>(null)
+  const [selectedEventWhitelist, setSelectedEventWhitelist] = useState<EventWhitelist | null>(null)
   const [selectedQuestionForAction, setSelectedQuestionForAction] = useState<GetQuestion | null>(null)
   const [formLoading, setFormLoading] = useState(false)
 
@@ -152,9 +155,9 @@ function ManagePage() {
     setError(null)
 
     try {
-      const response = await apiEventsGetEvents()
-      if (response.status === 200 && response.data) {
-        setEvents(response.data.items || [])
+      const allEvents = await fetchAllEvents()
+      if (allEvents) {
+        setEvents(allEvents)
       } else {
         setError("Failed to fetch events")
       }
@@ -203,18 +206,31 @@ function ManagePage() {
     setFormLoading(false)
   }
 
+  // The whitelist isn't part of the event, it's only loaded for the event being viewed or edited
+  const fetchEventWhitelist = async (event: GetEvent): Promise<EventWhitelist> => {
+    const response = await apiEventsEventIdWhitelistGetEventWhitelist({ path: { event_id: event.id } })
+    if (response.status !== 200 || !response.data) {
+      toast.error("Failed to load event whitelist")
+      return { emails: [] }
+    }
+    return response.data
+  }
+
   const handleViewEvent = async (event: GetEvent) => {
     setSelectedEventForAction(event)
+    setSelectedEventWhitelist(null)
     setViewDialogOpen(true)
+    setSelectedEventWhitelist(await fetchEventWhitelist(event))
   }
 
   const handleEditEvent = async (event: GetEvent) => {
     setSelectedEventForAction(event)
+    const whitelist = await fetchEventWhitelist(event)
     editForm.reset({
       name: event.name,
       code: event.code,
       is_active: event.is_active,
-      whitelist: JSON.stringify(event.whitelist, null, 2),
+      whitelist: JSON.stringify(whitelist, null, 2),
     })
     setEditDialogOpen(true)
   }
@@ -793,7 +809,7 @@ function ManagePage() {
               <div className="space-y-2">
                 <Label>Whitelist Configuration</Label>
                 <div className="rounded-md border bg-muted/30 p-3 text-sm">
-                  <pre className="whitespace-pre-wrap font-mono text-xs">{JSON.stringify(selectedEventForAction.whitelist, null, 2)}</pre>
+                  <pre className="whitespace-pre-wrap font-mono text-xs">{selectedEventWhitelist ? JSON.stringify(selectedEventWhitelist, null, 2) : "Loading..."}</pre>
                 </div>
               </div>
               <div className="space-y-2">
@@ -1,14 +1,52 @@
+import { readFile, writeFile } from "node:fs/promises"
 import path from "node:path"
+import { brotliCompressSync, constants, gzipSync } from "node:zlib"
 import tailwindcss from "@tailwindcss/vite"
 import { tanstackRouter } from "@tanstack/router-plugin/vite"
 import react from "@vitejs/plugin-react-swc"
-import { defineConfig } from "vite"
+import { type Plugin, defineConfig } from "vite"
 
 const APP_URL = process.env.APP_URL || "http://0.0.0.0:8000"
 const API_URL = APP_URL
 const VITE_PORT = process.env.VITE_PORT || 8080
 const ASSET_URL = process.env.ASSET_URL || "/static/"
 
+// Hashed assets are compressed once at build time, the backend serves the `.br` and `.gz` files as they are
+const COMPRESSIBLE_ASSET = /^assets\/.+\.(?:js|css|svg|json|txt|wasm)$/
+const MIN_COMPRESSED_SIZE = 1024
+
+function precompressAssets(): Plugin {
+  return {
+    name: "precompress-assets",
+    apply: "build",
+    async writeBundle(options, bundle) {
+      const files = Object.keys(bundle)
+        .filter((fileName) => COMPRESSIBLE_ASSET.test(fileName))
+        .map((fileName) => path.join(options.dir ?? "", fileName))
+
+      await Promise.all(
+        files.map(async (file) => {
+          const content = await readFile(file)
+          if (content.length < MIN_COMPRESSED_SIZE) return
+
+          await Promise.all([
+            writeFile(
+              `${file}.br`,
+              brotliCompressSync(content, {
+                params: {
+                  [constants.BROTLI_PARAM_QUALITY]: constants.BROTLI_MAX_QUALITY,
+                  [constants.BROTLI_PARAM_SIZE_HINT]: content.length,
+                },
+              }),
+            ),
+            writeFile(`${file}.gz`, gzipSync(content, { level: constants.Z_BEST_COMPRESSION })),
+          ])
+        }),
+      )
+    },
+  }
+}
+
 // https://vite.dev/config/
 async function getConfig() {
   return defineConfig({
@@ -19,6 +57,7 @@ async function getConfig() {
       }),
       tailwindcss(),
       react(),
+      precompressAssets(),
     ],
     base: ASSET_URL,
     resolve: {